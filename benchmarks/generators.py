@@ -0,0 +1,221 @@
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+"""
+Synthetic playlists for the benchmarks, shaped after the playlists served
+in production: each function returns the text of a playlist valid in
+strict mode, scaled by its arguments.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _date(seconds):
+    return (START + timedelta(seconds=seconds)).isoformat(timespec="milliseconds")
+
+
+def _lines_to_text(lines):
+    return "\n".join(lines) + "\n"
+
+
+def vod(segments=100000, duration=6.006, discontinuity_every=1000):
+    """A long fMP4 VOD playlist, with a discontinuity every few segments."""
+    lines = [
+        "#EXTM3U",
+        "#EXT-X-VERSION:7",
+        f"#EXT-X-TARGETDURATION:{round(duration)}",
+        "#EXT-X-PLAYLIST-TYPE:VOD",
+        "#EXT-X-INDEPENDENT-SEGMENTS",
+        "#EXT-X-MEDIA-SEQUENCE:0",
+        '#EXT-X-MAP:URI="init-0.mp4"',
+    ]
+    for i in range(segments):
+        if i and i % discontinuity_every == 0:
+            lines.append("#EXT-X-DISCONTINUITY")
+            lines.append(f'#EXT-X-MAP:URI="init-{i // discontinuity_every}.mp4"')
+        lines.append(f"#EXTINF:{duration:.3f},")
+        lines.append(f"video/1080p/segment-{i:06d}.m4s")
+    lines.append("#EXT-X-ENDLIST")
+    return _lines_to_text(lines)
+
+
+def live_dvr(segments=2400, duration=6.0, media_sequence=1000000):
+    """
+    A live playlist with a DVR window of `segments`, four hours by default,
+    with a program date time on every segment.
+    """
+    lines = [
+        "#EXTM3U",
+        "#EXT-X-VERSION:3",
+        f"#EXT-X-TARGETDURATION:{round(duration)}",
+        f"#EXT-X-MEDIA-SEQUENCE:{media_sequence}",
+        f"#EXT-X-DISCONTINUITY-SEQUENCE:{media_sequence // 1000}",
+    ]
+    for i in range(segments):
+        lines.append(f"#EXT-X-PROGRAM-DATE-TIME:{_date(i * duration)}")
+        lines.append(f"#EXTINF:{duration:.3f},")
+        lines.append(f"https://cdn.example.com/live/channel/{media_sequence + i}.ts")
+    return _lines_to_text(lines)
+
+
+def low_latency(segments=600, parts=6, duration=4.0, media_sequence=5000):
+    """
+    A low latency playlist with `parts` partial segments per segment, a
+    preload hint and rendition reports. Every segment keeps its parts, which
+    servers usually only do for the last few.
+    """
+    part_duration = duration / parts
+    lines = [
+        "#EXTM3U",
+        "#EXT-X-VERSION:9",
+        f"#EXT-X-TARGETDURATION:{round(duration)}",
+        "#EXT-X-SERVER-CONTROL:CAN-BLOCK-RELOAD=YES,PART-HOLD-BACK=2.0,"
+        f"CAN-SKIP-UNTIL={duration * 6:.1f}",
+        f"#EXT-X-PART-INF:PART-TARGET={part_duration:.5f}",
+        f"#EXT-X-MEDIA-SEQUENCE:{media_sequence}",
+        '#EXT-X-MAP:URI="init.mp4"',
+    ]
+    for i in range(segments):
+        sequence = media_sequence + i
+        lines.append(f"#EXT-X-PROGRAM-DATE-TIME:{_date(i * duration)}")
+        for part in range(parts):
+            independent = ",INDEPENDENT=YES" if part % 2 == 0 else ""
+            lines.append(
+                f"#EXT-X-PART:DURATION={part_duration:.5f},"
+                f'URI="part-{sequence}.{part}.m4s"{independent}'
+            )
+        lines.append(f"#EXTINF:{duration:.5f},")
+        lines.append(f"segment-{sequence}.m4s")
+    last = media_sequence + segments
+    lines.append(f'#EXT-X-PRELOAD-HINT:TYPE=PART,URI="part-{last}.0.m4s"')
+    for rendition in ("480p", "720p", "1080p"):
+        lines.append(
+            f'#EXT-X-RENDITION-REPORT:URI="../{rendition}/index.m3u8",'
+            f"LAST-MSN={last - 1},LAST-PART={parts - 1}"
+        )
+    return _lines_to_text(lines)
+
+
+def key_rotation(segments=10000, rotate_every=10, duration=6.0):
+    """An encrypted playlist changing its key every `rotate_every` segments."""
+    lines = [
+        "#EXTM3U",
+        "#EXT-X-VERSION:5",
+        f"#EXT-X-TARGETDURATION:{round(duration)}",
+        "#EXT-X-MEDIA-SEQUENCE:0",
+        '#EXT-X-SESSION-KEY:METHOD=SAMPLE-AES,URI="skd://keys.example.com/session",'
+        'KEYFORMAT="com.apple.streamingkeydelivery",KEYFORMATVERSIONS="1"',
+    ]
+    for i in range(segments):
+        if i % rotate_every == 0:
+            key = i // rotate_every
+            lines.append(
+                "#EXT-X-KEY:METHOD=SAMPLE-AES,"
+                f'URI="skd://keys.example.com/{key}",IV=0x{key:032x},'
+                'KEYFORMAT="com.apple.streamingkeydelivery",KEYFORMATVERSIONS="1"'
+            )
+        lines.append(f"#EXTINF:{duration:.3f},")
+        lines.append(f"segment-{i}.ts")
+    lines.append("#EXT-X-ENDLIST")
+    return _lines_to_text(lines)
+
+
+def scte35(segments=5000, break_every=50, break_segments=5, duration=6.0):
+    """
+    A live playlist with an ad break every `break_every` segments, signalled
+    with SCTE-35 dateranges and EXT-X-CUE-OUT, EXT-X-CUE-OUT-CONT and
+    EXT-X-CUE-IN tags.
+    """
+    splice = "0xFC302F000000000000FFFFF014054800008F7FEFFE7369C02EFE0052CCF500000000000A0008435545490000013562DBA30A"
+    lines = [
+        "#EXTM3U",
+        "#EXT-X-VERSION:3",
+        f"#EXT-X-TARGETDURATION:{round(duration)}",
+        "#EXT-X-MEDIA-SEQUENCE:0",
+    ]
+    planned = break_segments * duration
+    for i in range(segments):
+        lines.append(f"#EXT-X-PROGRAM-DATE-TIME:{_date(i * duration)}")
+        position = i % break_every
+        if position == 0 and i:
+            lines.append(
+                f'#EXT-X-DATERANGE:ID="splice-{i}",START-DATE="{_date(i * duration)}",'
+                f"PLANNED-DURATION={planned:.1f},SCTE35-OUT={splice}"
+            )
+            lines.append(f"#EXT-OATCLS-SCTE35:{splice}")
+            lines.append(f"#EXT-X-CUE-OUT:{planned:.1f}")
+        elif 0 < position < break_segments and i > position:
+            lines.append(
+                f"#EXT-X-CUE-OUT-CONT:ElapsedTime={position * duration:.1f},"
+                f"Duration={planned:.1f},SCTE35={splice}"
+            )
+        elif position == break_segments and i > position:
+            lines.append("#EXT-X-CUE-IN")
+        lines.append(f"#EXTINF:{duration:.3f},")
+        lines.append(f"segment-{i}.ts")
+    return _lines_to_text(lines)
+
+
+def master(variants=500, audio_languages=20, subtitle_languages=20):
+    """
+    A master playlist with a large ladder of variants, audio and subtitles
+    renditions, and an I-frame playlist per variant.
+    """
+    lines = ["#EXTM3U", "#EXT-X-VERSION:6", "#EXT-X-INDEPENDENT-SEGMENTS"]
+    for group in ("aac", "ec3"):
+        for i in range(audio_languages):
+            default = "YES" if i == 0 else "NO"
+            lines.append(
+                f'#EXT-X-MEDIA:TYPE=AUDIO,GROUP-ID="{group}",LANGUAGE="l{i}",'
+                f'NAME="Audio {i}",DEFAULT={default},AUTOSELECT=YES,CHANNELS="2",'
+                f'URI="audio/{group}/{i}/index.m3u8"'
+            )
+    for i in range(subtitle_languages):
+        lines.append(
+            f'#EXT-X-MEDIA:TYPE=SUBTITLES,GROUP-ID="subs",LANGUAGE="l{i}",'
+            f'NAME="Subtitles {i}",DEFAULT=NO,AUTOSELECT=YES,'
+            f'URI="subtitles/{i}/index.m3u8"'
+        )
+    resolutions = ["640x360", "960x540", "1280x720", "1920x1080", "3840x2160"]
+    codecs = ["avc1.640028", "hvc1.2.4.L123.B0"]
+    for i in range(variants):
+        bandwidth = 200000 + i * 20000
+        resolution = resolutions[i % len(resolutions)]
+        codec = codecs[i % len(codecs)]
+        audio = "aac" if i % 2 else "ec3"
+        audio_codec = "mp4a.40.2" if audio == "aac" else "ec-3"
+        lines.append(
+            f"#EXT-X-STREAM-INF:BANDWIDTH={bandwidth},"
+            f"AVERAGE-BANDWIDTH={bandwidth * 9 // 10},"
+            f'CODECS="{codec},{audio_codec}",RESOLUTION={resolution},'
+            f'FRAME-RATE=29.970,AUDIO="{audio}",SUBTITLES="subs"'
+        )
+        lines.append(f"video/{i}/index.m3u8")
+    for i in range(variants):
+        lines.append(
+            f"#EXT-X-I-FRAME-STREAM-INF:BANDWIDTH={20000 + i * 2000},"
+            f'CODECS="{codecs[i % len(codecs)]}",'
+            f"RESOLUTION={resolutions[i % len(resolutions)]},"
+            f'URI="video/{i}/iframes.m3u8"'
+        )
+    return _lines_to_text(lines)
+
+
+# Playlists measured by default, with the arguments for a scale of 1.
+PLAYLISTS = {
+    "vod": (vod, "segments", 100000),
+    "live_dvr": (live_dvr, "segments", 2400),
+    "low_latency": (low_latency, "segments", 600),
+    "key_rotation": (key_rotation, "segments", 10000),
+    "scte35": (scte35, "segments", 5000),
+    "master": (master, "variants", 500),
+}
+
+
+def generate(name, scale=1.0):
+    """Returns the text of the playlist `name` of PLAYLISTS, scaled."""
+    function, argument, size = PLAYLISTS[name]
+    return function(**{argument: max(1, int(size * scale))})
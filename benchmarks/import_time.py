@@ -0,0 +1,89 @@
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+"""
+Measures the time taken to import m3u8, with `python -X importtime`, and
+the modules it pulls in. Each statement runs in a new interpreter, a few
+times, and the median time is reported without the time and modules of
+the interpreter startup.
+
+    python benchmarks/import_time.py [runs]
+
+"everything" imports the modules only loaded on first use (HTTP client,
+bulk parsing, snapshots, SCTE-35 decoder, strict validation rules, JSON),
+which is what `import m3u8` cost when they were imported eagerly.
+"""
+
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+STATEMENTS = {
+    "import m3u8": "import m3u8",
+    "loads": "import m3u8; m3u8.loads('#EXTM3U\\n#EXTINF:10,\\na.ts\\n').dumps()",
+    "everything": (
+        "import m3u8, m3u8.httpclient, m3u8.bulk, m3u8.snapshot, m3u8.scte35, "
+        "m3u8.version_matching, json"
+    ),
+}
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LINE_PATTERN = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def import_times(statement):
+    """
+    Runs `statement` in a new interpreter and returns the (module, self
+    microseconds, cumulative microseconds, depth) of each module imported.
+    """
+    # Bytecode is written when possible, so that only the first run
+    # compiles the modules. The m3u8 package of this checkout is measured,
+    # wherever the script is run from.
+    path = os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")]))
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="", PYTHONPATH=path)
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        env=env,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    times = []
+    for line in process.stderr.splitlines():
+        match = LINE_PATTERN.match(line)
+        if match:
+            own, cumulative, indent, module = match.groups()
+            times.append((module, int(own), int(cumulative), len(indent) // 2))
+    return times
+
+
+def measure(statement, runs):
+    """Returns the median total import time and the modules imported."""
+    import_times(statement)
+    totals = []
+    for _ in range(runs):
+        times = import_times(statement)
+        totals.append(sum(cumulative for _, _, cumulative, depth in times if not depth))
+    return statistics.median(totals), times
+
+
+def main(runs=5):
+    startup_total, startup_times = measure("pass", runs)
+    startup_modules = {module for module, _, _, _ in startup_times}
+    for label, statement in STATEMENTS.items():
+        total, times = measure(statement, runs)
+        times = [item for item in times if item[0] not in startup_modules]
+        slowest = sorted(times, key=lambda item: -item[1])[:5]
+        print(
+            f"{label:<12} {(total - startup_total) / 1000:8.1f} ms"
+            f"  {len(times):4} modules  slowest: "
+            + ", ".join(f"{module} {own / 1000:.1f}" for module, own, _, _ in slowest)
+        )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
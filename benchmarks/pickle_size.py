@@ -0,0 +1,79 @@
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+"""
+Measures the size of pickled playlists and the time taken to pickle and
+unpickle them, compared with sending the playlist text and parsing it
+again.
+
+    python benchmarks/pickle_size.py [segments]
+"""
+
+import os
+import pickle
+import sys
+import timeit
+
+# The m3u8 package of this checkout is measured, wherever the script is run
+# from.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import m3u8
+
+
+def make_playlist(segments):
+    lines = [
+        "#EXTM3U",
+        "#EXT-X-VERSION:3",
+        "#EXT-X-TARGETDURATION:10",
+        "#EXT-X-MEDIA-SEQUENCE:1000",
+        '#EXT-X-KEY:METHOD=AES-128,URI="https://keys.example.com/key"',
+        "#EXT-X-PROGRAM-DATE-TIME:2024-01-01T00:00:00.000Z",
+    ]
+    for i in range(segments):
+        if i % 500 == 499:
+            lines.append("#EXT-X-DISCONTINUITY")
+        lines.append(f"#EXTINF:{9 + i % 10 / 10:.3f},")
+        lines.append(f"segment-{i}.ts")
+    lines.append("#EXT-X-ENDLIST")
+    return "\n".join(lines) + "\n"
+
+
+def measure(label, dump, load):
+    payload = dump()
+    dump_time = min(timeit.repeat(dump, number=1, repeat=5))
+    load_time = min(timeit.repeat(lambda: load(payload), number=1, repeat=5))
+    print(
+        f"{label:<18} {len(payload):>10,} bytes"
+        f"  dump {dump_time * 1000:7.1f} ms  load {load_time * 1000:7.1f} ms"
+    )
+
+
+def main(segments=10000):
+    content = make_playlist(segments)
+    playlist = m3u8.loads(content, uri="https://cdn.example.com/live/index.m3u8")
+    frozen = m3u8.loads(content).freeze()
+    protocol = pickle.HIGHEST_PROTOCOL
+
+    print(f"{segments:,} segments")
+    measure("text + parse", lambda: content.encode(), lambda b: m3u8.loads(b.decode()))
+    measure(
+        "M3U8",
+        lambda: pickle.dumps(playlist, protocol),
+        pickle.loads,
+    )
+    measure(
+        "frozen M3U8",
+        lambda: pickle.dumps(frozen, protocol),
+        pickle.loads,
+    )
+    measure(
+        "segments",
+        lambda: pickle.dumps(playlist.segments, protocol),
+        pickle.loads,
+    )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,216 @@
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+"""
+Measures the throughput and memory use of parsing, building, dumping,
+loading and validating the synthetic playlists of `generators`.
+
+    python benchmarks/run.py [--scale 0.1] [--playlists vod,master]
+        [--operations parse,dumps] [--save results.json]
+        [--compare baseline.json] [--threshold 0.1]
+
+For each playlist and operation it reports operations per second, the
+peak memory allocated by one operation and the memory still held by its
+result, as traced by tracemalloc. Each playlist is measured in its own
+process, whose peak RSS is reported too.
+
+Results saved with --save can be compared with a later run, e.g. before
+upgrading the library: --compare exits with status 1 when an operation
+is slower, or allocates more, than the baseline by more than --threshold.
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import timeit
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import generators
+
+# The m3u8 package of this checkout is measured, wherever the script is run
+# from.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import m3u8
+
+OPERATIONS = ("parse", "construct", "loads", "dumps", "load", "strict")
+
+
+def operations(content, path):
+    """Returns the functions measured for a playlist, by operation name."""
+    data = m3u8.parse(content)
+    playlist = m3u8.M3U8(content)
+    return {
+        "parse": lambda: m3u8.parse(content),
+        "construct": lambda: m3u8.M3U8.from_dict(data),
+        "loads": lambda: m3u8.loads(content),
+        "dumps": playlist.dumps,
+        "load": lambda: m3u8.load(path),
+        "strict": lambda: m3u8.parse(content, strict=True),
+    }
+
+
+def throughput(function, repeat):
+    """Returns the best number of calls of `function` per second."""
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number))
+    return number / best
+
+
+def allocations(function):
+    """
+    Returns the peak size allocated while calling `function` and the size
+    still allocated by its result, in bytes.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        result = function()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak - before, current - before
+
+
+def peak_rss():
+    """Returns the peak resident set size of this process in bytes."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def measure(name, scale, names, repeat):
+    content = generators.generate(name, scale)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "playlist.m3u8")
+        with open(path, "w") as fileobj:
+            fileobj.write(content)
+
+        functions = operations(content, path)
+        results = {}
+        for operation in names:
+            function = functions[operation]
+            # Warm up first, so that lazy imports and caches filled on the
+            # first call aren't counted in the allocations.
+            function()
+            peak, retained = allocations(function)
+            results[operation] = {
+                "ops": throughput(function, repeat),
+                "peak": peak,
+                "retained": retained,
+            }
+    return {"size": len(content), "rss": peak_rss(), "operations": results}
+
+
+def compare(results, baseline, threshold):
+    """Returns the regressions of `results` from `baseline`, as messages."""
+    regressions = []
+    for name, result in results.items():
+        for operation, values in result["operations"].items():
+            try:
+                base = baseline[name]["operations"][operation]
+            except KeyError:
+                continue
+            if values["ops"] < base["ops"] * (1 - threshold):
+                regressions.append(
+                    f"{name} {operation}: {values['ops']:,.1f} ops/s, "
+                    f"was {base['ops']:,.1f}"
+                )
+            if values["peak"] > base["peak"] * (1 + threshold):
+                regressions.append(
+                    f"{name} {operation}: peak {_kib(values['peak'])}, "
+                    f"was {_kib(base['peak'])}"
+                )
+    return regressions
+
+
+def _kib(size):
+    return "-" if size is None else f"{size / 1024:,.0f} KiB"
+
+
+def _print_result(name, result):
+    print(f"{name}: {result['size']:,} bytes, peak RSS {_kib(result['rss'])}")
+    for operation, values in result["operations"].items():
+        print(
+            f"  {operation:<10} {values['ops']:>12,.1f} ops/s"
+            f"  {1000 / values['ops']:>10.3f} ms"
+            f"  peak {_kib(values['peak']):>14}"
+            f"  retained {_kib(values['retained']):>14}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--playlists",
+        default=",".join(generators.PLAYLISTS),
+        help="comma separated playlists to measure, among %(default)s",
+    )
+    parser.add_argument(
+        "--operations",
+        default=",".join(OPERATIONS),
+        help="comma separated operations to measure, among %(default)s",
+    )
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="size of the playlists"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="timings taken, the best is kept"
+    )
+    parser.add_argument("--save", metavar="FILE", help="save the results as JSON")
+    parser.add_argument(
+        "--compare", metavar="FILE", help="compare with results saved before"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="fraction of slowdown or extra memory reported by --compare",
+    )
+    args = parser.parse_args(argv)
+    names = args.operations.split(",")
+    for operation in names:
+        if operation not in OPERATIONS:
+            parser.error(f"unknown operation {operation}")
+
+    results = {}
+    # A new process for each playlist, so that its peak RSS is its own.
+    context = get_context("spawn")
+    for name in args.playlists.split(","):
+        with ProcessPoolExecutor(1, mp_context=context) as executor:
+            future = executor.submit(measure, name, args.scale, names, args.repeat)
+            results[name] = future.result()
+        _print_result(name, results[name])
+
+    if args.save:
+        with open(args.save, "w") as fileobj:
+            json.dump(results, fileobj, indent=2)
+
+    if args.compare:
+        with open(args.compare) as fileobj:
+            baseline = json.load(fileobj)
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print("regression:", regression)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,7 +5,9 @@
 import os
 from urllib.parse import urljoin, urlsplit
 
-from m3u8.httpclient import DefaultHTTPClient
+from m3u8 import metrics
+from m3u8.cache import ParseCache
+from m3u8.frozen import FrozenPlaylistError
 from m3u8.model import (
     M3U8,
     ContentSteering,
@@ -31,7 +33,10 @@ from m3u8.model import (
     Start,
     Tiles,
 )
-from m3u8.parser import ParseError, parse
+from m3u8.parser import ParseError, TagRegistry, parse
+from m3u8.profiling import ParseProfiler
+from m3u8.rewrite import URIRewriter
+from m3u8.timeline import AdBreak, AdBreakTracker, TimelineIndex
 
 __all__ = (
     "M3U8",
@@ -57,25 +62,63 @@ __all__ = (
     "ContentSteering",
     "ImagePlaylist",
     "Tiles",
+    "AdBreak",
+    "AdBreakTracker",
+    "TimelineIndex",
+    "ParseCache",
+    "ParseProfiler",
+    "URIRewriter",
     "loads",
     "load",
     "parse",
+    "parse_many",
     "ParseError",
+    "TagRegistry",
+    "FrozenPlaylistError",
+    "SnapshotError",
 )
 
 
-def loads(content, uri=None, custom_tags_parser=None):
+def loads(
+    content,
+    uri=None,
+    custom_tags_parser=None,
+    cache=None,
+    lazy=False,
+    lossless=False,
+    keep_unknown_tags=False,
+):
     """
     Given a string with a m3u8 content, returns a M3U8 object.
     Optionally parses a uri to set a correct base_uri on the M3U8 object.
+    Optionally takes a ParseCache to reuse the results of parsing the same
+    content before.
+    With `lazy`, durations and dates are converted on access, with
+    `lossless`, what isn't modified is dumped as it was written, and with
+    `keep_unknown_tags` the tags the library doesn't know are dumped again,
+    see M3U8.
     Raises ValueError if invalid content
     """
+    factory = M3U8 if cache is None else cache.M3U8
 
     if uri is None:
-        return M3U8(content, custom_tags_parser=custom_tags_parser)
+        return factory(
+            content,
+            custom_tags_parser=custom_tags_parser,
+            lazy=lazy,
+            lossless=lossless,
+            keep_unknown_tags=keep_unknown_tags,
+        )
     else:
         base_uri = urljoin(uri, ".")
-        return M3U8(content, base_uri=base_uri, custom_tags_parser=custom_tags_parser)
+        return factory(
+            content,
+            base_uri=base_uri,
+            custom_tags_parser=custom_tags_parser,
+            lazy=lazy,
+            lossless=lossless,
+            keep_unknown_tags=keep_unknown_tags,
+        )
 
 
 def load(
@@ -83,23 +126,57 @@ def load(
     timeout=None,
     headers={},
     custom_tags_parser=None,
-    http_client=DefaultHTTPClient(),
+    http_client=None,
     verify_ssl=True,
+    cache=None,
 ):
     """
     Retrieves the content from a given URI and returns a M3U8 object.
     Raises ValueError if invalid content or IOError if request fails.
+    URIs are downloaded with `http_client`, a DefaultHTTPClient by default.
     """
+    with metrics.timed(metrics.LOAD_SECONDS):
+        return _load(
+            uri, timeout, headers, custom_tags_parser, http_client, verify_ssl, cache
+        )
+
+
+def _load(uri, timeout, headers, custom_tags_parser, http_client, verify_ssl, cache):
+    factory = M3U8 if cache is None else cache.M3U8
     base_uri_parts = urlsplit(uri)
     if base_uri_parts.scheme and base_uri_parts.netloc:
+        if http_client is None:
+            from m3u8.httpclient import DefaultHTTPClient
+
+            http_client = DefaultHTTPClient()
         content, base_uri = http_client.download(uri, timeout, headers, verify_ssl)
-        return M3U8(content, base_uri=base_uri, custom_tags_parser=custom_tags_parser)
+        return factory(
+            content, base_uri=base_uri, custom_tags_parser=custom_tags_parser
+        )
     else:
-        return _load_from_file(uri, custom_tags_parser)
+        return _load_from_file(uri, custom_tags_parser, factory)
 
 
-def _load_from_file(uri, custom_tags_parser=None):
+def _load_from_file(uri, custom_tags_parser=None, factory=M3U8):
     with open(uri, encoding="utf8") as fileobj:
         raw_content = fileobj.read().strip()
     base_uri = os.path.dirname(uri)
-    return M3U8(raw_content, base_uri=base_uri, custom_tags_parser=custom_tags_parser)
+    return factory(
+        raw_content, base_uri=base_uri, custom_tags_parser=custom_tags_parser
+    )
+
+
+def __getattr__(name):
+    # The modules behind these names pull in urllib.request, ssl,
+    # multiprocessing... and are only imported when first used, to keep
+    # `import m3u8` light for code that only parses.
+    if name == "DefaultHTTPClient":
+        from m3u8.httpclient import DefaultHTTPClient as value
+    elif name == "parse_many":
+        from m3u8.bulk import parse_many as value
+    elif name == "SnapshotError":
+        from m3u8.snapshot import SnapshotError as value
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
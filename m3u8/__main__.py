@@ -0,0 +1,10 @@
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+import sys
+
+from m3u8.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+"""
+Parsing of many playlists at once, spread over a pool of processes.
+"""
+
+import os
+import pickle
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import partial
+from itertools import islice
+
+from m3u8.model import M3U8
+
+ParseResult = namedtuple("ParseResult", ["index", "source", "playlist", "error"])
+ParseResult.__doc__ = """
+Result of parsing one of the playlists given to `parse_many`.
+
+`index` is the position of the playlist in the sources and `source` its
+path, or None when the playlist content was given. `playlist` is the
+M3U8 object, or its PlaylistSummary, and None when parsing failed with
+`error`.
+"""
+
+PlaylistContent = namedtuple("PlaylistContent", ["content"])
+PlaylistContent.__doc__ = """
+Content of a playlist given to `parse_many`, which is never taken for a
+path whatever it starts with.
+"""
+
+PlaylistSummary = namedtuple(
+    "PlaylistSummary",
+    [
+        "version",
+        "is_variant",
+        "is_endlist",
+        "playlist_type",
+        "target_duration",
+        "media_sequence",
+        "segments",
+        "duration",
+        "playlists",
+    ],
+)
+
+
+def summarize(playlist):
+    """Returns the PlaylistSummary of a M3U8 object."""
+    return PlaylistSummary(
+        version=playlist.version,
+        is_variant=playlist.is_variant,
+        is_endlist=playlist.is_endlist,
+        playlist_type=playlist.playlist_type,
+        target_duration=playlist.target_duration,
+        media_sequence=playlist.media_sequence,
+        segments=len(playlist.segments),
+        duration=sum(segment.duration or 0 for segment in playlist.segments),
+        playlists=len(playlist.playlists),
+    )
+
+
+def parse_many(
+    sources,
+    workers=None,
+    chunksize=16,
+    strict=False,
+    full=False,
+    ordered=True,
+    custom_tags_parser=None,
+    transform=None,
+):
+    """
+    Parses many playlists in a pool of `workers` processes, one per CPU by
+    default, and yields a ParseResult for each of them.
+
+    `sources` is an iterable of playlist file paths and playlist contents:
+    PlaylistContent objects and strings starting with #EXTM3U are contents,
+    anything else is a path.
+    It is consumed as results are yielded, so it may be a generator over
+    a large archive. Sources are sent to the workers by `chunksize`.
+
+    Results hold a PlaylistSummary of each playlist, or the whole M3U8
+    object when `full` is true, or what `transform` returns when called
+    with the M3U8 object in the worker. They are yielded in the order of
+    `sources`, or as soon as they are ready when `ordered` is false. Any
+    error raised while reading or parsing a playlist, e.g. a KeyError on a
+    malformed tag or a failed strict validation, is reported in its result
+    and the others are still parsed. Errors raised by `transform` are
+    raised.
+
+    `custom_tags_parser` and `transform` must be picklable, e.g. module
+    level functions. With `workers=0` playlists are parsed in the calling
+    process.
+    """
+    chunks = _chunks(sources, chunksize)
+    parse_chunk = partial(
+        _parse_chunk,
+        strict=strict,
+        custom_tags_parser=custom_tags_parser,
+        transform=transform or (None if full else summarize),
+    )
+
+    if workers == 0:
+        for chunk in chunks:
+            yield from parse_chunk(chunk)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    # Only a few chunks per worker are submitted ahead, so that results
+    # are streamed without reading all the sources first.
+    max_pending = workers * 2
+    with ProcessPoolExecutor(workers) as executor:
+        if ordered:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(parse_chunk, chunk))
+                if len(pending) >= max_pending:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        else:
+            pending = set()
+            for chunk in chunks:
+                pending.add(executor.submit(parse_chunk, chunk))
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from future.result()
+            for future in _as_completed(pending):
+                yield from future.result()
+
+
+def _as_completed(futures):
+    while futures:
+        done, futures = wait(futures, return_when=FIRST_COMPLETED)
+        yield from done
+
+
+def _chunks(sources, chunksize):
+    sources = enumerate(sources)
+    while True:
+        chunk = list(islice(sources, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _parse_chunk(chunk, strict, custom_tags_parser, transform):
+    # Imported here, m3u8 imports this module.
+    from m3u8 import _load_from_file
+
+    factory = partial(M3U8, strict=strict)
+    results = []
+    for index, source in chunk:
+        if isinstance(source, PlaylistContent):
+            content, path = source.content, None
+        elif isinstance(source, str) and source.lstrip().startswith("#EXTM3U"):
+            content, path = source, None
+        else:
+            content, path = None, source
+        try:
+            if content is not None:
+                playlist = factory(content, custom_tags_parser=custom_tags_parser)
+            else:
+                playlist = _load_from_file(os.fspath(path), custom_tags_parser, factory)
+        except Exception as error:
+            # The parser raises about any error on malformed playlists, they
+            # are all reported for the playlist.
+            results.append(ParseResult(index, path, None, _picklable(error)))
+            continue
+        if transform is not None:
+            playlist = transform(playlist)
+        results.append(ParseResult(index, path, playlist, None))
+    return results
+
+
+def _picklable(error):
+    # Errors are sent back from the workers, which fails for exceptions that
+    # can't be pickled: those are replaced by a plain exception.
+    try:
+        pickle.loads(pickle.dumps(error))
+    except Exception:
+        return Exception(f"{type(error).__name__}: {error}")
+    return error
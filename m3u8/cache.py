@@ -0,0 +1,115 @@
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+import threading
+from collections import OrderedDict, namedtuple
+
+from m3u8.model import M3U8
+from m3u8.parser import TagRegistry, parse
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class ParseCache:
+    """
+    Bounded LRU cache of parse results, for services parsing the same
+    playlist text over and over.
+
+    Entries are keyed by the playlist content together with the `strict`,
+    `custom_tags_parser`, `lazy`, `lossless` and `keep_unknown_tags`
+    arguments. The content string itself is the key, so
+    lookups cost one hash of the string (cached by Python on the string
+    object) and, on a hit, one comparison.
+
+    `parse` returns the cached dictionary itself, shared between callers,
+    which must not be modified. `M3U8` builds a new M3U8 object from a copy
+    of the dictionaries and lists of the cached data on every call, so
+    callers may modify the objects they get, and their `data`, without
+    affecting each other, while skipping the parsing step.
+
+    It is safe to share an instance between threads.
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def parse(
+        self,
+        content,
+        strict=False,
+        custom_tags_parser=None,
+        lazy=False,
+        lossless=False,
+        keep_unknown_tags=False,
+    ):
+        key = (content, strict, custom_tags_parser, lazy, lossless, keep_unknown_tags)
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+            self.misses += 1
+
+        data = parse(
+            content,
+            strict,
+            custom_tags_parser,
+            lazy=lazy,
+            lossless=lossless,
+            keep_unknown_tags=keep_unknown_tags,
+        )
+
+        with self._lock:
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return data
+
+    def M3U8(
+        self,
+        content,
+        base_path=None,
+        base_uri=None,
+        strict=False,
+        custom_tags_parser=None,
+        lazy=False,
+        lossless=False,
+        keep_unknown_tags=False,
+    ):
+        """Same as the M3U8 constructor, reusing cached parse results."""
+        data = self.parse(
+            content, strict, custom_tags_parser, lazy, lossless, keep_unknown_tags
+        )
+        if not isinstance(custom_tags_parser, TagRegistry):
+            custom_tags_parser = None
+        return M3U8.from_dict(
+            _copy_containers(data), base_uri, base_path, custom_tags_parser
+        )
+
+    def cache_info(self):
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+def _copy_containers(value):
+    # Apart from the values of custom tags parsers, parse results only hold
+    # dictionaries, lists and immutable values, which are shared: this is
+    # much faster than copy.deepcopy.
+    if type(value) is dict:
+        return {key: _copy_containers(item) for key, item in value.items()}
+    if type(value) is list:
+        return [_copy_containers(item) for item in value]
+    return value
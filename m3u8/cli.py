@@ -0,0 +1,340 @@
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+"""
+The m3u8 command, to inspect and transform many playlists at once:
+
+    m3u8 summary playlists/*.m3u8
+    m3u8 validate --quiet playlists/*.m3u8
+    find archive -name '*.m3u8' | m3u8 dump --files-from - \\
+        --host origin.example.com cdn.example.com --output-dir rewritten
+    curl -s https://example.com/index.m3u8 | m3u8 json -
+
+Playlists are parsed in a pool of processes, see `m3u8.parse_many`, and
+results are written as soon as they are ready.
+"""
+
+import argparse
+import json
+import os
+import sys
+from functools import lru_cache, partial
+
+from m3u8.bulk import PlaylistContent, parse_many
+from m3u8.rewrite import URIRewriter
+
+STDIN = "<stdin>"
+
+
+def inspect(playlist):
+    """Returns a dictionary summarizing a M3U8 object."""
+    keys = [key for key in playlist.keys if key is not None]
+    ad_breaks = playlist.ad_breaks()
+    return {
+        "version": playlist.version,
+        "is_variant": playlist.is_variant,
+        "is_endlist": playlist.is_endlist,
+        "playlist_type": playlist.playlist_type,
+        "target_duration": playlist.target_duration,
+        "media_sequence": playlist.media_sequence,
+        "segments": len(playlist.segments),
+        "duration": round(
+            sum(segment.duration or 0 for segment in playlist.segments), 3
+        ),
+        "bandwidths": sorted(
+            {
+                variant.stream_info.bandwidth
+                for variant in playlist.playlists
+                if variant.stream_info.bandwidth is not None
+            }
+        ),
+        "media": len(playlist.media),
+        "keys": len(keys),
+        "key_methods": sorted({key.method for key in keys}),
+        "ad_breaks": len(ad_breaks),
+        "ad_duration": round(sum(ad_break.duration for ad_break in ad_breaks), 3),
+    }
+
+
+def _validated(playlist):
+    return None
+
+
+def _dump(rules, playlist):
+    if rules:
+        return _rewriter(rules).dumps(playlist)
+    return playlist.dumps()
+
+
+def _to_json(playlist):
+    return playlist.to_json()
+
+
+@lru_cache(maxsize=None)
+def _rewriter(rules):
+    # Rewriters hold closures which can't be sent to the workers, so each
+    # worker builds its own from the rules given on the command line.
+    rewriter = URIRewriter()
+    for name, arguments in rules:
+        if name == "query":
+            rewriter.query(dict(arguments))
+        else:
+            getattr(rewriter, name)(*arguments)
+    return rewriter
+
+
+def summary(args, results, labels):
+    failed = False
+    for result in results:
+        label = labels.pop(result.index)
+        if result.error is not None:
+            failed = True
+            _report_error(label, result.error)
+            continue
+        line = json.dumps({"source": label, **result.playlist})
+        sys.stdout.write(line + "\n")
+    return failed
+
+
+def validate(args, results, labels):
+    failed = False
+    for result in results:
+        label = labels.pop(result.index)
+        if result.error is not None:
+            failed = True
+            _report_error(label, result.error, sys.stdout)
+        elif not args.quiet:
+            sys.stdout.write(f"{label}: ok\n")
+    return failed
+
+
+def dump(args, results, labels):
+    failed = False
+    written = set()
+    for result in results:
+        label = labels.pop(result.index)
+        if result.error is not None:
+            failed = True
+            _report_error(label, result.error)
+        elif args.output_dir:
+            path = _output_path(args.output_dir, label)
+            if path in written:
+                failed = True
+                sys.stderr.write(f"{label}: {path} was already written\n")
+                continue
+            written.add(path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as fileobj:
+                fileobj.write(result.playlist)
+        else:
+            sys.stdout.write(result.playlist)
+    return failed
+
+
+def _output_path(output_dir, label):
+    # Playlists keep their path in the output directory, so that the ones
+    # with the same file name in different directories don't overwrite each
+    # other. Drives, roots and parent directories are left out, to stay in
+    # the output directory.
+    if label == STDIN:
+        return os.path.join(output_dir, "stdin.m3u8")
+    path = os.path.splitdrive(os.path.normpath(label))[1]
+    parts = [part for part in path.split(os.sep) if part not in ("", os.pardir)]
+    return os.path.join(output_dir, *parts)
+
+
+def to_json(args, results, labels):
+    failed = False
+    for result in results:
+        label = labels.pop(result.index)
+        if result.error is not None:
+            failed = True
+            _report_error(label, result.error)
+        else:
+            sys.stdout.write(result.playlist + "\n")
+    return failed
+
+
+def _report_error(label, error, stream=None):
+    stream = stream or sys.stderr
+    errors = error.args[0] if error.args else None
+    if not isinstance(errors, list):
+        errors = [error]
+    for error in errors:
+        if hasattr(error, "line_number"):
+            message = f"line {error.line_number}: {error.description}"
+        else:
+            message = str(error) or type(error).__name__
+        stream.write(f"{label}: {message}\n")
+
+
+def _sources(args, labels):
+    # Labels are kept until the result of their source is written, so that
+    # paths read from --files-from are never all held in memory.
+    paths = _read_paths(args.files_from) if args.files_from else args.paths
+    for index, path in enumerate(paths):
+        if path == "-":
+            labels[index] = STDIN
+            yield PlaylistContent(sys.stdin.read())
+        else:
+            labels[index] = path
+            yield path
+
+
+def _read_paths(files_from):
+    if files_from == "-":
+        yield from _stripped_lines(sys.stdin)
+    else:
+        with open(files_from) as lines:
+            yield from _stripped_lines(lines)
+
+
+def _stripped_lines(lines):
+    for line in lines:
+        path = line.strip()
+        if path:
+            yield path
+
+
+def _rules(args):
+    rules = []
+    for old, new in args.prefix or ():
+        rules.append(("prefix", (old, new)))
+    for old, new in args.host or ():
+        rules.append(("host", (old, new)))
+    if args.query:
+        params = tuple(tuple(param.partition("=")[::2]) for param in args.query)
+        rules.append(("query", params))
+    return tuple(rules)
+
+
+def _parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "paths",
+        nargs="*",
+        metavar="PATH",
+        help="playlist files, - reads a playlist from the standard input",
+    )
+    common.add_argument(
+        "--files-from",
+        metavar="FILE",
+        help="read playlist paths from FILE, one per line, - for the standard input",
+    )
+    common.add_argument(
+        "--strict",
+        action="store_true",
+        help="fail on playlists breaking the version matching rules",
+    )
+    common.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        help="number of worker processes, one per CPU by default, 0 for none",
+    )
+    common.add_argument(
+        "--chunksize",
+        type=int,
+        default=16,
+        help="number of playlists sent to a worker at once",
+    )
+    common.add_argument(
+        "--unordered",
+        action="store_true",
+        help="write results as soon as they are ready",
+    )
+
+    parser = argparse.ArgumentParser(
+        prog="m3u8", description="Inspect and transform HLS playlists."
+    )
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+    commands.required = True
+
+    command = commands.add_parser(
+        "summary",
+        parents=[common],
+        help="write a JSON summary of each playlist, one per line",
+    )
+    command.set_defaults(handler=summary, transform=inspect)
+
+    command = commands.add_parser(
+        "validate",
+        parents=[common],
+        help="check that playlists parse and follow the version matching rules",
+    )
+    command.add_argument(
+        "-q", "--quiet", action="store_true", help="only report invalid playlists"
+    )
+    command.set_defaults(handler=validate, transform=_validated, strict=True)
+
+    command = commands.add_parser(
+        "dump", parents=[common], help="parse and dump playlists again"
+    )
+    command.add_argument(
+        "-o",
+        "--output-dir",
+        help="write playlists in this directory, at their path without its root "
+        "and parent directories, instead of the standard output",
+    )
+    command.add_argument(
+        "--prefix",
+        nargs=2,
+        action="append",
+        metavar=("OLD", "NEW"),
+        help="replace the OLD prefix of URIs with NEW",
+    )
+    command.add_argument(
+        "--host",
+        nargs=2,
+        action="append",
+        metavar=("OLD", "NEW"),
+        help="replace the OLD host of absolute URIs with NEW",
+    )
+    command.add_argument(
+        "--query",
+        action="append",
+        metavar="NAME=VALUE",
+        help="append a query parameter to URIs",
+    )
+    command.set_defaults(handler=dump)
+
+    command = commands.add_parser(
+        "json",
+        parents=[common],
+        help="write each playlist as JSON, one per line",
+    )
+    command.set_defaults(handler=to_json, transform=_to_json)
+    return parser
+
+
+def main(argv=None):
+    """Runs the m3u8 command and returns its exit status."""
+    parser = _parser()
+    args = parser.parse_args(argv)
+    if not args.paths and not args.files_from:
+        parser.error("no playlist given")
+    if args.command == "dump":
+        args.transform = partial(_dump, _rules(args))
+
+    workers = args.workers
+    if workers is None and not args.files_from and len(args.paths) <= args.chunksize:
+        # A pool isn't worth starting for a single chunk.
+        workers = 0
+
+    labels = {}
+    results = parse_many(
+        _sources(args, labels),
+        workers=workers,
+        chunksize=args.chunksize,
+        strict=args.strict,
+        ordered=not args.unordered,
+        transform=args.transform,
+    )
+    try:
+        failed = args.handler(args, results, labels)
+    except BrokenPipeError:
+        # The output was closed early, e.g. piped to head.
+        sys.stderr.close()
+        return 1
+    return 1 if failed else 0
@@ -0,0 +1,240 @@
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+"""
+Read-only playlists, safe to share between threads without copying.
+
+Freezing switches every object of a playlist to a generated subclass of its
+class which refuses attribute assignment, list subclasses such as
+SegmentList refuse modification as well, plain lists become tuples and
+plain dictionaries become read-only mappings. Since a frozen object can no
+longer change, its read-only properties (e.g. `absolute_uri`) are computed
+once and cached.
+"""
+
+from functools import cached_property, update_wrapper
+from types import MappingProxyType
+
+
+class FrozenPlaylistError(AttributeError):
+    pass
+
+
+class FrozenMixin:
+    def __reduce_ex__(self, protocol):
+        # Frozen classes are generated and can't be pickled by reference:
+        # pickle a mutable copy instead, frozen again when unpickled.
+        return freeze, (thaw(self),)
+
+    def __setattr__(self, name, value):
+        raise FrozenPlaylistError(
+            f"cannot set {name!r}: {type(self).__name__} is frozen"
+        )
+
+    def __delattr__(self, name):
+        raise FrozenPlaylistError(
+            f"cannot delete {name!r}: {type(self).__name__} is frozen"
+        )
+
+
+def _refuse(name):
+    def method(self, *args, **kwargs):
+        raise FrozenPlaylistError(f"cannot {name}: {type(self).__name__} is frozen")
+
+    method.__name__ = name
+    return method
+
+
+class FrozenListMixin(FrozenMixin):
+    __hash__ = None
+
+    append = _refuse("append")
+    extend = _refuse("extend")
+    insert = _refuse("insert")
+    remove = _refuse("remove")
+    pop = _refuse("pop")
+    clear = _refuse("clear")
+    sort = _refuse("sort")
+    reverse = _refuse("reverse")
+    __setitem__ = _refuse("__setitem__")
+    __delitem__ = _refuse("__delitem__")
+    __iadd__ = _refuse("__iadd__")
+    __imul__ = _refuse("__imul__")
+    mutable = _refuse("mutable")
+    _replace_attributes = _refuse("_replace_attributes")
+
+
+_frozen_classes = {}
+_thawed_classes = {}
+_thaw_plans = {}
+
+
+def frozen_class(cls):
+    """Returns the frozen counterpart of a model class."""
+    try:
+        return _frozen_classes[cls]
+    except KeyError:
+        pass
+
+    mixin = FrozenListMixin if issubclass(cls, list) else FrozenMixin
+    namespace = {"__module__": cls.__module__}
+    for klass in reversed(cls.__mro__):
+        for name, attribute in vars(klass).items():
+            if isinstance(attribute, property):
+                if attribute.fget is not None and attribute.fset is None:
+                    namespace[name] = cached_property(attribute.fget)
+                else:
+                    namespace.pop(name, None)
+    for name in getattr(cls, "frozen_cached_methods", ()):
+        namespace[name] = _cached_method(getattr(cls, name))
+
+    cached_names = {
+        name for name, value in namespace.items() if isinstance(value, cached_property)
+    }
+    cached_names.update(
+        "_cached_" + name for name in getattr(cls, "frozen_cached_methods", ())
+    )
+    namespace["_frozen_cached_names"] = frozenset(cached_names)
+
+    frozen = type("Frozen" + cls.__name__, (mixin, cls), namespace)
+    _frozen_classes[cls] = frozen
+    _thawed_classes[frozen] = cls
+    return frozen
+
+
+def _cached_method(method):
+    name = "_cached_" + method.__name__
+
+    def wrapper(self):
+        try:
+            return self.__dict__[name]
+        except KeyError:
+            value = self.__dict__[name] = freeze(method(self))
+            return value
+
+    return update_wrapper(wrapper, method)
+
+
+def is_frozen(obj):
+    return isinstance(obj, FrozenMixin)
+
+
+def thaw(obj, shallow=False):
+    """
+    Returns a mutable shallow copy of a model object or list, frozen or not.
+
+    The attributes named in the class' `copy_on_write_children` are copied
+    the same way, and the lists, dictionaries and sets held by the other
+    attributes are copied, with the ones they hold, except for those named
+    in `copy_on_write_shared`. Everything else is shared with ``obj``. Tag
+    lists in the copy replace the items still shared with ``obj`` by
+    copies the first time they are asked for through their `mutable`
+    method.
+
+    With `shallow` every attribute is shared with ``obj``, so only the
+    attributes themselves may be assigned in the copy.
+    """
+    if type(obj) in (list, tuple):
+        return list(obj)
+    if type(obj) in (dict, MappingProxyType):
+        return dict(obj)
+
+    try:
+        cls, cached_names, children, shared, is_list = _thaw_plans[type(obj)]
+    except KeyError:
+        cls, cached_names, children, shared, is_list = _thaw_plans[type(obj)] = (
+            _thawed_classes.get(type(obj), type(obj)),
+            getattr(obj, "_frozen_cached_names", ()),
+            getattr(obj, "copy_on_write_children", ()),
+            frozenset(getattr(obj, "copy_on_write_shared", ())),
+            isinstance(obj, list),
+        )
+
+    copy = cls.__new__(cls)
+    state = copy.__dict__
+    state.update(obj.__dict__)
+    for name in cached_names:
+        state.pop(name, None)
+    if is_list:
+        list.extend(copy, obj)
+        state["_owned"] = set()
+    if shallow:
+        return copy
+    for name, value in state.items():
+        if type(value) in _CONTAINERS and name not in shared:
+            state[name] = _copy_container(value)
+    for name in children:
+        child = state.get(name)
+        if child is not None and type(child) not in _CONTAINERS:
+            state[name] = thaw(child)
+    return copy
+
+
+_CONTAINERS = frozenset((list, dict, set, MappingProxyType))
+
+
+def _copy_container(value):
+    # Mutable copy of a container attribute, and of the containers in it,
+    # read-only mappings of frozen objects included.
+    if type(value) is list:
+        return [_copy_container(item) for item in value]
+    if type(value) is dict or type(value) is MappingProxyType:
+        return {key: _copy_container(item) for key, item in value.items()}
+    if type(value) is set:
+        return set(value)
+    return value
+
+
+def picklable(value):
+    """
+    Returns `value` with the read-only mappings of frozen objects, which
+    can't be pickled, turned into dictionaries.
+    """
+    if type(value) is tuple:
+        return tuple(picklable(item) for item in value)
+    if type(value) is MappingProxyType:
+        return {key: picklable(item) for key, item in value.items()}
+    return value
+
+
+def freeze(obj):
+    """
+    Freezes ``obj`` and everything it refers to, in place. Returns the frozen
+    object, which is a new tuple or mapping for plain lists and dictionaries.
+    """
+    return _freeze(obj, {})
+
+
+def _freeze(value, seen):
+    if value is None or isinstance(value, (str, int, float, FrozenMixin)):
+        return value
+
+    if id(value) in seen:
+        return seen[id(value)]
+
+    if type(value) in (list, tuple):
+        frozen = seen[id(value)] = tuple(_freeze(item, seen) for item in value)
+        return frozen
+
+    if type(value) is set:
+        return frozenset(value)
+
+    if type(value) is dict:
+        frozen = seen[id(value)] = MappingProxyType(
+            {key: _freeze(item, seen) for key, item in value.items()}
+        )
+        return frozen
+
+    if not hasattr(value, "__dict__") or not type(value).__module__.startswith("m3u8."):
+        return value
+
+    seen[id(value)] = value
+    if isinstance(value, list):
+        for i, item in enumerate(value):
+            list.__setitem__(value, i, _freeze(item, seen))
+    attributes = value.__dict__
+    for name, item in attributes.items():
+        attributes[name] = _freeze(item, seen)
+    object.__setattr__(value, "__class__", frozen_class(type(value)))
+    return value
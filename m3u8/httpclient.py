@@ -3,6 +3,8 @@ import ssl
 import urllib.request
 from urllib.parse import urljoin
 
+from m3u8 import metrics
+
 
 class DefaultHTTPClient:
     def __init__(self, proxies=None):
@@ -13,17 +15,16 @@ class DefaultHTTPClient:
         https_handler = HTTPSHandler(verify_ssl=verify_ssl)
         opener = urllib.request.build_opener(proxy_handler, https_handler)
         opener.addheaders = headers.items()
-        resource = opener.open(uri, timeout=timeout)
+        with metrics.timed(metrics.HTTP_FETCH_SECONDS):
+            resource = opener.open(uri, timeout=timeout)
+            body = resource.read()
+        metrics.observe(metrics.HTTP_RESPONSE_BYTES, len(body))
         base_uri = urljoin(resource.geturl(), ".")
 
         if resource.info().get("Content-Encoding") == "gzip":
-            content = gzip.decompress(resource.read()).decode(
-                resource.headers.get_content_charset(failobj="utf-8")
-            )
-        else:
-            content = resource.read().decode(
-                resource.headers.get_content_charset(failobj="utf-8")
-            )
+            with metrics.timed(metrics.DECOMPRESS_SECONDS):
+                body = gzip.decompress(body)
+        content = body.decode(resource.headers.get_content_charset(failobj="utf-8"))
         return content, base_uri
 
 
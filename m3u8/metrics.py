@@ -0,0 +1,194 @@
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+"""
+Operational metrics of loading, parsing and dumping playlists.
+
+The library reports the duration and size of each stage it runs to the
+recorder set with `set_recorder`, any object with an `observe(name,
+value)` method. Nothing is measured while no recorder is set.
+
+    recorder = InMemoryMetrics()
+    metrics.set_recorder(recorder)
+    ...
+    print(recorder.to_prometheus())
+
+The metrics reported, and their description, are listed in METRICS.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+
+SECONDS_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+COUNT_BUCKETS = (1, 10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000)
+
+HTTP_FETCH_SECONDS = "http_fetch_seconds"
+HTTP_RESPONSE_BYTES = "http_response_bytes"
+DECOMPRESS_SECONDS = "decompress_seconds"
+LOAD_SECONDS = "load_seconds"
+PARSE_SECONDS = "parse_seconds"
+BUILD_SECONDS = "build_seconds"
+DUMP_SECONDS = "dump_seconds"
+SEGMENTS = "segments"
+
+# Description and histogram buckets of each metric.
+METRICS = {
+    HTTP_FETCH_SECONDS: (
+        "Time spent downloading playlists, until the whole body is read.",
+        SECONDS_BUCKETS,
+    ),
+    HTTP_RESPONSE_BYTES: (
+        "Size of downloaded playlists, before decompression.",
+        BYTES_BUCKETS,
+    ),
+    DECOMPRESS_SECONDS: (
+        "Time spent decompressing gzip encoded playlists.",
+        SECONDS_BUCKETS,
+    ),
+    LOAD_SECONDS: (
+        "Time spent by m3u8.load, from the request to the M3U8 object.",
+        SECONDS_BUCKETS,
+    ),
+    PARSE_SECONDS: ("Time spent parsing playlist text.", SECONDS_BUCKETS),
+    BUILD_SECONDS: (
+        "Time spent building M3U8 objects from parsed playlists.",
+        SECONDS_BUCKETS,
+    ),
+    DUMP_SECONDS: ("Time spent dumping M3U8 objects to text.", SECONDS_BUCKETS),
+    SEGMENTS: ("Number of segments of the M3U8 objects built.", COUNT_BUCKETS),
+}
+
+recorder = None
+
+
+def set_recorder(new_recorder):
+    """
+    Sets the object metrics are reported to, None to stop reporting them.
+    Returns the previous recorder.
+    """
+    global recorder
+    previous, recorder = recorder, new_recorder
+    return previous
+
+
+def get_recorder():
+    return recorder
+
+
+def observe(name, value):
+    """Reports `value` for the metric `name`, if a recorder is set."""
+    if recorder is not None:
+        recorder.observe(name, value)
+
+
+class timed:
+    """
+    Context manager reporting the time spent in its block to the metric
+    `name`, unless the block raises.
+    """
+
+    __slots__ = ("name", "recorder", "start")
+
+    def __init__(self, name):
+        self.name = name
+        self.recorder = recorder
+
+    def __enter__(self):
+        if self.recorder is not None:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.recorder is not None and exc_type is None:
+            self.recorder.observe(self.name, time.perf_counter() - self.start)
+
+
+class Histogram:
+    """Counts of the values observed for a metric, by bucket upper bound."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative_counts(self):
+        """Returns (upper bound, count) pairs, ending with infinity."""
+        total = 0
+        pairs = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+
+class InMemoryMetrics:
+    """
+    A recorder aggregating metrics in histograms, with the buckets listed
+    in METRICS. Metrics with other names are aggregated with `buckets`.
+    It is safe to share an instance between threads.
+    """
+
+    def __init__(self, buckets=SECONDS_BUCKETS):
+        self.default_buckets = buckets
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, value):
+        with self._lock:
+            try:
+                histogram = self.histograms[name]
+            except KeyError:
+                buckets = METRICS.get(name, (None, self.default_buckets))[1]
+                histogram = self.histograms[name] = Histogram(buckets)
+            histogram.observe(value)
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+
+    def to_prometheus(self, prefix="m3u8_"):
+        """Returns the histograms in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, histogram in sorted(self.histograms.items()):
+                metric = prefix + name
+                description = METRICS.get(name, (name,))[0]
+                lines.append(f"# HELP {metric} {description}")
+                lines.append(f"# TYPE {metric} histogram")
+                for bound, count in histogram.cumulative_counts():
+                    lines.append(f'{metric}_bucket{{le="{_format(bound)}"}} {count}')
+                lines.append(f"{metric}_sum {_format(histogram.sum)}")
+                lines.append(f"{metric}_count {histogram.count}")
+        return "".join(line + "\n" for line in lines)
+
+
+def _format(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
@@ -1,22 +1,81 @@
+from functools import lru_cache
 from os.path import dirname
-from urllib.parse import urljoin, urlsplit
+from urllib.parse import urljoin, urlsplit, urlunsplit
 
+from m3u8.frozen import is_frozen, thaw
+from m3u8.pickling import PicklingMixin
 
-class BasePathMixin:
+
+@lru_cache(maxsize=1024)
+def _split_base_uri(base_uri):
+    """
+    Returns whether `base_uri` is a local path and, for http(s) base URIs
+    whose path urljoin wouldn't normalize, the prefix that relative URIs made
+    of a plain path are resolved against.
+    """
+    parts = urlsplit(base_uri)
+    is_local = not parts.scheme and not parts.netloc
+    prefix = None
+    if (
+        parts.scheme in ("http", "https")
+        and parts.netloc
+        and "/." not in parts.path
+        and "//" not in parts.path
+    ):
+        directory = parts.path[: parts.path.rfind("/") + 1] or "/"
+        prefix = urlunsplit((parts.scheme, parts.netloc, directory, "", ""))
+    return is_local, prefix
+
+
+def _is_plain_relative_path(uri):
+    path = uri.split("?", 1)[0].split("#", 1)[0]
+    return (
+        path != ""
+        and path[0] > " "
+        and path[0] not in "/."
+        and ":" not in path
+        and "/." not in path
+        and "//" not in path
+        and "\t" not in uri
+        and "\r" not in uri
+        and "\n" not in uri
+    )
+
+
+def resolve_uri(base_uri, uri):
+    """Returns `uri` made absolute using `base_uri`."""
+    if base_uri:
+        is_local, prefix = _split_base_uri(base_uri)
+        if prefix is not None and _is_plain_relative_path(uri):
+            return prefix + uri
+        ret = urljoin(base_uri, uri)
+        if is_local:
+            return ret
+    else:
+        ret = urljoin(base_uri, uri)
+
+    if not urlsplit(ret).scheme:
+        raise ValueError("There can not be `absolute_uri` with no `base_uri` set")
+
+    return ret
+
+
+class BasePathMixin(PicklingMixin):
     @property
     def absolute_uri(self):
-        if self.uri is None:
+        uri = self.uri
+        if uri is None:
             return None
 
-        ret = urljoin(self.base_uri, self.uri)
-        if self.base_uri:
-            base_uri_parts = urlsplit(self.base_uri)
-            if (not base_uri_parts.scheme) and (not base_uri_parts.netloc):
-                return ret
-
-        if not urlsplit(ret).scheme:
-            raise ValueError("There can not be `absolute_uri` with no `base_uri` set")
+        # Memoized for the current uri and base_uri, so changing either of
+        # them invalidates it.
+        base_uri = self.base_uri
+        cached = self.__dict__.get("_absolute_uri")
+        if cached is not None and cached[0] == uri and cached[1] == base_uri:
+            return cached[2]
 
+        ret = resolve_uri(base_uri, uri)
+        self.__dict__["_absolute_uri"] = (uri, base_uri, ret)
         return ret
 
     @property
@@ -38,15 +97,63 @@ class BasePathMixin:
                 self.uri = self.uri.replace(self.base_path, newbase_path)
 
 
-class GroupedBasePathMixin:
+class CopyOnWriteMixin:
+    def mutable(self, index):
+        """
+        Returns the item at `index`, ready to be modified in place.
+
+        The lists of a playlist copied with `M3U8.copy()` share their items
+        with the original playlist. The first time such an item is asked for
+        it is replaced by a copy owned by this list. Frozen items are
+        replaced by a mutable copy too.
+        """
+        item = self[index]
+        owned = self.__dict__.get("_owned")
+        if owned is None:
+            if not is_frozen(item):
+                return item
+        elif id(item) in owned:
+            return item
+
+        item = thaw(item)
+        list.__setitem__(self, index, item)
+        if owned is not None:
+            owned.add(id(item))
+        return item
+
+    def _replace_attributes(self, index, **attributes):
+        # Sets attributes of the item at `index` to other objects, e.g. a
+        # segment's URI and key. An item shared with the original playlist is
+        # replaced by a shallow copy, sharing its children, which is much
+        # cheaper than mutable(). The copy isn't owned: mutable() still
+        # copies it again, with its children, before changes in place.
+        item = self[index]
+        owned = self.__dict__.get("_owned")
+        if (owned is None and is_frozen(item)) or (
+            owned is not None and id(item) not in owned
+        ):
+            item = thaw(item, shallow=True)
+            list.__setitem__(self, index, item)
+            if owned is not None:
+                # In case the id of an owned item removed since is reused.
+                owned.discard(id(item))
+        for name, value in attributes.items():
+            setattr(item, name, value)
+
+
+class GroupedBasePathMixin(CopyOnWriteMixin):
+    def absolute_uris(self):
+        """Returns the `absolute_uri` of every item, in order."""
+        return [item.absolute_uri for item in self]
+
     def _set_base_uri(self, new_base_uri):
-        for item in self:
-            item.base_uri = new_base_uri
+        for index in range(len(self)):
+            self.mutable(index).base_uri = new_base_uri
 
     base_uri = property(None, _set_base_uri)
 
     def _set_base_path(self, newbase_path):
-        for item in self:
-            item.base_path = newbase_path
+        for index in range(len(self)):
+            self.mutable(index).base_path = newbase_path
 
     base_path = property(None, _set_base_path)
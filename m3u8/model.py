@@ -3,9 +3,15 @@
 # license that can be found in the LICENSE file.
 import decimal
 import os
-
-from m3u8.mixins import BasePathMixin, GroupedBasePathMixin
-from m3u8.parser import format_date_time, parse
+from datetime import datetime, timedelta
+from functools import lru_cache
+from types import MappingProxyType
+
+from m3u8 import metrics
+from m3u8.frozen import freeze, is_frozen, thaw
+from m3u8.mixins import BasePathMixin, CopyOnWriteMixin, GroupedBasePathMixin
+from m3u8.parser import TagRegistry, cast_date_time, format_date_time, parse
+from m3u8.pickling import TRANSIENT_ATTRIBUTES, ColumnsPicklingMixin, object_state
 from m3u8.protocol import (
     ext_oatcls_scte35,
     ext_x_asset,
@@ -14,6 +20,7 @@ from m3u8.protocol import (
     ext_x_session_key,
     ext_x_start,
 )
+from m3u8.timeline import TimelineIndex, find_ad_breaks
 
 
 class MalformedPlaylistError(Exception):
@@ -43,6 +50,27 @@ class M3U8:
       uri the playlist comes from. it is propagated to SegmentList and Key
       ex.: http://example.com/path/to
 
+     `lazy`
+      keeps the text of segment durations, converted to floats on access,
+      and dumps it back unchanged when the duration wasn't modified. The
+      dates of segments are computed on access too. This suits playlists
+      re-serialized without looking at their durations.
+
+     `keep_unknown_tags`
+      keeps the tags the library doesn't know, as lines, and `dumps` writes
+      them back, see `unknown_tags`.
+
+     `custom_tags_parser`
+      a function parsing the tags the library doesn't know, see parse(), or
+      a TagRegistry, kept as the `tag_registry` attribute to dump the tags
+      it has serializers for.
+
+     `lossless`
+      remembers the source lines of each segment, and of the tags before
+      and after the segments, and `dumps` writes them back as they were
+      for what wasn't modified since. The text then only changes where
+      the playlist did, at the cost of keeping the source lines around.
+
     Attributes:
 
      `keys`
@@ -136,8 +164,47 @@ class M3U8:
       `is_images_only`
         Returns true if EXT-X-IMAGES-ONLY tag present in M3U8.
         https://github.com/image-media-playlist/spec/blob/master/image_media_playlist_v0_4.pdf
+
+      `custom_parser_values`
+        Additional values which custom tags parsers might store for the
+        playlist, see `save_playlist_custom_value`
+
+      `unknown_tags`, `trailing_unknown_tags`
+        Tuples of the lines of the tags the library doesn't know, kept with
+        `keep_unknown_tags`, found before the first segment (or anywhere in
+        master playlists) and after the last one. They are dumped after the
+        other playlist tags, and before EXT-X-ENDLIST.
     """
 
+    # Methods whose results are cached once the playlist is frozen.
+    frozen_cached_methods = ("ad_breaks", "timeline_index")
+
+    # Attributes copied by copy(), the objects they hold are shared.
+    copy_on_write_children = (
+        "keys",
+        "session_keys",
+        "segment_map",
+        "segments",
+        "media",
+        "playlists",
+        "iframe_playlists",
+        "image_playlists",
+        "rendition_reports",
+        "session_data",
+        "files",
+        "start",
+        "server_control",
+        "part_inf",
+        "skip",
+        "preload_hint",
+        "content_steering",
+        "custom_parser_values",
+    )
+
+    # Attributes whose lists and dictionaries copy() leaves shared: the
+    # results of parsing, as parsed, which can be large.
+    copy_on_write_shared = ("data",)
+
     simple_attributes = (
         # obj attribute      # parser attribute
         ("is_variant", "is_variant"),
@@ -161,19 +228,42 @@ class M3U8:
         base_uri=None,
         strict=False,
         custom_tags_parser=None,
+        lazy=False,
+        lossless=False,
+        keep_unknown_tags=False,
     ):
         if content is not None:
-            self.data = parse(content, strict, custom_tags_parser)
+            with metrics.timed(metrics.PARSE_SECONDS):
+                self.data = parse(
+                    content,
+                    strict,
+                    custom_tags_parser,
+                    lazy=lazy,
+                    lossless=lossless,
+                    keep_unknown_tags=keep_unknown_tags,
+                )
         else:
             self.data = {}
+        self.tag_registry = None
+        if isinstance(custom_tags_parser, TagRegistry):
+            self.tag_registry = custom_tags_parser
         self._base_uri = base_uri
         if self._base_uri:
             if not self._base_uri.endswith("/"):
                 self._base_uri += "/"
 
-        self._initialize_attributes()
+        if content is not None:
+            self._build()
+        else:
+            self._initialize_attributes()
         self.base_path = base_path
 
+    def _build(self):
+        # Same as _initialize_attributes, reporting metrics.
+        with metrics.timed(metrics.BUILD_SECONDS):
+            self._initialize_attributes()
+        metrics.observe(metrics.SEGMENTS, len(self.segments))
+
     def _initialize_attributes(self):
         self.keys = [
             Key(base_uri=self.base_uri, **params) if params else None
@@ -183,11 +273,26 @@ class M3U8:
             InitializationSection(base_uri=self.base_uri, **params) if params else None
             for params in self.data.get("segment_map", [])
         ]
+        # Segments share the InitializationSection objects of segment_map, by
+        # URI and byterange, like they share the keys.
+        init_sections = {}
+        for init_section in self.segment_map:
+            if init_section:
+                init_sections.setdefault(
+                    (init_section.uri, init_section.byterange), init_section
+                )
+        program_date_times = ProgramDateTimes(
+            self.data.get("program_date_time_anchors", ())
+        )
         self.segments = SegmentList(
             [
                 Segment(
                     base_uri=self.base_uri,
                     keyobject=find_key(segment.get("key", {}), self.keys),
+                    init_section_object=find_init_section(
+                        segment.get("init_section"), init_sections, self.base_uri
+                    ),
+                    program_date_times=program_date_times,
                     **segment,
                 )
                 for segment in self.data.get("segments", [])
@@ -283,9 +388,67 @@ class M3U8:
             base_uri=self.base_uri, **content_steering
         )
 
+        self.custom_parser_values = self.data.get("custom_parser_values") or {}
+        self.unknown_tags = tuple(self.data.get("unknown_tags", ()))
+        self.trailing_unknown_tags = tuple(self.data.get("trailing_unknown_tags", ()))
+
+        source = self.data.get("source")
+        if source is not None:
+            self._keep_source(source)
+
+    def _keep_source(self, source):
+        # Lossless mode, see parse(). The header and trailer lines are
+        # dumped again as long as the tags they hold are unchanged.
+        lines = source["lines"]
+        previous = None
+        for segment, params in zip(self.segments, self.data.get("segments", ())):
+            span = params.get("source_span")
+            if span is not None:
+                segment._keep_source(lines, span[0], span[1], previous)
+            previous = (segment.key, segment.init_section)
+        if source["header_end"] is not None:
+            self._source = _Source(
+                lines,
+                source["header_end"],
+                source["trailer_start"],
+                None,
+                self._source_state(),
+            )
+
+    def _source_state(self):
+        state = self._tags_to_dict(segment_tags=False)
+        if self.tag_registry is not None:
+            tag_registry = self.tag_registry
+            state["custom_tags"] = tag_registry._dump(
+                tag_registry.playlist_serializers, self
+            )
+        return state
+
+    def _unchanged_source(self):
+        source = self.__dict__.get("_source")
+        if source is None or self._source_state() != source.state:
+            return None
+        return source
+
     def __unicode__(self):
         return self.dumps()
 
+    def __getstate__(self):
+        # `data` isn't pickled, see __getattr__.
+        return object_state(self, TRANSIENT_ATTRIBUTES | {"data"})
+
+    def __getattr__(self, name):
+        # Unpickled playlists rebuild `data` from the model, when needed.
+        if name != "data":
+            raise AttributeError(
+                f"{type(self).__name__!r} object has no attribute {name!r}"
+            )
+        data = self.to_dict()
+        if is_frozen(self):
+            data = freeze(data)
+        self.__dict__["data"] = data
+        return data
+
     @property
     def base_uri(self):
         return self._base_uri
@@ -296,15 +459,16 @@ class M3U8:
         self.media.base_uri = new_base_uri
         self.playlists.base_uri = new_base_uri
         self.iframe_playlists.base_uri = new_base_uri
+        self._own_init_sections()
         self.segments.base_uri = new_base_uri
         self.rendition_reports.base_uri = new_base_uri
         self.image_playlists.base_uri = new_base_uri
-        for key in self.keys:
+        for index, key in enumerate(self.keys):
             if key:
-                key.base_uri = new_base_uri
-        for key in self.session_keys:
+                self.mutable_key(index).base_uri = new_base_uri
+        for index, key in enumerate(self.session_keys):
             if key:
-                key.base_uri = new_base_uri
+                self._mutable_session_key(index).base_uri = new_base_uri
         if self.preload_hint:
             self.preload_hint.base_uri = new_base_uri
         if self.content_steering:
@@ -322,13 +486,14 @@ class M3U8:
     def _update_base_path(self):
         if self._base_path is None:
             return
-        for key in self.keys:
+        for index, key in enumerate(self.keys):
             if key:
-                key.base_path = self._base_path
-        for key in self.session_keys:
+                self.mutable_key(index).base_path = self._base_path
+        for index, key in enumerate(self.session_keys):
             if key:
-                key.base_path = self._base_path
+                self._mutable_session_key(index).base_path = self._base_path
         self.media.base_path = self._base_path
+        self._own_init_sections()
         self.segments.base_path = self._base_path
         self.playlists.base_path = self._base_path
         self.iframe_playlists.base_path = self._base_path
@@ -362,11 +527,265 @@ class M3U8:
     def add_rendition_report(self, report):
         self.rendition_reports.append(report)
 
+    def ad_breaks(self):
+        """
+        Returns the list of AdBreak objects found between EXT-X-CUE-OUT and
+        EXT-X-CUE-IN tags. Use `AdBreakTracker` to follow a live playlist
+        across refreshes.
+        """
+        return find_ad_breaks(self.segments)
+
+    def timeline_index(self):
+        """
+        Returns a TimelineIndex answering which dateranges and ad breaks
+        overlap a given time or media sequence range.
+        """
+        return TimelineIndex(self)
+
+    def copy(self):
+        """
+        Returns a copy of this playlist sharing its segments, playlists, keys
+        and other tags with it, which makes copying cheap even for large
+        playlists. The copy can be changed without affecting the original:
+
+        * assign new attribute values, or add and remove tags, as usual;
+        * to change a tag in place use the `mutable` method of its list, e.g.
+          `copy.segments.mutable(0).uri = "new.ts"`, which replaces a shared
+          tag by a copy of it first;
+        * use `mutable_key` to change a key, the segments using it are
+          updated to the new key. Keys and initialization sections are
+          shared by the segments using them and `mutable` doesn't copy them.
+
+        Setting `base_uri` or `base_path` copies every tag of the copy.
+        Copying a frozen playlist returns a mutable playlist. The lists and
+        dictionaries held by attributes, such as `custom_parser_values`, are
+        copied, except for `data`, which is shared and must not be modified.
+        """
+        copy = thaw(self)
+        copy._owned_keys = set()
+        return copy
+
+    def mutable_key(self, index):
+        """
+        Returns the key at `index` in `keys`, ready to be modified in place.
+        In a playlist made by copy() a key shared with the original playlist
+        is replaced by a copy first, in `keys` and in the segments using it.
+        """
+        key = self.keys[index]
+        new_key = self._own_key(self.keys, index)
+        if new_key is not key:
+            # Segments get a copy sharing their other attributes, their
+            # partial segments aren't copied.
+            segments = self.segments
+            for segment_index, segment in enumerate(segments):
+                if segment.key is key:
+                    segments._replace_attributes(segment_index, key=new_key)
+        return new_key
+
+    def _mutable_session_key(self, index):
+        return self._own_key(self.session_keys, index)
+
+    def _mutable_init_section(self, index):
+        return self._own_key(self.segment_map, index)
+
+    def _own_key(self, keys, index):
+        key = keys[index]
+        owned_key = self._own(key)
+        if owned_key is not key:
+            keys[index] = owned_key
+        return owned_key
+
+    def _own(self, tag):
+        # The tag, or a copy of it when it's shared with the original playlist
+        # of a copy, or frozen.
+        owned = self.__dict__.get("_owned_keys")
+        if owned is None:
+            if not is_frozen(tag):
+                return tag
+        elif id(tag) in owned:
+            return tag
+
+        tag = thaw(tag)
+        if owned is not None:
+            owned.add(id(tag))
+        return tag
+
+    def _own_init_sections(self):
+        # Replaces the initialization sections shared with the original
+        # playlist of a copy, in segment_map and in the segments, by copies
+        # made once each, before changing them through the segments.
+        init_sections = {}
+        for index, init_section in enumerate(self.segment_map):
+            if init_section is not None:
+                init_sections[id(init_section)] = (
+                    init_section,
+                    self._mutable_init_section(index),
+                )
+        segments = self.segments
+        for index, segment in enumerate(segments):
+            init_section = segment.init_section
+            if init_section is None:
+                continue
+            try:
+                new_section = init_sections[id(init_section)][1]
+            except KeyError:
+                new_section = self._own(init_section)
+                init_sections[id(init_section)] = (init_section, new_section)
+            if new_section is not init_section:
+                segments._replace_attributes(index, init_section=new_section)
+
+    def freeze(self):
+        """
+        Makes this playlist and everything in it read-only, so it can be
+        shared between threads without copies. Lists of tags become
+        unmodifiable, other lists become tuples and dictionaries read-only
+        mappings. Read-only properties such as `absolute_uri`, and the results
+        of `ad_breaks` and `timeline_index`, are computed once and cached.
+        Raises FrozenPlaylistError on any later modification. Returns self.
+        """
+        return freeze(self)
+
+    @property
+    def is_frozen(self):
+        return is_frozen(self)
+
+    @classmethod
+    def from_dict(cls, data, base_uri=None, base_path=None, tag_registry=None):
+        """
+        Returns the playlist described by `data`, as returned by `parse()` or
+        `to_dict()`, without parsing. `data` is kept as the `data` attribute
+        of the playlist, and `tag_registry` dumps its custom tags.
+        """
+        playlist = cls(base_uri=base_uri, custom_tags_parser=tag_registry)
+        playlist.data = data
+        playlist._build()
+        playlist.base_path = base_path
+        return playlist
+
+    def to_dict(self):
+        """
+        Returns the playlist as a dictionary with the same layout as the one
+        returned by `parse()`, which `from_dict` accepts. Unlike `data`, it
+        reflects the changes made to the playlist since it was parsed. Every
+        attribute is included, with None when unset. Base URI and base path
+        are not part of it.
+        """
+        data = self._tags_to_dict()
+        data["segments"] = [segment.to_dict() for segment in self.segments]
+        return data
+
+    def _tags_to_dict(self, segment_tags=True):
+        # Without `segment_tags`, only the tags dumped outside of segments.
+        data = {param: getattr(self, attr) for attr, param in self.simple_attributes}
+        if segment_tags:
+            keys = list(self.keys)
+            known_keys = {id(key) for key in keys}
+            for segment in self.segments:
+                # Segments may use keys missing from `keys`, which from_dict needs.
+                if segment.key is not None and id(segment.key) not in known_keys:
+                    keys.append(segment.key)
+                    known_keys.add(id(segment.key))
+            data["keys"] = [key and key.to_dict() for key in keys]
+        data["session_keys"] = [key and key.to_dict() for key in self.session_keys]
+        if segment_tags:
+            data["segment_map"] = [init and init.to_dict() for init in self.segment_map]
+        data.update(
+            media=[media.to_dict() for media in self.media],
+            playlists=[playlist.to_dict() for playlist in self.playlists],
+            iframe_playlists=[playlist.to_dict() for playlist in self.iframe_playlists],
+            image_playlists=[playlist.to_dict() for playlist in self.image_playlists],
+            rendition_reports=[report.to_dict() for report in self.rendition_reports],
+            session_data=[session_data.to_dict() for session_data in self.session_data],
+            start=self.start and self.start.to_dict(),
+            server_control=self.server_control and self.server_control.to_dict(),
+            part_inf=self.part_inf and self.part_inf.to_dict(),
+            skip=self.skip and self.skip.to_dict(),
+            preload_hint=self.preload_hint and self.preload_hint.to_dict(),
+            content_steering=self.content_steering and self.content_steering.to_dict(),
+            custom_parser_values=self.custom_parser_values,
+            unknown_tags=list(self.unknown_tags),
+            trailing_unknown_tags=list(self.trailing_unknown_tags),
+        )
+        return data
+
+    def iter_json(self, chunk_size=1000):
+        """
+        Yields `to_dict()` encoded as JSON, in chunks of `chunk_size`
+        segments, so large playlists can be written out without building
+        the whole dictionary or string first. Dates are encoded in ISO 8601
+        format.
+        """
+        encode = _json_encoder().encode
+        segments = self.segments
+        yield '{"segments":['
+        for start in range(0, len(segments), chunk_size):
+            chunk = [
+                segment.to_dict() for segment in segments[start : start + chunk_size]
+            ]
+            yield ("," if start else "") + encode(chunk)[1:-1]
+        yield "]," + encode(self._tags_to_dict())[1:]
+
+    def to_json(self):
+        """Returns `to_dict()` encoded as JSON, see `iter_json`."""
+        return "".join(self.iter_json())
+
+    def dump_json(self, fp):
+        """Writes `to_dict()` encoded as JSON to the file object `fp`."""
+        fp.writelines(self.iter_json())
+
+    @classmethod
+    def from_json(cls, content, base_uri=None, base_path=None):
+        """Returns the playlist encoded in `content` by `to_json`."""
+        import json
+
+        return cls.from_dict(
+            _decode_json_dates(json.loads(content)), base_uri, base_path
+        )
+
+    def to_snapshot(self):
+        """
+        Returns a compact binary snapshot of the parsed playlist, which
+        `from_snapshot` loads much faster than the playlist text is parsed.
+        The snapshot holds the parsed data and base URI: changes made to the
+        model objects after parsing are not included.
+        """
+        from m3u8 import snapshot
+
+        return snapshot.encode(self.data, self.base_uri)
+
+    @classmethod
+    def from_snapshot(cls, buffer, base_path=None):
+        """
+        Returns the playlist stored in a snapshot made by `to_snapshot`.
+        `buffer` may be bytes or any object supporting the buffer protocol,
+        such as a memory mapped file. Raises SnapshotError if `buffer` isn't
+        a snapshot, or was made by an incompatible version.
+        """
+        from m3u8 import snapshot
+
+        data, base_uri = snapshot.decode(buffer)
+        return cls.from_dict(data, base_uri, base_path)
+
     def dumps(self, timespec="milliseconds", infspec="auto"):
         """
         Returns the current m3u8 as a string.
         You could also use unicode(<this obj>) or str(<this obj>)
         """
+        with metrics.timed(metrics.DUMP_SECONDS):
+            return self._dumps(timespec, infspec)
+
+    def _dumps(self, timespec, infspec):
+        source = None
+        if timespec == "milliseconds" and infspec == "auto":
+            source = self._unchanged_source()
+        if source is not None:
+            output = list(source.lines[: source.start])
+            if self.segments:
+                output.append(self.segments.dumps(timespec, infspec, self.tag_registry))
+            output.extend(source.lines[source.end :])
+            output.append("")
+            return "\n".join(output)
+
         output = ["#EXTM3U"]
         if self.content_steering:
             output.append(str(self.content_steering))
@@ -414,7 +833,13 @@ class M3U8:
         for key in self.session_keys:
             output.append(str(key))
 
-        output.append(self.segments.dumps(timespec, infspec))
+        output.extend(self.unknown_tags)
+
+        if self.tag_registry is not None:
+            tag_registry = self.tag_registry
+            output.extend(tag_registry._dump(tag_registry.playlist_serializers, self))
+
+        output.append(self.segments.dumps(timespec, infspec, self.tag_registry))
 
         if self.preload_hint:
             output.append(str(self.preload_hint))
@@ -422,6 +847,8 @@ class M3U8:
         if self.rendition_reports:
             output.append(str(self.rendition_reports))
 
+        output.extend(self.trailing_unknown_tags)
+
         if self.is_endlist:
             output.append("#EXT-X-ENDLIST")
 
@@ -449,7 +876,198 @@ class M3U8:
             os.makedirs(basename, exist_ok=True)
 
 
-class Segment(BasePathMixin):
+class ProgramDateTimes:
+    """
+    The dates of the EXT-X-PROGRAM-DATE-TIME tags of a playlist. Segments
+    and partial segments are dated from the last tag before them: they keep
+    its index and their offset in seconds from it, and only build datetime
+    objects when their dates are asked for.
+    """
+
+    __slots__ = ("anchors", "_timestamps")
+
+    def __init__(self, anchors=()):
+        self.anchors = anchors
+        self._timestamps = None
+
+    def datetime(self, index, offset=0.0):
+        anchor = self.anchors[index]
+        return anchor + timedelta(seconds=offset) if offset else anchor
+
+    def timestamp(self, index, offset=0.0):
+        """Same as `datetime`, as a POSIX timestamp."""
+        if self._timestamps is None:
+            self._timestamps = [anchor.timestamp() for anchor in self.anchors]
+        return self._timestamps[index] + offset
+
+    def __reduce__(self):
+        return type(self), (self.anchors,)
+
+
+class SourceMixin:
+    """
+    Segments parsed in lossless mode keep the span of their source lines,
+    which are dumped in place of the segment as long as it's unchanged:
+    no attribute of the segment, or of the objects named in
+    `source_children`, was assigned or modified in place since parsing.
+    """
+
+    source_children = ()
+
+    def _keep_source(self, lines, start, end, previous):
+        state = [_saved_attributes(obj) for obj in _source_objects(self, [])]
+        self._source = _Source(lines, start, end, previous, state)
+
+    def _unchanged_source(self):
+        """
+        Returns the _Source of the segment, or None if the segment changed.
+        """
+        source = self.__dict__.get("_source")
+        if source is None:
+            return None
+        objects = _source_objects(self, [])
+        if len(objects) != len(source.state):
+            return None
+        for obj, state in zip(objects, source.state):
+            if not _unchanged_attributes(obj, *state):
+                return None
+        return source
+
+
+def _same_context(last_segment, previous):
+    if last_segment is None or previous is None:
+        return last_segment is previous
+    key, init_section = previous
+    return (last_segment.key is key or last_segment.key == key) and (
+        last_segment.init_section is init_section
+        or last_segment.init_section == init_section
+    )
+
+
+class _Source:
+    """
+    Where the source lines of a segment are, and what it was parsed with:
+    `previous` is the (key, init_section) of the segment before it, or None
+    for the first segment, and `state` the attributes of the segment and of
+    its children. For playlists, the lines before `start` and after `end`
+    are the tags around the segments, and `state` their values.
+    """
+
+    __slots__ = ("lines", "start", "end", "previous", "state")
+
+    def __init__(self, lines, start, end, previous, state):
+        self.lines = lines
+        self.start = start
+        self.end = end
+        self.previous = previous
+        self.state = state
+
+
+def _source_objects(obj, objects):
+    objects.append(obj)
+    for name in getattr(obj, "source_children", ()):
+        child = obj.__dict__.get(name)
+        if isinstance(child, (list, tuple)):
+            for item in child:
+                _source_objects(item, objects)
+        elif child is not None:
+            _source_objects(child, objects)
+    return objects
+
+
+def _saved_attributes(obj):
+    # Lists and dictionaries are copied as well, to notice changes made in
+    # place.
+    attributes = obj.__dict__
+    copies = {
+        name: value.copy()
+        for name, value in attributes.items()
+        if type(value) is list or type(value) is dict
+    }
+    return obj, attributes.copy(), copies
+
+
+def _unchanged_attributes(obj, saved_obj, saved, copies):
+    if obj is not saved_obj:
+        return False
+    attributes = obj.__dict__
+    if not saved.items() <= attributes.items():
+        # Freezing replaces lists by tuples and dictionaries by read-only
+        # mappings, with the same items.
+        for name, value in saved.items():
+            if name not in attributes or _thawed(attributes[name]) != value:
+                return False
+    for name, value in copies.items():
+        if _thawed(attributes.get(name)) != value:
+            return False
+    for name in getattr(obj, "computed_attributes", ()):
+        # Values computed on access and assigned since parsing.
+        if name not in saved and name in attributes:
+            if attributes[name] != obj._compute(name):
+                return False
+    return True
+
+
+def _thawed(value):
+    if type(value) is tuple:
+        return list(value)
+    if type(value) is MappingProxyType:
+        return dict(value)
+    return value
+
+
+class TimingMixin:
+    """
+    Computes the dates and duration of parsed segments and partial segments
+    on first access: `program_date_time` and `current_program_date_time`
+    from their `_program_date_time_anchor`, a (ProgramDateTimes, index,
+    offset, tagged) tuple, and `duration` from their `_duration_text`, both
+    kept by lazy parsing. Values assigned to them take precedence.
+    """
+
+    computed_attributes = ("duration", "program_date_time", "current_program_date_time")
+
+    def __getattr__(self, name):
+        if name not in self.computed_attributes:
+            raise AttributeError(
+                f"{type(self).__name__!r} object has no attribute {name!r}"
+            )
+        # Written to __dict__ directly, frozen objects can cache it too.
+        value = self.__dict__[name] = self._compute(name)
+        return value
+
+    def _compute(self, name):
+        if name == "duration":
+            text = self.__dict__.get("_duration_text")
+            return None if text is None else float(text)
+        anchor = self.__dict__.get("_program_date_time_anchor")
+        return None if anchor is None else self._anchored_date(name, *anchor)
+
+    def _duration_to_string(self):
+        # The original text, unless the duration was changed since parsing.
+        text = self.__dict__.get("_duration_text")
+        if text is not None:
+            duration = self.__dict__.get("duration", text)
+            if duration is text or duration == float(text):
+                return text
+        return number_to_string(self.duration)
+
+    def timestamp(self):
+        """
+        Returns the date of the segment, `current_program_date_time` or
+        `program_date_time` for partial segments, as a POSIX timestamp, or
+        None. No datetime is built if the date wasn't asked for yet.
+        """
+        name = self.timestamp_attribute
+        anchor = self.__dict__.get("_program_date_time_anchor")
+        if anchor is None or name in self.__dict__:
+            value = getattr(self, name)
+            return None if value is None else value.timestamp()
+        program_date_times, index, offset, _ = anchor
+        return program_date_times.timestamp(index, offset)
+
+
+class Segment(SourceMixin, TimingMixin, BasePathMixin):
     """
     A video segment from a M3U8 playlist
 
@@ -467,7 +1085,9 @@ class Segment(BasePathMixin):
     `current_program_date_time`
       Returns a datetime of this segment, either the value of `program_date_time`
       when EXT-X-PROGRAM-DATE-TIME is set or a calculated value based on previous
-      segments' EXT-X-PROGRAM-DATE-TIME and EXTINF values
+      segments' EXT-X-PROGRAM-DATE-TIME and EXTINF values. Both are computed
+      on first access for parsed playlists, `timestamp()` returns the latter
+      as a POSIX timestamp without building a datetime
 
     `discontinuity`
       Returns a boolean indicating if a EXT-X-DISCONTINUITY tag exists
@@ -494,6 +1114,11 @@ class Segment(BasePathMixin):
     `scte35_duration`
       Planned SCTE35 duration
 
+    `scte35_info` / `oatcls_scte35_info`
+      `scte35` and `oatcls_scte35` decoded as a `scte35.SpliceInfoSection`,
+      or None when absent. Decoding happens on access and is cached by
+      payload
+
     `duration`
       duration attribute from EXTINF parameter
 
@@ -520,8 +1145,21 @@ class Segment(BasePathMixin):
 
     `custom_parser_values`
         Additional values which custom_tags_parser might store per segment
+
+    `unknown_tags`
+        Tuple of the lines of the tags the library doesn't know preceding
+        the segment, kept with `keep_unknown_tags` and dumped before EXTINF
     """
 
+    # Attributes copied along with the segment by mutable(): the partial
+    # segments changed by setting base_uri or base_path, and the dateranges
+    # list. Keys and initialization sections are shared between segments and
+    # copied by the playlist, see M3U8.mutable_key.
+    copy_on_write_children = ("parts", "dateranges")
+
+    # Objects dumped along with the segment, see SourceMixin.
+    source_children = ("key", "init_section", "parts", "dateranges")
+
     def __init__(
         self,
         uri=None,
@@ -546,20 +1184,40 @@ class Segment(BasePathMixin):
         keyobject=None,
         parts=None,
         init_section=None,
+        init_section_object=None,
         dateranges=None,
         gap_tag=None,
         media_sequence=None,
         custom_parser_values=None,
+        program_date_time_anchor=None,
+        program_date_time_offset=0.0,
+        has_program_date_time=False,
+        program_date_times=None,
+        duration_text=None,
+        unknown_tags=(),
+        # Kept by M3U8 once the segment is complete, see SourceMixin.
+        source_span=None,
     ):
         self.media_sequence = media_sequence
         self.uri = uri
-        self.duration = duration
+        if duration_text is not None and duration is None:
+            self._duration_text = duration_text
+        else:
+            self.duration = duration
         self.title = title
         self._base_uri = base_uri
         self.bitrate = bitrate
         self.byterange = byterange
-        self.program_date_time = program_date_time
-        self.current_program_date_time = current_program_date_time
+        if program_date_time_anchor is not None and program_date_times is not None:
+            self._program_date_time_anchor = (
+                program_date_times,
+                program_date_time_anchor,
+                program_date_time_offset,
+                has_program_date_time,
+            )
+        else:
+            self.program_date_time = program_date_time
+            self.current_program_date_time = current_program_date_time
         self.discontinuity = discontinuity
         self.cue_out_start = cue_out_start
         self.cue_out_explicitly_duration = cue_out_explicitly_duration
@@ -572,11 +1230,20 @@ class Segment(BasePathMixin):
         self.asset_metadata = asset_metadata
         self.key = keyobject
         self.parts = PartialSegmentList(
-            [PartialSegment(base_uri=self._base_uri, **partial) for partial in parts]
+            [
+                PartialSegment(
+                    base_uri=self._base_uri,
+                    program_date_times=program_date_times,
+                    **partial,
+                )
+                for partial in parts
+            ]
             if parts
             else []
         )
-        if init_section is not None:
+        if init_section_object is not None:
+            self.init_section = init_section_object
+        elif init_section is not None:
             self.init_section = InitializationSection(self._base_uri, **init_section)
         else:
             self.init_section = None
@@ -585,14 +1252,66 @@ class Segment(BasePathMixin):
         )
         self.gap_tag = gap_tag
         self.custom_parser_values = custom_parser_values or {}
+        self.unknown_tags = tuple(unknown_tags) if unknown_tags else ()
 
     def add_part(self, part):
         self.parts.append(part)
 
-    def dumps(self, last_segment, timespec="milliseconds", infspec="auto"):
+    timestamp_attribute = "current_program_date_time"
+
+    def _anchored_date(self, name, program_date_times, index, offset, tagged):
+        if name == "current_program_date_time":
+            return program_date_times.datetime(index, offset)
+        return program_date_times.datetime(index) if tagged else None
+
+    def to_dict(self):
+        return {
+            "uri": self.uri,
+            "program_date_time": self.program_date_time,
+            "current_program_date_time": self.current_program_date_time,
+            "duration": self.duration,
+            "title": self.title,
+            "bitrate": self.bitrate,
+            "byterange": self.byterange,
+            "cue_out": self.cue_out,
+            "cue_out_start": self.cue_out_start,
+            "cue_out_explicitly_duration": self.cue_out_explicitly_duration,
+            "cue_in": self.cue_in,
+            "discontinuity": self.discontinuity,
+            "key": self.key and self.key.to_dict(),
+            "scte35": self.scte35,
+            "oatcls_scte35": self.oatcls_scte35,
+            "scte35_duration": self.scte35_duration,
+            "scte35_elapsedtime": self.scte35_elapsedtime,
+            "asset_metadata": self.asset_metadata,
+            "parts": [part.to_dict() for part in self.parts],
+            "init_section": self.init_section and self.init_section.to_dict(),
+            "dateranges": [daterange.to_dict() for daterange in self.dateranges],
+            "gap_tag": self.gap_tag,
+            "custom_parser_values": self.custom_parser_values,
+            "unknown_tags": list(self.unknown_tags),
+        }
+
+    @property
+    def scte35_info(self):
+        return self.scte35 and _decode_scte35(self.scte35)
+
+    @property
+    def oatcls_scte35_info(self):
+        return self.oatcls_scte35 and _decode_scte35(self.oatcls_scte35)
+
+    def dumps(
+        self, last_segment, timespec="milliseconds", infspec="auto", tag_registry=None
+    ):
         output = []
 
-        if last_segment and self.key != last_segment.key:
+        # Segments usually share their key and initialization section with
+        # the previous segment, which spares comparing them.
+        if (
+            last_segment
+            and self.key is not last_segment.key
+            and self.key != last_segment.key
+        ):
             output.append(str(self.key))
             output.append("\n")
         else:
@@ -602,7 +1321,10 @@ class Segment(BasePathMixin):
                 output.append("\n")
 
         if self.init_section:
-            if (not last_segment) or (self.init_section != last_segment.init_section):
+            if (not last_segment) or (
+                self.init_section is not last_segment.init_section
+                and self.init_section != last_segment.init_section
+            ):
                 output.append(str(self.init_section))
                 output.append("\n")
 
@@ -654,6 +1376,15 @@ class Segment(BasePathMixin):
             output.append(str(self.parts))
             output.append("\n")
 
+        for line in self.unknown_tags:
+            output.append(line)
+            output.append("\n")
+
+        if tag_registry is not None:
+            for text in tag_registry._dump(tag_registry.segment_serializers, self):
+                output.append(text)
+                output.append("\n")
+
         if self.uri:
             if self.duration is not None:
                 if infspec == "milliseconds":
@@ -661,7 +1392,7 @@ class Segment(BasePathMixin):
                 elif infspec == "microseconds":
                     duration = f"{self.duration:.6f}"
                 else:
-                    duration = number_to_string(self.duration)
+                    duration = self._duration_to_string()
                 output.append("#EXTINF:%s," % duration)
                 if self.title:
                     output.append(self.title)
@@ -706,12 +1437,23 @@ class Segment(BasePathMixin):
             self.init_section.base_uri = newbase_uri
 
 
-class SegmentList(list, GroupedBasePathMixin):
-    def dumps(self, timespec="milliseconds", infspec="auto"):
+class SegmentList(list, GroupedBasePathMixin, ColumnsPicklingMixin):
+    def dumps(self, timespec="milliseconds", infspec="auto", tag_registry=None):
         output = []
         last_segment = None
+        # Segments parsed in lossless mode are dumped as their source lines
+        # when unchanged and following a segment with the same key and
+        # initialization section as in the source, since their lines don't
+        # repeat the EXT-X-KEY and EXT-X-MAP tags they inherit from it.
+        lossless = timespec == "milliseconds" and infspec == "auto"
         for segment in self:
-            output.append(segment.dumps(last_segment, timespec, infspec))
+            source = lossless and segment._unchanged_source()
+            if source:
+                if _same_context(last_segment, source.previous):
+                    output.append("\n".join(source.lines[source.start : source.end]))
+                    last_segment = segment
+                    continue
+            output.append(segment.dumps(last_segment, timespec, infspec, tag_registry))
             last_segment = segment
         return "\n".join(output)
 
@@ -726,7 +1468,7 @@ class SegmentList(list, GroupedBasePathMixin):
         return [segment for segment in self if segment.key == key]
 
 
-class PartialSegment(BasePathMixin):
+class PartialSegment(TimingMixin, BasePathMixin):
     """
     A partial segment from a M3U8 playlist
 
@@ -765,11 +1507,13 @@ class PartialSegment(BasePathMixin):
       attribute.
     """
 
+    source_children = ("dateranges",)
+
     def __init__(
         self,
         base_uri,
         uri,
-        duration,
+        duration=None,
         program_date_time=None,
         current_program_date_time=None,
         byterange=None,
@@ -777,12 +1521,27 @@ class PartialSegment(BasePathMixin):
         gap=None,
         dateranges=None,
         gap_tag=None,
+        program_date_time_anchor=None,
+        program_date_time_offset=0.0,
+        program_date_times=None,
+        duration_text=None,
     ):
         self.base_uri = base_uri
         self.uri = uri
-        self.duration = duration
-        self.program_date_time = program_date_time
-        self.current_program_date_time = current_program_date_time
+        if duration_text is not None and duration is None:
+            self._duration_text = duration_text
+        else:
+            self.duration = duration
+        if program_date_time_anchor is not None and program_date_times is not None:
+            self._program_date_time_anchor = (
+                program_date_times,
+                program_date_time_anchor,
+                program_date_time_offset,
+                False,
+            )
+        else:
+            self.program_date_time = program_date_time
+            self.current_program_date_time = current_program_date_time
         self.byterange = byterange
         self.independent = independent
         self.gap = gap
@@ -791,6 +1550,26 @@ class PartialSegment(BasePathMixin):
         )
         self.gap_tag = gap_tag
 
+    timestamp_attribute = "program_date_time"
+
+    def _anchored_date(self, name, program_date_times, index, offset, tagged):
+        if name == "program_date_time":
+            return program_date_times.datetime(index, offset)
+        return None
+
+    def to_dict(self):
+        return {
+            "uri": self.uri,
+            "duration": self.duration,
+            "program_date_time": self.program_date_time,
+            "current_program_date_time": self.current_program_date_time,
+            "byterange": self.byterange,
+            "independent": self.independent,
+            "gap": self.gap,
+            "dateranges": [daterange.to_dict() for daterange in self.dateranges],
+            "gap_tag": self.gap_tag,
+        }
+
     def dumps(self, last_segment):
         output = []
 
@@ -802,8 +1581,7 @@ class PartialSegment(BasePathMixin):
             output.append("#EXT-X-GAP\n")
 
         output.append(
-            '#EXT-X-PART:DURATION=%s,URI="%s"'
-            % (number_to_string(self.duration), self.uri)
+            '#EXT-X-PART:DURATION=%s,URI="%s"' % (self._duration_to_string(), self.uri)
         )
 
         if self.independent:
@@ -821,7 +1599,7 @@ class PartialSegment(BasePathMixin):
         return self.dumps(None)
 
 
-class PartialSegmentList(list, GroupedBasePathMixin):
+class PartialSegmentList(list, GroupedBasePathMixin, ColumnsPicklingMixin):
     def __str__(self):
         output = [str(part) for part in self]
         return "\n".join(output)
@@ -865,6 +1643,16 @@ class Key(BasePathMixin):
         self.base_uri = base_uri
         self._extra_params = kwargs
 
+    def to_dict(self):
+        return {
+            "method": self.method,
+            "uri": self.uri,
+            "iv": self.iv,
+            "keyformat": self.keyformat,
+            "keyformatversions": self.keyformatversions,
+            **self._extra_params,
+        }
+
     def __str__(self):
         output = [
             "METHOD=%s" % self.method,
@@ -918,6 +1706,9 @@ class InitializationSection(BasePathMixin):
         self.uri = uri
         self.byterange = byterange
 
+    def to_dict(self):
+        return {"uri": self.uri, "byterange": self.byterange}
+
     def __str__(self):
         output = []
         if self.uri:
@@ -995,6 +1786,9 @@ class Playlist(BasePathMixin):
 
             self.media += filter(lambda m: m.group_id == group_id, media)
 
+    def to_dict(self):
+        return {"uri": self.uri, "stream_info": self.stream_info.to_dict()}
+
     def __str__(self):
         media_types = []
         stream_inf = [str(self.stream_info)]
@@ -1054,6 +1848,12 @@ class IFramePlaylist(BasePathMixin):
             req_video_layout=None,
         )
 
+    def to_dict(self):
+        return {
+            "uri": self.uri,
+            "iframe_stream_info": self.iframe_stream_info.to_dict(),
+        }
+
     def __str__(self):
         iframe_stream_inf = []
         if self.iframe_stream_info.program_id:
@@ -1131,6 +1931,28 @@ class StreamInfo:
         self.stable_variant_id = kwargs.get("stable_variant_id")
         self.req_video_layout = kwargs.get("req_video_layout")
 
+    def to_dict(self):
+        resolution = self.resolution
+        if resolution is not None:
+            resolution = "%dx%d" % resolution
+        return {
+            "bandwidth": self.bandwidth,
+            "closed_captions": self.closed_captions,
+            "average_bandwidth": self.average_bandwidth,
+            "program_id": self.program_id,
+            "resolution": resolution,
+            "codecs": self.codecs,
+            "audio": self.audio,
+            "video": self.video,
+            "subtitles": self.subtitles,
+            "frame_rate": self.frame_rate,
+            "video_range": self.video_range,
+            "hdcp_level": self.hdcp_level,
+            "pathway_id": self.pathway_id,
+            "stable_variant_id": self.stable_variant_id,
+            "req_video_layout": self.req_video_layout,
+        }
+
     def __str__(self):
         stream_inf = []
         if self.program_id is not None:
@@ -1224,6 +2046,24 @@ class Media(BasePathMixin):
         self.stable_rendition_id = stable_rendition_id
         self.extras = extras
 
+    def to_dict(self):
+        return {
+            "uri": self.uri,
+            "type": self.type,
+            "group_id": self.group_id,
+            "language": self.language,
+            "name": self.name,
+            "default": self.default,
+            "autoselect": self.autoselect,
+            "forced": self.forced,
+            "characteristics": self.characteristics,
+            "channels": self.channels,
+            "stable_rendition_id": self.stable_rendition_id,
+            "assoc_language": self.assoc_language,
+            "instream_id": self.instream_id,
+            **self.extras,
+        }
+
     def dumps(self):
         media_out = []
 
@@ -1260,7 +2100,7 @@ class Media(BasePathMixin):
         return self.dumps()
 
 
-class TagList(list):
+class TagList(list, CopyOnWriteMixin, ColumnsPicklingMixin):
     def __str__(self):
         output = [str(tag) for tag in self]
         return "\n".join(output)
@@ -1285,6 +2125,9 @@ class Start:
         self.time_offset = float(time_offset)
         self.precise = precise
 
+    def to_dict(self):
+        return {"time_offset": self.time_offset, "precise": self.precise}
+
     def __str__(self):
         output = ["TIME-OFFSET=" + str(self.time_offset)]
         if self.precise and self.precise in ["YES", "NO"]:
@@ -1300,6 +2143,9 @@ class RenditionReport(BasePathMixin):
         self.last_msn = last_msn
         self.last_part = last_part
 
+    def to_dict(self):
+        return {"uri": self.uri, "last_msn": self.last_msn, "last_part": self.last_part}
+
     def dumps(self):
         report = []
         report.append("URI=" + quoted(self.uri))
@@ -1314,7 +2160,7 @@ class RenditionReport(BasePathMixin):
         return self.dumps()
 
 
-class RenditionReportList(list, GroupedBasePathMixin):
+class RenditionReportList(list, GroupedBasePathMixin, ColumnsPicklingMixin):
     def __str__(self):
         output = [str(report) for report in self]
         return "\n".join(output)
@@ -1338,6 +2184,15 @@ class ServerControl:
     def __getitem__(self, item):
         return getattr(self, item)
 
+    def to_dict(self):
+        return {
+            "can_skip_until": self.can_skip_until,
+            "can_block_reload": self.can_block_reload,
+            "hold_back": self.hold_back,
+            "part_hold_back": self.part_hold_back,
+            "can_skip_dateranges": self.can_skip_dateranges,
+        }
+
     def dumps(self):
         ctrl = []
         if self.can_block_reload:
@@ -1366,6 +2221,12 @@ class Skip:
         self.skipped_segments = skipped_segments
         self.recently_removed_dateranges = recently_removed_dateranges
 
+    def to_dict(self):
+        return {
+            "skipped_segments": self.skipped_segments,
+            "recently_removed_dateranges": self.recently_removed_dateranges,
+        }
+
     def dumps(self):
         skip = []
         skip.append("SKIPPED-SEGMENTS=%s" % self.skipped_segments)
@@ -1385,6 +2246,9 @@ class PartInformation:
     def __init__(self, part_target=None):
         self.part_target = part_target
 
+    def to_dict(self):
+        return {"part_target": self.part_target}
+
     def dumps(self):
         return "#EXT-X-PART-INF:PART-TARGET=%s" % number_to_string(self.part_target)
 
@@ -1405,6 +2269,14 @@ class PreloadHint(BasePathMixin):
     def __getitem__(self, item):
         return getattr(self, item)
 
+    def to_dict(self):
+        return {
+            "type": self.hint_type,
+            "uri": self.uri,
+            "byterange_start": self.byterange_start,
+            "byterange_length": self.byterange_length,
+        }
+
     def dumps(self):
         hint = []
         hint.append("TYPE=" + self.hint_type)
@@ -1427,6 +2299,14 @@ class SessionData:
         self.uri = uri
         self.language = language
 
+    def to_dict(self):
+        return {
+            "data_id": self.data_id,
+            "value": self.value,
+            "uri": self.uri,
+            "language": self.language,
+        }
+
     def dumps(self):
         session_data_out = ["DATA-ID=" + quoted(self.data_id)]
 
@@ -1463,6 +2343,33 @@ class DateRange:
             (attr, kwargs.get(attr)) for attr in kwargs if attr.startswith("x_")
         ]
 
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "start_date": self.start_date,
+            "class": self.class_,
+            "end_date": self.end_date,
+            "duration": self.duration,
+            "planned_duration": self.planned_duration,
+            "scte35_cmd": self.scte35_cmd,
+            "scte35_out": self.scte35_out,
+            "scte35_in": self.scte35_in,
+            "end_on_next": self.end_on_next,
+            **dict(self.x_client_attrs),
+        }
+
+    @property
+    def scte35_cmd_info(self):
+        return self.scte35_cmd and _decode_scte35(self.scte35_cmd)
+
+    @property
+    def scte35_out_info(self):
+        return self.scte35_out and _decode_scte35(self.scte35_out)
+
+    @property
+    def scte35_in_info(self):
+        return self.scte35_in and _decode_scte35(self.scte35_in)
+
     def dumps(self):
         daterange = []
         daterange.append("ID=" + quoted(self.id))
@@ -1508,6 +2415,9 @@ class ContentSteering(BasePathMixin):
         self.uri = server_uri
         self.pathway_id = pathway_id
 
+    def to_dict(self):
+        return {"server_uri": self.uri, "pathway_id": self.pathway_id}
+
     def dumps(self):
         steering = []
         steering.append("SERVER-URI=" + quoted(self.uri))
@@ -1564,6 +2474,12 @@ class ImagePlaylist(BasePathMixin):
             stable_variant_id=image_stream_info.get("stable_variant_id"),
         )
 
+    def to_dict(self):
+        return {
+            "uri": self.uri,
+            "image_stream_info": self.image_stream_info.to_dict(),
+        }
+
     def __str__(self):
         image_stream_inf = []
         if self.image_stream_info.program_id:
@@ -1616,6 +2532,13 @@ class Tiles(BasePathMixin):
         self.layout = layout
         self.duration = duration
 
+    def to_dict(self):
+        return {
+            "resolution": self.resolution,
+            "layout": self.layout,
+            "duration": self.duration,
+        }
+
     def dumps(self):
         tiles = []
         tiles.append("RESOLUTION=" + self.resolution)
@@ -1628,6 +2551,23 @@ class Tiles(BasePathMixin):
         return self.dumps()
 
 
+def find_init_section(params, init_sections, base_uri):
+    """
+    Returns the InitializationSection described by `params` from
+    `init_sections`, a dictionary keyed by URI and byterange, which gets a
+    new one when it has none.
+    """
+    if not params:
+        return None
+    uri_and_byterange = (params.get("uri"), params.get("byterange"))
+    try:
+        return init_sections[uri_and_byterange]
+    except KeyError:
+        init_section = InitializationSection(base_uri, **params)
+        init_sections[uri_and_byterange] = init_section
+        return init_section
+
+
 def find_key(keydata, keylist):
     if not keydata:
         return None
@@ -1643,6 +2583,38 @@ def find_key(keydata, keylist):
     raise KeyError("No key found for key data")
 
 
+def _encode_json_value(value):
+    if isinstance(value, datetime):
+        return format_date_time(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+@lru_cache(maxsize=None)
+def _json_encoder():
+    import json
+
+    return json.JSONEncoder(default=_encode_json_value, separators=(",", ":"))
+
+
+def _decode_json_dates(data):
+    date_fields = ("program_date_time", "current_program_date_time")
+    if data.get("program_date_time"):
+        data["program_date_time"] = cast_date_time(data["program_date_time"])
+    for segment in data.get("segments", ()):
+        for item in [segment, *(segment.get("parts") or ())]:
+            for field in date_fields:
+                if item.get(field):
+                    item[field] = cast_date_time(item[field])
+    return data
+
+
+def _decode_scte35(payload):
+    # Imported on first use, decoding SCTE-35 isn't needed to parse.
+    from m3u8 import scte35
+
+    return scte35.decode(payload)
+
+
 def denormalize_attribute(attribute):
     return attribute.replace("_", "-").upper()
 
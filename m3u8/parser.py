@@ -14,7 +14,7 @@ except ImportError:
     pass
 
 
-from m3u8 import protocol, version_matching
+from m3u8 import protocol
 
 """
 http://tools.ietf.org/html/draft-pantos-http-live-streaming-08#section-3.2
@@ -33,6 +33,7 @@ def format_date_time(value, **kwargs):
 
 class ParseError(Exception):
     def __init__(self, lineno, line):
+        super().__init__(lineno, line)
         self.lineno = lineno
         self.line = line
 
@@ -40,9 +41,46 @@ class ParseError(Exception):
         return "Syntax error in manifest on line %d: %s" % (self.lineno, self.line)
 
 
-def parse(content, strict=False, custom_tags_parser=None):
+def parse(
+    content,
+    strict=False,
+    custom_tags_parser=None,
+    profiler=None,
+    lazy=False,
+    lossless=False,
+    keep_unknown_tags=False,
+):
     """
     Given a M3U8 playlist content returns a dictionary with all data found
+
+    `profiler` is an optional `m3u8.profiling.ParseProfiler`, collecting
+    the time spent on each tag.
+
+    With `lazy`, the durations of EXTINF and EXT-X-PART tags are kept as
+    text, in "duration_text", instead of being converted to "duration":
+    the model converts them when they're asked for, and dumps the original
+    text of the ones left unchanged. Segments and partial segments don't
+    get "program_date_time" and "current_program_date_time" either: the
+    dates of EXT-X-PROGRAM-DATE-TIME tags are kept in
+    "program_date_time_anchors", and each segment and partial segment
+    keeps the index of the last one, in "program_date_time_anchor", and its
+    offset in seconds from it, in "program_date_time_offset".
+
+    `custom_tags_parser` is either a function called with every line
+    starting with "#", which returns True for the lines it parsed, or a
+    TagRegistry, which is only looked up for the tags the parser doesn't
+    know.
+
+    With `keep_unknown_tags`, the tags the parser doesn't know are kept as
+    lines, in the "unknown_tags" of the segment they precede, or of the
+    playlist when they come before the first segment, or in
+    "trailing_unknown_tags" when they follow the last one. Only these lines
+    cost anything.
+
+    With `lossless`, the lines of the playlist are kept in "source", and
+    each segment keeps the span of its lines in "source_span": the model
+    dumps these lines again, instead of formatting the segments, as long as
+    they're left unchanged.
     """
     data = {
         "media_sequence": 0,
@@ -75,22 +113,50 @@ def parse(content, strict=False, custom_tags_parser=None):
     }
 
     lines = string_to_lines(content)
+    validator = None
     if strict:
-        found_errors = version_matching.validate(lines)
-
-        if len(found_errors) > 0:
-            raise Exception(found_errors)
-
-    for lineno, line in enumerate(lines, 1):
+        # Imported on first use, the rules are only needed in strict mode.
+        from m3u8 import version_matching
+
+        validator = version_matching.LineValidator()
+
+    tag_registry = None
+    parse_registered_tag = None
+    if isinstance(custom_tags_parser, TagRegistry):
+        tag_registry = custom_tags_parser
+        parse_registered_tag = tag_registry._parse
+
+    spans = _SourceSpans(lines, data, tag_registry) if lossless else None
+
+    numbered_lines = enumerate(lines, 1)
+    if profiler is not None:
+        report = profiler.start()
+        numbered_lines = report._profile_lines(numbered_lines)
+        if callable(custom_tags_parser):
+            custom_tags_parser = report._profile_custom_tags_parser(custom_tags_parser)
+        if parse_registered_tag is not None:
+            parse_registered_tag = report._profile_custom_tags_parser(
+                parse_registered_tag
+            )
+
+    for lineno, line in numbered_lines:
         line = line.strip()
+        if validator is not None and line.startswith("#"):
+            # Version matching errors number lines from 0, like validate().
+            validator.feed(lineno - 1, line)
+
         parse_kwargs = {
             "line": line,
             "lineno": lineno,
             "data": data,
             "state": state,
             "strict": strict,
+            "lazy": lazy,
         }
 
+        if spans is not None:
+            spans.feed(lineno - 1, line, state)
+
         # Call custom parser if needed
         if line.startswith("#") and callable(custom_tags_parser):
             go_to_next_line = custom_tags_parser(line, lineno, data, state)
@@ -235,18 +301,168 @@ def parse(content, strict=False, custom_tags_parser=None):
         elif (not line.startswith("#")) and (state["expect_playlist"]):
             _parse_variant_playlist(**parse_kwargs)
 
+        # Tags registered in a TagRegistry.
+        elif parse_registered_tag is not None and parse_registered_tag(
+            line, lineno, data, state
+        ):
+            pass
+
         # Lines that haven't been recognized by any of the parsers above are illegal
         # in strict mode.
         elif strict:
             raise ParseError(lineno, line)
 
+        elif keep_unknown_tags and line.startswith("#EXT"):
+            _parse_unknown_tag(**parse_kwargs)
+
+    if profiler is not None:
+        profiler.finish(report)
+
+    if validator is not None:
+        found_errors = validator.finish()
+        if found_errors:
+            raise Exception(found_errors)
+
+    if spans is not None:
+        spans.finish(state)
+
     # Handle remaining partial segments.
     if "segment" in state:
         data["segments"].append(state.pop("segment"))
 
+    if "unknown_tags" in state:
+        data["trailing_unknown_tags"] = state.pop("unknown_tags")
+
     return data
 
 
+# Tags dumped by Segment (and PartialSegment), and the other tags dumped by
+# M3U8, for the lossless mode.
+SEGMENT_TAGS = frozenset(
+    [
+        protocol.extinf,
+        protocol.ext_x_byterange,
+        protocol.ext_x_bitrate,
+        protocol.ext_x_program_date_time,
+        protocol.ext_x_discontinuity,
+        protocol.ext_x_cue_out,
+        protocol.ext_x_cue_out_cont,
+        protocol.ext_x_cue_in,
+        protocol.ext_x_cue_span,
+        protocol.ext_oatcls_scte35,
+        protocol.ext_x_asset,
+        protocol.ext_x_key,
+        protocol.ext_x_map,
+        protocol.ext_x_part,
+        protocol.ext_x_daterange,
+        protocol.ext_x_gap,
+    ]
+)
+PLAYLIST_TAGS = frozenset(
+    [
+        protocol.ext_m3u,
+        protocol.ext_x_targetduration,
+        protocol.ext_x_media_sequence,
+        protocol.ext_x_discontinuity_sequence,
+        protocol.ext_x_media,
+        protocol.ext_x_playlist_type,
+        protocol.ext_x_stream_inf,
+        protocol.ext_x_version,
+        protocol.ext_x_allow_cache,
+        protocol.ext_x_endlist,
+        protocol.ext_i_frames_only,
+        protocol.ext_x_i_frame_stream_inf,
+        protocol.ext_is_independent_segments,
+        protocol.ext_x_start,
+        protocol.ext_x_server_control,
+        protocol.ext_x_part_inf,
+        protocol.ext_x_rendition_report,
+        protocol.ext_x_skip,
+        protocol.ext_x_session_data,
+        protocol.ext_x_session_key,
+        protocol.ext_x_preload_hint,
+        protocol.ext_x_content_steering,
+        protocol.ext_x_image_stream_inf,
+        protocol.ext_x_images_only,
+    ]
+)
+
+# Tags with a built-in parser.
+KNOWN_TAGS = SEGMENT_TAGS | PLAYLIST_TAGS | {protocol.ext_x_tiles}
+
+
+class _SourceSpans:
+    """
+    Finds the lines of each segment, for the lossless mode: from the first
+    segment tag, or the line following the previous segment, to its URI.
+    A segment whose lines include a playlist tag gets no span, since its
+    lines can't be dumped in place of the segment.
+
+    The lines before the first segment and after the last one are dumped in
+    place of the playlist tags, which is only possible when every segment
+    got a span: "header_end" and "trailer_start" are None otherwise.
+    """
+
+    def __init__(self, lines, data, tag_registry=None):
+        self.segment_tag_names = SEGMENT_TAGS
+        self.playlist_tag_names = PLAYLIST_TAGS
+        if tag_registry is not None:
+            segment_tags = tag_registry.segment_tags
+            self.segment_tag_names = SEGMENT_TAGS | segment_tags
+            self.playlist_tag_names = PLAYLIST_TAGS | (
+                tag_registry.parsers.keys() - segment_tags
+            )
+        self.source = data["source"] = {
+            "lines": lines,
+            "header_end": None,
+            "trailer_start": None,
+        }
+        # Lines of the segment being parsed: from `start` to `end` (excluded)
+        # for its tags, and whether playlist tags were found among them.
+        self.start = None
+        self.end = None
+        self.playlist_tags = False
+        self.mixed = False
+        self.complete = True
+
+    def feed(self, index, line, state):
+        if not line.startswith("#"):
+            if line and state["expect_segment"]:
+                if self.playlist_tags:
+                    self.complete = False
+                else:
+                    state["source_span"] = (self.start, index + 1)
+                self.start = self.end = index + 1
+                self.playlist_tags = self.mixed = False
+            return
+        tag = line.partition(":")[0]
+        if tag in self.segment_tag_names:
+            if self.start is None:
+                self.start = self.source["header_end"] = index
+            self.end = index + 1
+            self.mixed = self.playlist_tags
+        elif tag in self.playlist_tag_names and self.start is not None:
+            self.playlist_tags = True
+
+    def finish(self, state):
+        if self.start is None:
+            # No segments, the playlist tags are all there is.
+            self.start = self.end = self.source["header_end"] = len(
+                self.source["lines"]
+            )
+        if "segment" in state:
+            # Partial segments following the last segment.
+            if self.mixed:
+                self.complete = False
+            else:
+                state["segment"]["source_span"] = (self.start, self.end)
+                self.start = self.end
+        if self.complete:
+            self.source["trailer_start"] = self.start
+        else:
+            self.source["header_end"] = None
+
+
 def _parse_key(line, data, state, **kwargs):
     params = ATTRIBUTELISTPATTERN.split(line.replace(protocol.ext_x_key + ":", ""))[
         1::2
@@ -261,7 +477,7 @@ def _parse_key(line, data, state, **kwargs):
         data["keys"].append(key)
 
 
-def _parse_extinf(line, state, lineno, strict, **kwargs):
+def _parse_extinf(line, state, lineno, strict, lazy=False, **kwargs):
     chunks = line.replace(protocol.extinf + ":", "").split(",", 1)
     if len(chunks) == 2:
         duration, title = chunks
@@ -273,18 +489,40 @@ def _parse_extinf(line, state, lineno, strict, **kwargs):
             title = ""
     if "segment" not in state:
         state["segment"] = {}
-    state["segment"]["duration"] = float(duration)
+    if lazy:
+        state["segment"]["duration_text"] = duration
+    else:
+        state["segment"]["duration"] = float(duration)
     state["segment"]["title"] = title
     state["expect_segment"] = True
 
 
+def _parse_unknown_tag(line, data, state, **kwargs):
+    if "segment" in state or data["segments"]:
+        # Kept for the segment being parsed, or the next one.
+        state.setdefault("unknown_tags", []).append(line)
+    else:
+        data.setdefault("unknown_tags", []).append(line)
+
+
 def _parse_ts_chunk(line, data, state, **kwargs):
     segment = state.pop("segment")
-    if state.get("program_date_time"):
-        segment["program_date_time"] = state.pop("program_date_time")
-    if state.get("current_program_date_time"):
-        segment["current_program_date_time"] = state["current_program_date_time"]
-        state["current_program_date_time"] += timedelta(seconds=segment["duration"])
+    if "program_date_time_anchor" in state:
+        if state.pop("program_date_time", False):
+            segment["has_program_date_time"] = True
+        segment["program_date_time_anchor"] = state["program_date_time_anchor"]
+        segment["program_date_time_offset"] = state["program_date_time_offset"]
+        state["program_date_time_offset"] += _duration(segment)
+    else:
+        if state.get("program_date_time"):
+            segment["program_date_time"] = state.pop("program_date_time")
+        if state.get("current_program_date_time"):
+            segment["current_program_date_time"] = state["current_program_date_time"]
+            state["current_program_date_time"] += timedelta(seconds=segment["duration"])
+    if "source_span" in state:
+        segment["source_span"] = state.pop("source_span")
+    if "unknown_tags" in state:
+        segment["unknown_tags"] = state.pop("unknown_tags")
     segment["uri"] = line
     segment["cue_in"] = state.pop("cue_in", False)
     segment["cue_out"] = state.pop("cue_out", False)
@@ -460,18 +698,35 @@ def _parse_media_sequence(**parse_kwargs):
     return _parse_simple_parameter(cast_to=int, **parse_kwargs)
 
 
+def _duration(segment):
+    # Durations parsed in lazy mode are converted when dating segments.
+    if "duration_text" in segment:
+        return float(segment["duration_text"])
+    return segment["duration"]
+
+
 def _parse_discontinuity_sequence(**parse_kwargs):
     return _parse_simple_parameter(cast_to=int, **parse_kwargs)
 
 
-def _parse_program_date_time(line, state, data, **parse_kwargs):
+def _parse_program_date_time(line, state, data, lazy=False, **parse_kwargs):
     _, program_date_time = _parse_simple_parameter_raw_value(
         line, cast_to=cast_date_time, **parse_kwargs
     )
     if not data.get("program_date_time"):
         data["program_date_time"] = program_date_time
-    state["current_program_date_time"] = program_date_time
-    state["program_date_time"] = program_date_time
+    if not lazy:
+        state["current_program_date_time"] = program_date_time
+        state["program_date_time"] = program_date_time
+        return
+    # In lazy mode, segments and partial segments refer to the last date by
+    # its index in "program_date_time_anchors", with their offset in seconds
+    # from it: the model computes their dates when they're asked for.
+    anchors = data.setdefault("program_date_time_anchors", [])
+    anchors.append(program_date_time)
+    state["program_date_time_anchor"] = len(anchors) - 1
+    state["program_date_time_offset"] = 0.0
+    state["program_date_time"] = True
 
 
 def _parse_discontinuity(state, **parse_kwargs):
@@ -641,17 +896,24 @@ def _parse_rendition_report(line, data, **kwargs):
     data["rendition_reports"].append(rendition_report)
 
 
-def _parse_part(line, state, **kwargs):
+def _parse_part(line, state, lazy=False, **kwargs):
     attribute_parser = remove_quotes_parser("uri")
-    attribute_parser["duration"] = lambda x: float(x)
+    if not lazy:
+        attribute_parser["duration"] = float
     attribute_parser["independent"] = str
     attribute_parser["gap"] = str
     attribute_parser["byterange"] = str
 
     part = _parse_attribute_list(protocol.ext_x_part, line, attribute_parser)
+    if lazy and "duration" in part:
+        part["duration_text"] = part.pop("duration")
 
     # this should always be true according to spec
-    if state.get("current_program_date_time"):
+    if "program_date_time_anchor" in state:
+        part["program_date_time_anchor"] = state["program_date_time_anchor"]
+        part["program_date_time_offset"] = state["program_date_time_offset"]
+        state["program_date_time_offset"] += _duration(part)
+    elif state.get("current_program_date_time"):
         part["program_date_time"] = state["current_program_date_time"]
         state["current_program_date_time"] += timedelta(seconds=part["duration"])
 
@@ -793,3 +1055,91 @@ def save_segment_custom_value(state, key, value):
         state["segment"]["custom_parser_values"] = {}
 
     state["segment"]["custom_parser_values"][key] = value
+
+
+def save_playlist_custom_value(data, key, value):
+    """
+    Helper function for saving custom values for M3U8
+    Are useful with custom_tags_parser
+    """
+    data.setdefault("custom_parser_values", {})[key] = value
+
+
+class TagRegistry:
+    """
+    Parsers, and serializers, of tags the library doesn't know, e.g. vendor
+    specific tags. Given as the `custom_tags_parser` argument of `parse`,
+    `M3U8` or `loads`, it's only looked up for the lines no built-in parser
+    handles, so that it costs nothing for the others.
+
+        registry = TagRegistry()
+        registry.register("#EXT-X-MOVIE", parse_movie, dump_movie)
+        registry.register("#EXT-X-AD-ID", parse_ad_id, dump_ad_id, segment=True)
+        playlist = m3u8.loads(content, custom_tags_parser=registry)
+
+    Parsers are called like `custom_tags_parser` functions, with the line,
+    its number and the data and state of the parser, and store what they
+    parse with `save_playlist_custom_value` or `save_segment_custom_value`,
+    which the serializers find in the `custom_parser_values` of the M3U8
+    and Segment objects.
+
+    Serializers are called by `dumps` with the M3U8 object, or with each
+    Segment for tags registered with `segment`, and return the tag lines
+    to dump, or None. Playlist tags are dumped before the segments, and
+    segment tags before the EXTINF tag of their segment.
+    """
+
+    __slots__ = (
+        "parsers",
+        "segment_tags",
+        "playlist_serializers",
+        "segment_serializers",
+    )
+
+    def __init__(self):
+        self.parsers = {}
+        self.segment_tags = set()
+        self.playlist_serializers = {}
+        self.segment_serializers = {}
+
+    def __reduce__(self):
+        state = {name: getattr(self, name) for name in self.__slots__}
+        return type(self), (), (None, state)
+
+    def register(self, tag, parser, serializer=None, segment=False):
+        """
+        Registers the functions parsing and dumping `tag`, e.g.
+        "#EXT-X-MOVIE", a segment tag with `segment`. Raises ValueError for
+        the tags the parser handles.
+        """
+        if not tag.startswith("#") or ":" in tag:
+            raise ValueError(f"invalid tag name: {tag!r}")
+        for known in KNOWN_TAGS:
+            if tag.startswith(known):
+                raise ValueError(f"{tag} is parsed as {known}")
+        self.parsers[tag] = parser
+        self.segment_tags.discard(tag)
+        self.playlist_serializers.pop(tag, None)
+        self.segment_serializers.pop(tag, None)
+        if segment:
+            self.segment_tags.add(tag)
+        if serializer is not None:
+            if segment:
+                self.segment_serializers[tag] = serializer
+            else:
+                self.playlist_serializers[tag] = serializer
+
+    def _parse(self, line, lineno, data, state):
+        parser = self.parsers.get(line.partition(":")[0])
+        if parser is None:
+            return False
+        parser(line, lineno, data, state)
+        return True
+
+    def _dump(self, serializers, obj):
+        output = []
+        for serializer in serializers.values():
+            text = serializer(obj)
+            if text:
+                output.append(text)
+        return output
@@ -0,0 +1,141 @@
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+"""
+Compact pickling of playlists, for sending them between processes.
+
+Model objects are pickled without the values they cache or can compute
+again: memoized absolute URIs, copy-on-write bookkeeping, the results
+cached by frozen objects and the `data` dictionary of M3U8, which is
+rebuilt from the model when asked for.
+
+Lists of model objects, such as segments, are pickled column by column:
+an attribute holding the same object in every item (None, False, the key
+shared by all the segments...) is stored once instead of once per item.
+Objects shared between items, or between lists, are stored once by pickle
+itself and remain shared once unpickled.
+"""
+
+from itertools import repeat
+from operator import is_, itemgetter
+
+from m3u8.frozen import _thawed_classes, is_frozen, picklable
+
+# Attributes recomputed on demand, or tied to the text the objects were
+# parsed from, never pickled.
+TRANSIENT_ATTRIBUTES = frozenset(["_absolute_uri", "_owned", "_owned_keys", "_source"])
+
+
+class _Missing:
+    """Stands for attributes some items of a list don't have."""
+
+    def __reduce__(self):
+        return "MISSING"
+
+
+MISSING = _Missing()
+
+
+def object_state(obj, transient=TRANSIENT_ATTRIBUTES):
+    """
+    Returns the attributes of a model object worth pickling. The read-only
+    mappings of frozen objects, and of their copies, become dictionaries.
+    """
+    if is_frozen(obj):
+        transient = transient | obj._frozen_cached_names
+    return {
+        name: picklable(value)
+        for name, value in obj.__dict__.items()
+        if name not in transient
+    }
+
+
+class PicklingMixin:
+    def __getstate__(self):
+        return object_state(self)
+
+
+class ColumnsPicklingMixin:
+    """Pickles lists of model objects column by column."""
+
+    def __reduce__(self):
+        if not self and not self.__dict__:
+            return type(self), ()
+
+        state = object_state(self) or None
+        if not self:
+            return type(self), (), state
+
+        item_classes = {type(item) for item in self}
+        item_class = item_classes.pop() if len(item_classes) == 1 else None
+        if item_class is None or not item_class.__module__.startswith("m3u8."):
+            return type(self), (list(self),), state
+
+        transient = TRANSIENT_ATTRIBUTES
+        frozen = is_frozen(self[0])
+        if frozen:
+            transient = transient | item_class._frozen_cached_names
+
+        states = [item.__dict__ for item in self]
+        names = states[0].keys()
+        if all(item_state.keys() == names for item_state in states):
+            # The usual case, every item has the same attributes.
+            names = [name for name in names if name not in transient]
+            if len(names) > 1:
+                columns = zip(*map(itemgetter(*names), states))
+            else:
+                columns = [
+                    [item_state[name] for item_state in states] for name in names
+                ]
+        else:
+            names = {}
+            for item_state in states:
+                names.update(dict.fromkeys(item_state))
+            names = [name for name in names if name not in transient]
+            columns = (
+                [item_state.get(name, MISSING) for item_state in states]
+                for name in names
+            )
+
+        encoded = []
+        for name, values in zip(names, columns):
+            first = values[0]
+            if all(map(is_, values, repeat(first))):
+                encoded.append((name, True, picklable(first) if frozen else first))
+            else:
+                if frozen:
+                    values = [picklable(value) for value in values]
+                encoded.append((name, False, values))
+
+        item_class = _thawed_classes.get(item_class, item_class)
+        return (
+            restore_columns,
+            (type(self), item_class, len(self), encoded),
+            state,
+        )
+
+
+def restore_columns(cls, item_class, count, columns):
+    names = [name for name, _, _ in columns]
+    values = [
+        repeat(column, count) if constant else column for _, constant, column in columns
+    ]
+    partial = [
+        name
+        for name, constant, column in columns
+        if not constant and any(map(is_, column, repeat(MISSING)))
+    ]
+
+    new = item_class.__new__
+    items = []
+    append = items.append
+    for row in zip(*values) if values else repeat((), count):
+        item = new(item_class)
+        state = item.__dict__
+        state.update(zip(names, row))
+        for name in partial:
+            if state[name] is MISSING:
+                del state[name]
+        append(item)
+    return cls(items)
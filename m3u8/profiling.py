@@ -0,0 +1,197 @@
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+"""
+Per-tag profiling of the parser.
+
+    profiler = ParseProfiler()
+    data = m3u8.parse(content, profiler=profiler)
+    print(profiler.total)
+
+The parser only checks for a profiler once per playlist: parsing without
+one runs exactly the same code as before. With a profiler, lines are
+timed as the parser goes from one to the next, which adds a few hundred
+nanoseconds per line.
+"""
+
+import sys
+import time
+
+URI = "URI"
+BLANK = ""
+
+
+def tag_name(line):
+    """
+    Returns the tag a line is reported under: its tag name, URI for the
+    URIs of segments and playlists, and an empty string for blank lines.
+    """
+    line = line.strip()
+    if not line:
+        return BLANK
+    if not line.startswith("#"):
+        return URI
+    return line.partition(":")[0].rstrip()
+
+
+class TagStats:
+    """
+    What parsing the lines of a tag cost.
+
+    `count`
+      number of lines
+
+    `seconds`
+      time spent on the lines, including strict validation and the custom
+      tags parser
+
+    `custom_seconds`
+      part of `seconds` spent in the custom tags parser
+
+    `allocated_blocks`
+      memory blocks still allocated after the lines were parsed, as counted
+      by `sys.getallocatedblocks`, i.e. the objects the lines added to the
+      playlist data
+    """
+
+    def __init__(self, count=0, seconds=0.0, custom_seconds=0.0, allocated_blocks=0):
+        self.count = count
+        self.seconds = seconds
+        self.custom_seconds = custom_seconds
+        self.allocated_blocks = allocated_blocks
+
+    def __repr__(self):
+        return (
+            f"TagStats(count={self.count}, seconds={self.seconds:.6f}, "
+            f"custom_seconds={self.custom_seconds:.6f}, "
+            f"allocated_blocks={self.allocated_blocks})"
+        )
+
+    def __eq__(self, other):
+        return isinstance(other, TagStats) and self.to_dict() == other.to_dict()
+
+    def add(self, other):
+        self.count += other.count
+        self.seconds += other.seconds
+        self.custom_seconds += other.custom_seconds
+        self.allocated_blocks += other.allocated_blocks
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "seconds": self.seconds,
+            "custom_seconds": self.custom_seconds,
+            "allocated_blocks": self.allocated_blocks,
+        }
+
+
+class ParseReport:
+    """
+    Per-tag statistics of one or more parses: `tags` maps tag names, as
+    returned by `tag_name`, to their TagStats.
+    """
+
+    def __init__(self):
+        self.tags = {}
+        self.parses = 0
+
+    @property
+    def lines(self):
+        return sum(stats.count for stats in self.tags.values())
+
+    @property
+    def seconds(self):
+        return sum(stats.seconds for stats in self.tags.values())
+
+    def slowest(self, count=None):
+        """Returns the (tag, stats) pairs, the most time consuming first."""
+        items = sorted(self.tags.items(), key=lambda item: -item[1].seconds)
+        return items[:count]
+
+    def merge(self, other):
+        """Adds the statistics of another report to this one."""
+        for tag, stats in other.tags.items():
+            self._stats(tag).add(stats)
+        self.parses += other.parses
+
+    def to_dict(self):
+        return {
+            "parses": self.parses,
+            "tags": {tag: stats.to_dict() for tag, stats in self.slowest()},
+        }
+
+    def __str__(self):
+        lines = [
+            f"{'tag':<32} {'count':>8} {'ms':>10} {'custom ms':>10} {'blocks':>10}"
+        ]
+        for tag, stats in self.slowest():
+            lines.append(
+                f"{tag or '(blank)':<32} {stats.count:>8} "
+                f"{stats.seconds * 1000:>10.3f} {stats.custom_seconds * 1000:>10.3f} "
+                f"{stats.allocated_blocks:>10}"
+            )
+        return "\n".join(lines)
+
+    def _stats(self, tag):
+        try:
+            return self.tags[tag]
+        except KeyError:
+            stats = self.tags[tag] = TagStats()
+            return stats
+
+    def _profile_lines(self, numbered_lines):
+        # Each line is timed from the moment it's handed to the parser to the
+        # moment the parser asks for the next one.
+        clock = time.perf_counter
+        blocks = sys.getallocatedblocks
+        for lineno, line in numbered_lines:
+            before = blocks()
+            start = clock()
+            yield lineno, line
+            seconds = clock() - start
+            stats = self._stats(tag_name(line))
+            stats.count += 1
+            stats.seconds += seconds
+            stats.allocated_blocks += blocks() - before
+
+    def _profile_custom_tags_parser(self, custom_tags_parser):
+        clock = time.perf_counter
+
+        def profiled(line, lineno, data, state):
+            start = clock()
+            try:
+                return custom_tags_parser(line, lineno, data, state)
+            finally:
+                self._stats(tag_name(line)).custom_seconds += clock() - start
+
+        return profiled
+
+
+class ParseProfiler:
+    """
+    Collects per-tag statistics of the playlists parsed with it, given as
+    the `profiler` argument of `parse`.
+
+    `total` is the ParseReport of every parse so far, and `callback`, when
+    given, is called with the ParseReport of each parse once it's done,
+    e.g. to send it to a metrics system.
+    """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.total = ParseReport()
+
+    def reset(self):
+        self.total = ParseReport()
+
+    def start(self):
+        """Returns the ParseReport of a new parse."""
+        report = ParseReport()
+        report.parses = 1
+        return report
+
+    def finish(self, report):
+        self.total.merge(report)
+        if self.callback is not None:
+            self.callback(report)
@@ -0,0 +1,260 @@
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+import re
+from urllib.parse import urlencode, urlsplit, urlunsplit
+
+# URI lines and URI attributes of tags, in playlist text.
+URI_PATTERN = re.compile(
+    r'^([^#\s][^\r\n]*?)[ \t]*(?=\r?$)|(?<=[:,])URI="([^"]*)"', re.MULTILINE
+)
+
+
+class URIRewriter:
+    """
+    Rewrites the URIs of a playlist with a list of rules, applied in order.
+
+    Rules are added with the chainable methods below and compiled into plain
+    functions of a URI, so applying them costs no rule lookups:
+
+        rewriter = (
+            URIRewriter()
+            .host("origin.example.com", "cdn.example.com")
+            .query(token="abc")
+        )
+
+    Results are memoized per URI, since keys, initialization sections and
+    media playlists often repeat the same URIs. `maxsize` bounds the number
+    of URIs remembered. Rules added with `cache=False`, such as `sign`, and
+    the rules after them, run on every call instead.
+
+    `apply` changes the URIs of a playlist in place. `dumps` and
+    `rewrite_text` rewrite the serialized playlist instead, without touching
+    the model, so they work with frozen playlists too.
+    """
+
+    def __init__(self, maxsize=65536):
+        self.rules = []
+        self.maxsize = maxsize
+        self._cache = {}
+        self._cached_rules = []
+        self._uncached_rules = []
+
+    def add_rule(self, rule, cache=True):
+        """
+        Adds a function taking a URI and returning the rewritten URI. Give
+        `cache=False` for functions whose result may change between calls.
+        """
+        self.rules.append(rule)
+        if cache and not self._uncached_rules:
+            self._cached_rules.append(rule)
+        else:
+            self._uncached_rules.append(rule)
+        self._cache.clear()
+        return self
+
+    def prefix(self, old, new):
+        """Replaces the `old` prefix of URIs with `new`."""
+        size = len(old)
+
+        def rule(uri):
+            if uri.startswith(old):
+                return new + uri[size:]
+            return uri
+
+        return self.add_rule(rule)
+
+    def host(self, old, new):
+        """
+        Replaces the `old` host (and port) of absolute URIs with `new`. When
+        `old` is None all absolute URIs are moved to `new`.
+        """
+
+        def rule(uri):
+            parts = urlsplit(uri)
+            if parts.netloc and (old is None or parts.netloc == old):
+                return urlunsplit(parts._replace(netloc=new))
+            return uri
+
+        return self.add_rule(rule)
+
+    def query(self, params=None, **kwargs):
+        """Appends query parameters to URIs."""
+        encoded = urlencode({**(params or {}), **kwargs})
+        return self.add_rule(lambda uri: _append_query(uri, encoded))
+
+    def sign(self, signer, name="signature", cache=False):
+        """
+        Appends the query parameter `name` with the value returned by
+        `signer` for the URI, as rewritten by the previous rules. `signer` is
+        called on every rewrite, since signatures usually depend on the time
+        or a nonce; give `cache=True` to memoize its results.
+        """
+        return self.add_rule(
+            lambda uri: _append_query(uri, urlencode({name: signer(uri)})),
+            cache=cache,
+        )
+
+    def regex(self, pattern, replacement, count=0):
+        """Applies `re.sub` to URIs."""
+        compiled = re.compile(pattern)
+        return self.add_rule(lambda uri: compiled.sub(replacement, uri, count=count))
+
+    def rewrite(self, uri):
+        """Returns the rewritten `uri`. None is returned unchanged."""
+        if uri is None:
+            return None
+        try:
+            result = self._cache[uri]
+        except KeyError:
+            result = uri
+            for rule in self._cached_rules:
+                result = rule(result)
+
+            if len(self._cache) >= self.maxsize:
+                self._cache.clear()
+            self._cache[uri] = result
+
+        for rule in self._uncached_rules:
+            result = rule(result)
+        return result
+
+    def apply(self, playlist):
+        """
+        Rewrites, in place, the URIs of the segments and their partial
+        segments and initialization sections, keys, session keys, media,
+        variant playlists, preload hint, rendition reports and session data
+        of `playlist`. Returns `playlist`.
+
+        The tags a playlist made by `M3U8.copy()` shares with the original
+        playlist are replaced by copies first, see `M3U8.copy()`, so the
+        original playlist is left unchanged.
+        """
+        rewrite = self.rewrite
+
+        # Keys and initialization sections are shared by segments, and with
+        # segment_map, and rewritten only once: they're mapped by the id of
+        # the object they replace, kept along so that the id isn't reused.
+        # The segments are updated in a single pass, where mutable_key()
+        # would go through them for every key.
+        keys = {}
+        for index, key in enumerate(playlist.keys):
+            if key is None:
+                continue
+            if id(key) in keys:
+                new_key = keys[id(key)][1]
+                if new_key is not key:
+                    playlist.keys[index] = new_key
+                continue
+            new_key = key
+            uri = rewrite(key.uri)
+            if uri != key.uri:
+                new_key = playlist._own_key(playlist.keys, index)
+                new_key.uri = uri
+            keys[id(key)] = (key, new_key)
+        init_sections = {}
+        for index, init_section in enumerate(playlist.segment_map):
+            if init_section is None:
+                continue
+            if id(init_section) in init_sections:
+                new_section = init_sections[id(init_section)][1]
+                if new_section is not init_section:
+                    playlist.segment_map[index] = new_section
+                continue
+            new_section = init_section
+            uri = rewrite(init_section.uri)
+            if uri != init_section.uri:
+                new_section = playlist._mutable_init_section(index)
+                new_section.uri = uri
+            init_sections[id(init_section)] = (init_section, new_section)
+
+        # Segments are copied only when one of their URIs changes, and then
+        # without their partial segments unless those change too.
+        segments = playlist.segments
+        for index, segment in enumerate(segments):
+            changes = {}
+            uri = rewrite(segment.uri)
+            if uri != segment.uri:
+                changes["uri"] = uri
+            key = segment.key
+            if key is not None and id(key) in keys:
+                new_key = keys[id(key)][1]
+                if new_key is not key:
+                    changes["key"] = new_key
+            init_section = segment.init_section
+            if init_section is not None:
+                try:
+                    new_section = init_sections[id(init_section)][1]
+                except KeyError:
+                    new_section = init_section
+                    uri = rewrite(init_section.uri)
+                    if uri != init_section.uri:
+                        new_section = playlist._own(init_section)
+                        new_section.uri = uri
+                    init_sections[id(init_section)] = (init_section, new_section)
+                if new_section is not init_section:
+                    changes["init_section"] = new_section
+            part_uris = {}
+            for part_index, part in enumerate(segment.parts):
+                uri = rewrite(part.uri)
+                if uri != part.uri:
+                    part_uris[part_index] = uri
+            if part_uris:
+                segment = segments.mutable(index)
+                for name, value in changes.items():
+                    setattr(segment, name, value)
+                for part_index, uri in part_uris.items():
+                    segment.parts.mutable(part_index).uri = uri
+            elif changes:
+                segments._replace_attributes(index, **changes)
+
+        for index, key in enumerate(playlist.session_keys):
+            if key is not None:
+                uri = rewrite(key.uri)
+                if uri != key.uri:
+                    playlist._mutable_session_key(index).uri = uri
+
+        for tags in (
+            playlist.media,
+            playlist.playlists,
+            playlist.iframe_playlists,
+            playlist.image_playlists,
+            playlist.rendition_reports,
+            playlist.session_data,
+        ):
+            for index, tag in enumerate(tags):
+                uri = rewrite(tag.uri)
+                if uri != tag.uri:
+                    tags.mutable(index).uri = uri
+        # Copied along with the playlist by copy().
+        if playlist.preload_hint is not None:
+            playlist.preload_hint.uri = rewrite(playlist.preload_hint.uri)
+
+        playlist.files = [rewrite(uri) for uri in playlist.files]
+        return playlist
+
+    def rewrite_text(self, content):
+        """
+        Rewrites the URI lines and the URI attributes of the tags of
+        playlist text, without parsing it.
+        """
+        return URI_PATTERN.sub(self._replace_match, content)
+
+    def dumps(self, playlist, timespec="milliseconds", infspec="auto"):
+        """Same as `playlist.dumps()`, with the URIs rewritten."""
+        return self.rewrite_text(playlist.dumps(timespec, infspec))
+
+    def _replace_match(self, match):
+        uri = match.group(1)
+        if uri is not None:
+            return self.rewrite(uri)
+        return 'URI="' + self.rewrite(match.group(2)) + '"'
+
+
+def _append_query(uri, encoded):
+    if not encoded:
+        return uri
+    uri, hash_sign, fragment = uri.partition("#")
+    separator = "&" if "?" in uri else "?"
+    return uri + separator + encoded + hash_sign + fragment
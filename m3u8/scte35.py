@@ -0,0 +1,462 @@
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+"""
+Decoder for the SCTE-35 splice_info_section carried by EXT-X-CUE-OUT,
+EXT-X-CUE-OUT-CONT, EXT-OATCLS-SCTE35 and the SCTE35-* attributes of
+EXT-X-DATERANGE.
+
+Payloads are cached by content: the same base64 or hex string repeated on
+every EXT-X-CUE-OUT-CONT segment, or across refreshes of a live playlist,
+is decoded once, and so is an invalid payload repeated the same way.
+Decoded sections are immutable, so cached results can be shared freely.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+from dataclasses import dataclass
+from functools import lru_cache
+
+SPLICE_NULL = 0x00
+SPLICE_SCHEDULE = 0x04
+SPLICE_INSERT = 0x05
+TIME_SIGNAL = 0x06
+BANDWIDTH_RESERVATION = 0x07
+PRIVATE_COMMAND = 0xFF
+
+AVAIL_DESCRIPTOR = 0x00
+SEGMENTATION_DESCRIPTOR = 0x02
+TIME_DESCRIPTOR = 0x03
+
+# segmentation_type_id values followed by sub_segment_num/sub_segments_expected
+SUB_SEGMENT_TYPES = (0x34, 0x36, 0x38, 0x3A, 0x44, 0x46)
+
+CACHE_SIZE = 4096
+
+
+class SCTE35DecodeError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class BreakDuration:
+    auto_return: bool
+    duration: int
+
+    @property
+    def seconds(self):
+        return self.duration / 90000
+
+
+@dataclass(frozen=True)
+class SpliceInsert:
+    splice_event_id: int
+    splice_event_cancel_indicator: bool
+    out_of_network_indicator: bool | None = None
+    program_splice_flag: bool | None = None
+    splice_immediate_flag: bool | None = None
+    pts_time: int | None = None
+    components: tuple = ()
+    break_duration: BreakDuration | None = None
+    unique_program_id: int | None = None
+    avail_num: int | None = None
+    avails_expected: int | None = None
+
+
+@dataclass(frozen=True)
+class TimeSignal:
+    pts_time: int | None
+
+
+@dataclass(frozen=True)
+class PrivateCommand:
+    identifier: int
+    private_bytes: bytes
+
+
+@dataclass(frozen=True)
+class SpliceDescriptor:
+    """A descriptor this module does not decode, kept as raw bytes."""
+
+    tag: int
+    identifier: int
+    private_bytes: bytes
+
+
+@dataclass(frozen=True)
+class AvailDescriptor:
+    identifier: int
+    provider_avail_id: int
+
+
+@dataclass(frozen=True)
+class TimeDescriptor:
+    identifier: int
+    tai_seconds: int
+    tai_ns: int
+    utc_offset: int
+
+
+@dataclass(frozen=True)
+class SegmentationDescriptor:
+    identifier: int
+    segmentation_event_id: int
+    segmentation_event_cancel_indicator: bool
+    program_segmentation_flag: bool | None = None
+    delivery_not_restricted_flag: bool | None = None
+    web_delivery_allowed_flag: bool | None = None
+    no_regional_blackout_flag: bool | None = None
+    archive_allowed_flag: bool | None = None
+    device_restrictions: int | None = None
+    components: tuple = ()
+    segmentation_duration: int | None = None
+    segmentation_upid_type: int | None = None
+    segmentation_upid: bytes | None = None
+    segmentation_type_id: int | None = None
+    segment_num: int | None = None
+    segments_expected: int | None = None
+    sub_segment_num: int | None = None
+    sub_segments_expected: int | None = None
+
+
+@dataclass(frozen=True)
+class SpliceInfoSection:
+    table_id: int
+    section_syntax_indicator: bool
+    private_indicator: bool
+    sap_type: int
+    section_length: int
+    protocol_version: int
+    encrypted_packet: bool
+    encryption_algorithm: int
+    pts_adjustment: int
+    cw_index: int
+    tier: int
+    splice_command_type: int
+    splice_command: object
+    descriptors: tuple
+    crc_32: int
+    crc_valid: bool
+
+
+class _BitReader:
+    def __init__(self, data):
+        self.data = data
+        self.value = int.from_bytes(data, "big")
+        self.size = len(data) * 8
+        self.position = 0
+
+    def read(self, bits):
+        if self.position + bits > self.size:
+            raise SCTE35DecodeError("SCTE-35 payload is truncated")
+        self.position += bits
+        return (self.value >> (self.size - self.position)) & ((1 << bits) - 1)
+
+    def flag(self):
+        return bool(self.read(1))
+
+    def skip(self, bits):
+        self.read(bits)
+
+    def read_bytes(self, length):
+        start = self.position // 8
+        self.skip(length * 8)
+        return self.data[start : start + length]
+
+    @property
+    def byte_position(self):
+        return self.position // 8
+
+
+def payload_to_bytes(payload):
+    """
+    Converts a SCTE-35 payload as found in playlists, either base64 or a
+    hexadecimal string prefixed with 0x, to bytes.
+    """
+    payload = payload.strip().strip('"')
+    try:
+        if payload[:2] in ("0x", "0X"):
+            return bytes.fromhex(payload[2:])
+        return base64.b64decode(payload, validate=True)
+    except (ValueError, binascii.Error) as error:
+        raise SCTE35DecodeError(f"Invalid SCTE-35 payload: {payload!r}") from error
+
+
+def decode(payload):
+    """
+    Decodes a base64 or 0x-prefixed hexadecimal SCTE-35 payload into a
+    SpliceInfoSection. Results are cached by payload.
+    Raises SCTE35DecodeError if the payload is not a valid section.
+    """
+    section = _decode(payload)
+    if isinstance(section, SCTE35DecodeError):
+        raise SCTE35DecodeError(*section.args) from section.__cause__
+    return section
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _decode(payload):
+    # Returns the error of an invalid payload, so that it's cached too.
+    try:
+        return parse_splice_info_section(payload_to_bytes(payload))
+    except SCTE35DecodeError as error:
+        return error.with_traceback(None)
+
+
+decode.cache_info = _decode.cache_info
+decode.cache_clear = _decode.cache_clear
+
+
+def decode_many(payloads):
+    """
+    Decodes a sequence of payloads, decoding each distinct payload once.
+    Returns the sections in the same order as `payloads`, None for None or
+    empty payloads.
+    """
+    sections = {payload: decode(payload) for payload in set(payloads) if payload}
+    return [sections.get(payload) for payload in payloads]
+
+
+def parse_splice_info_section(data):
+    reader = _BitReader(data)
+    table_id = reader.read(8)
+    if table_id != 0xFC:
+        raise SCTE35DecodeError(f"Invalid SCTE-35 table_id: {table_id:#x}")
+
+    section_syntax_indicator = reader.flag()
+    private_indicator = reader.flag()
+    sap_type = reader.read(2)
+    section_length = reader.read(12)
+    protocol_version = reader.read(8)
+    encrypted_packet = reader.flag()
+    encryption_algorithm = reader.read(6)
+    pts_adjustment = reader.read(33)
+    cw_index = reader.read(8)
+    tier = reader.read(12)
+    splice_command_length = reader.read(12)
+    splice_command_type = reader.read(8)
+
+    command_start = reader.byte_position
+    if encrypted_packet:
+        splice_command = None
+    else:
+        splice_command = _parse_splice_command(
+            splice_command_type, splice_command_length, reader
+        )
+    # 0xFFF is the legacy value for an unspecified command length.
+    if splice_command_length != 0xFFF:
+        reader.position = (command_start + splice_command_length) * 8
+
+    descriptors = ()
+    if not encrypted_packet:
+        descriptor_loop_length = reader.read(16)
+        descriptors_end = reader.byte_position + descriptor_loop_length
+        descriptors = []
+        while reader.byte_position < descriptors_end:
+            descriptors.append(_parse_descriptor(reader))
+        descriptors = tuple(descriptors)
+
+    section_end = 3 + section_length
+    if len(data) < section_end:
+        raise SCTE35DecodeError("SCTE-35 payload is truncated")
+    crc_32 = int.from_bytes(data[section_end - 4 : section_end], "big")
+
+    return SpliceInfoSection(
+        table_id=table_id,
+        section_syntax_indicator=section_syntax_indicator,
+        private_indicator=private_indicator,
+        sap_type=sap_type,
+        section_length=section_length,
+        protocol_version=protocol_version,
+        encrypted_packet=encrypted_packet,
+        encryption_algorithm=encryption_algorithm,
+        pts_adjustment=pts_adjustment,
+        cw_index=cw_index,
+        tier=tier,
+        splice_command_type=splice_command_type,
+        splice_command=splice_command,
+        descriptors=descriptors,
+        crc_32=crc_32,
+        crc_valid=crc32_mpeg2(data[: section_end - 4]) == crc_32,
+    )
+
+
+def _parse_splice_time(reader):
+    if reader.flag():
+        reader.skip(6)
+        return reader.read(33)
+    reader.skip(7)
+    return None
+
+
+def _parse_splice_command(command_type, length, reader):
+    if command_type == SPLICE_INSERT:
+        return _parse_splice_insert(reader)
+    if command_type == TIME_SIGNAL:
+        return TimeSignal(pts_time=_parse_splice_time(reader))
+    if command_type == PRIVATE_COMMAND:
+        identifier = reader.read(32)
+        private_bytes = reader.read_bytes(length - 4) if length != 0xFFF else b""
+        return PrivateCommand(identifier=identifier, private_bytes=private_bytes)
+    # splice_null and bandwidth_reservation carry no fields, splice_schedule
+    # is left undecoded.
+    return None
+
+
+def _parse_splice_insert(reader):
+    splice_event_id = reader.read(32)
+    cancel = reader.flag()
+    reader.skip(7)
+    if cancel:
+        return SpliceInsert(
+            splice_event_id=splice_event_id, splice_event_cancel_indicator=True
+        )
+
+    out_of_network = reader.flag()
+    program_splice = reader.flag()
+    duration_flag = reader.flag()
+    splice_immediate = reader.flag()
+    reader.skip(4)
+
+    pts_time = None
+    components = []
+    if program_splice and not splice_immediate:
+        pts_time = _parse_splice_time(reader)
+    if not program_splice:
+        for _ in range(reader.read(8)):
+            component_tag = reader.read(8)
+            component_pts_time = None
+            if not splice_immediate:
+                component_pts_time = _parse_splice_time(reader)
+            components.append((component_tag, component_pts_time))
+
+    break_duration = None
+    if duration_flag:
+        auto_return = reader.flag()
+        reader.skip(6)
+        break_duration = BreakDuration(
+            auto_return=auto_return, duration=reader.read(33)
+        )
+
+    return SpliceInsert(
+        splice_event_id=splice_event_id,
+        splice_event_cancel_indicator=False,
+        out_of_network_indicator=out_of_network,
+        program_splice_flag=program_splice,
+        splice_immediate_flag=splice_immediate,
+        pts_time=pts_time,
+        components=tuple(components),
+        break_duration=break_duration,
+        unique_program_id=reader.read(16),
+        avail_num=reader.read(8),
+        avails_expected=reader.read(8),
+    )
+
+
+def _parse_descriptor(reader):
+    tag = reader.read(8)
+    length = reader.read(8)
+    end = reader.byte_position + length
+    identifier = reader.read(32)
+
+    if tag == AVAIL_DESCRIPTOR:
+        descriptor = AvailDescriptor(
+            identifier=identifier, provider_avail_id=reader.read(32)
+        )
+    elif tag == TIME_DESCRIPTOR:
+        descriptor = TimeDescriptor(
+            identifier=identifier,
+            tai_seconds=reader.read(48),
+            tai_ns=reader.read(32),
+            utc_offset=reader.read(16),
+        )
+    elif tag == SEGMENTATION_DESCRIPTOR:
+        descriptor = _parse_segmentation_descriptor(identifier, end, reader)
+    else:
+        descriptor = SpliceDescriptor(
+            tag=tag,
+            identifier=identifier,
+            private_bytes=reader.read_bytes(end - reader.byte_position),
+        )
+
+    reader.position = end * 8
+    return descriptor
+
+
+def _parse_segmentation_descriptor(identifier, end, reader):
+    event_id = reader.read(32)
+    cancel = reader.flag()
+    reader.skip(7)
+    if cancel:
+        return SegmentationDescriptor(
+            identifier=identifier,
+            segmentation_event_id=event_id,
+            segmentation_event_cancel_indicator=True,
+        )
+
+    fields = {}
+    program_segmentation = reader.flag()
+    duration_flag = reader.flag()
+    delivery_not_restricted = reader.flag()
+    if delivery_not_restricted:
+        reader.skip(5)
+    else:
+        fields["web_delivery_allowed_flag"] = reader.flag()
+        fields["no_regional_blackout_flag"] = reader.flag()
+        fields["archive_allowed_flag"] = reader.flag()
+        fields["device_restrictions"] = reader.read(2)
+
+    components = []
+    if not program_segmentation:
+        for _ in range(reader.read(8)):
+            component_tag = reader.read(8)
+            reader.skip(7)
+            components.append((component_tag, reader.read(33)))
+
+    if duration_flag:
+        fields["segmentation_duration"] = reader.read(40)
+
+    upid_type = reader.read(8)
+    upid = reader.read_bytes(reader.read(8))
+    segmentation_type_id = reader.read(8)
+    fields["segment_num"] = reader.read(8)
+    fields["segments_expected"] = reader.read(8)
+    if segmentation_type_id in SUB_SEGMENT_TYPES and reader.byte_position + 2 <= end:
+        fields["sub_segment_num"] = reader.read(8)
+        fields["sub_segments_expected"] = reader.read(8)
+
+    return SegmentationDescriptor(
+        identifier=identifier,
+        segmentation_event_id=event_id,
+        segmentation_event_cancel_indicator=False,
+        program_segmentation_flag=program_segmentation,
+        delivery_not_restricted_flag=delivery_not_restricted,
+        components=tuple(components),
+        segmentation_upid_type=upid_type,
+        segmentation_upid=upid,
+        segmentation_type_id=segmentation_type_id,
+        **fields,
+    )
+
+
+def _crc32_mpeg2_table():
+    table = []
+    for byte in range(256):
+        crc = byte << 24
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x04C11DB7) if crc & 0x80000000 else (crc << 1)
+        table.append(crc & 0xFFFFFFFF)
+    return table
+
+
+_CRC32_TABLE = _crc32_mpeg2_table()
+
+
+def crc32_mpeg2(data):
+    crc = 0xFFFFFFFF
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFFFFFF) ^ _CRC32_TABLE[(crc >> 24) ^ byte]
+    return crc
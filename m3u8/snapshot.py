@@ -0,0 +1,290 @@
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+"""
+Compact binary snapshots of parsed playlists, much faster to load than the
+playlist text is to parse.
+
+A snapshot holds the dictionary returned by `m3u8.parse()`. Segments are
+stored column by column: durations in a float array, URIs, titles and
+dates as indices into a shared string table, flags in byte arrays, and the
+remaining values (partial segments, dateranges, ...) as JSON, deduplicated
+so that e.g. the key shared by all the segments is stored once. Values
+which are the same for every segment are stored once as well. Everything
+else in the playlist is stored as JSON.
+
+Layout, all integers little endian:
+
+    magic (8 bytes) | version (uint32) | header size (uint32) | header (JSON)
+    | padding to 8 bytes | columns and string table
+
+The header lists the columns with their offsets in the data that follows.
+Snapshots can be decoded straight from a memory mapped file.
+"""
+
+import json
+import mmap
+import sys
+from array import array
+from datetime import datetime
+
+MAGIC = b"\x89M3U8SNP"
+VERSION = 1
+
+_PREAMBLE_SIZE = len(MAGIC) + 8
+
+# Column kinds, with the array type code their values are stored as.
+_FLOAT = "d"
+_INT = "q"
+_BOOL = "B"
+_STRING = "s"
+_DATETIME = "t"
+_JSON = "j"
+_CONSTANT = "c"
+_ARRAY_CODES = {_FLOAT: "d", _INT: "q", _BOOL: "B", _STRING: "i", _DATETIME: "i"}
+_JSON_CODE = "i"
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def encode(data, base_uri=None):
+    """Returns the snapshot of `data`, as returned by `m3u8.parse()`."""
+    data = dict(data)
+    segments = data.pop("segments", [])
+
+    strings = {}
+    chunks = []
+    size = 0
+    columns = []
+
+    def add_chunk(values):
+        nonlocal size
+        if sys.byteorder != "little":
+            values.byteswap()
+        chunk = values.tobytes()
+        offset = size
+        chunks.append(chunk)
+        size += len(chunk)
+        padding = -size % 8
+        if padding:
+            chunks.append(b"\0" * padding)
+            size += padding
+        return offset
+
+    names = []
+    for segment in segments:
+        for name in segment:
+            if name not in names:
+                names.append(name)
+
+    for name in names:
+        missing = [i for i, segment in enumerate(segments) if name not in segment]
+        values = [segment.get(name) for segment in segments]
+        kind = _column_kind(values, missing)
+        if kind == _CONSTANT:
+            columns.append([name, kind, values[0]])
+            continue
+        if kind == _JSON:
+            table, indices = _deduplicate(values)
+            table = json.dumps(table, default=_encode_json_value).encode("utf8")
+            encoded = [add_chunk(array("B", table)), len(table)]
+            values = array(_JSON_CODE, indices)
+        elif kind in (_STRING, _DATETIME):
+            if kind == _DATETIME:
+                values = [
+                    None if value is None else value.isoformat() for value in values
+                ]
+            values = array(
+                _ARRAY_CODES[kind],
+                [
+                    -1 if value is None else strings.setdefault(value, len(strings))
+                    for value in values
+                ],
+            )
+            encoded = []
+        else:
+            values = array(_ARRAY_CODES[kind], [value or 0 for value in values])
+            encoded = []
+        columns.append(
+            [
+                name,
+                kind,
+                add_chunk(values),
+                len(values),
+                add_chunk(array("I", missing)),
+                len(missing),
+            ]
+            + encoded
+        )
+
+    string_table = "\n".join(strings).encode("utf8")
+    header = {
+        "base_uri": base_uri,
+        "data": data,
+        "segments": len(segments),
+        "columns": columns,
+        "strings": [add_chunk(array("B", string_table)), len(string_table)],
+    }
+    header = json.dumps(header, default=_encode_json_value).encode("utf8")
+    header += b" " * (-(_PREAMBLE_SIZE + len(header)) % 8)
+
+    return b"".join(
+        [
+            MAGIC,
+            VERSION.to_bytes(4, "little"),
+            len(header).to_bytes(4, "little"),
+            header,
+        ]
+        + chunks
+    )
+
+
+def decode(buffer):
+    """
+    Returns the parsed data and base URI stored in the snapshot found in
+    `buffer`, which may be bytes or any object supporting the buffer
+    protocol, such as a memory mapped file.
+    """
+    view = memoryview(buffer).cast("B")
+    if bytes(view[: len(MAGIC)]) != MAGIC:
+        raise SnapshotError("Not a playlist snapshot")
+    version = int.from_bytes(view[len(MAGIC) : len(MAGIC) + 4], "little")
+    if version != VERSION:
+        raise SnapshotError(f"Unsupported playlist snapshot version {version}")
+    header_size = int.from_bytes(view[len(MAGIC) + 4 : _PREAMBLE_SIZE], "little")
+    start = _PREAMBLE_SIZE + header_size
+    header = json.loads(
+        bytes(view[_PREAMBLE_SIZE:start]), object_hook=_decode_json_object
+    )
+
+    def read(code, offset, count):
+        chunk = view[start + offset : start + offset + count * array(code).itemsize]
+        if sys.byteorder == "little":
+            return chunk.cast(code).tolist()
+        values = array(code, chunk)
+        values.byteswap()
+        return values.tolist()
+
+    offset, length = header["strings"]
+    strings = bytes(view[start + offset : start + offset + length]).decode("utf8")
+    # Index -1 stands for None.
+    strings = strings.split("\n") + [None]
+
+    count = header["segments"]
+    constants = {}
+    names = []
+    columns = []
+    missing_by_name = {}
+    for column in header["columns"]:
+        if column[1] == _CONSTANT:
+            name, _, constants[name] = column
+            continue
+        name, kind, offset, length, missing_offset, missing_count, *extra = column
+        if kind == _JSON:
+            table_offset, table_length = extra
+            table = json.loads(
+                bytes(view[start + table_offset : start + table_offset + table_length]),
+                object_hook=_decode_json_object,
+            )
+            table.append(None)
+            values = [table[index] for index in read(_JSON_CODE, offset, length)]
+        elif kind in (_STRING, _DATETIME):
+            values = [strings[index] for index in read("i", offset, length)]
+            if kind == _DATETIME:
+                values = [
+                    None if value is None else datetime.fromisoformat(value)
+                    for value in values
+                ]
+        else:
+            values = read(_ARRAY_CODES[kind], offset, length)
+            if kind == _BOOL:
+                values = [value == 1 for value in values]
+        names.append(name)
+        columns.append(values)
+        if missing_count:
+            missing_by_name[name] = read("I", missing_offset, missing_count)
+
+    if names:
+        segments = []
+        append = segments.append
+        copy = constants.copy
+        for row in zip(*columns):
+            segment = copy()
+            segment.update(zip(names, row))
+            append(segment)
+    else:
+        segments = [constants.copy() for _ in range(count)]
+    for name, missing in missing_by_name.items():
+        for index in missing:
+            del segments[index][name]
+
+    data = header["data"]
+    data["segments"] = segments
+    return data, header["base_uri"]
+
+
+def decode_file(path):
+    """Same as `decode`, reading the snapshot from a memory mapped file."""
+    with open(path, "rb") as fileobj:
+        with mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return decode(mapped)
+
+
+def _column_kind(values, missing):
+    first = values[0]
+    if (
+        not missing
+        and (first is None or type(first) in (bool, int, float, str))
+        and all(value == first and type(value) is type(first) for value in values)
+    ):
+        return _CONSTANT
+    missing = set(missing)
+    present = [value for i, value in enumerate(values) if i not in missing]
+    types = {type(value) for value in present}
+    if types <= {bool}:
+        return _BOOL
+    if types <= {float}:
+        return _FLOAT
+    if types <= {int}:
+        return _INT
+    if types <= {str, type(None)} and not any(
+        "\n" in value for value in present if value
+    ):
+        return _STRING
+    if all(value is None or isinstance(value, datetime) for value in present):
+        return _DATETIME
+    return _JSON
+
+
+def _deduplicate(values):
+    """Returns the distinct values, by identity, and the index of each value."""
+    table = []
+    positions = {}
+    indices = []
+    for value in values:
+        if value is None:
+            indices.append(-1)
+            continue
+        position = positions.get(id(value))
+        if position is None:
+            position = positions[id(value)] = len(table)
+            table.append(value)
+        indices.append(position)
+    return table, indices
+
+
+def _encode_json_value(value):
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    raise TypeError(
+        f"Object of type {type(value).__name__} can't be stored in a snapshot"
+    )
+
+
+def _decode_json_object(obj):
+    if len(obj) == 1 and "__datetime__" in obj:
+        return datetime.fromisoformat(obj["__datetime__"])
+    return obj
@@ -0,0 +1,366 @@
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+from bisect import bisect_right
+from datetime import datetime, timedelta
+
+from m3u8.parser import cast_date_time
+
+INFINITY = float("inf")
+
+
+class IntervalTree:
+    """
+    Static interval tree answering overlap queries in O(log n + k).
+
+    Intervals are ``(start, end, value)`` triples, inclusive on both ends.
+    They are kept sorted by start, and every node of the implicit balanced
+    tree built over that order stores the largest end found in its subtree,
+    so whole subtrees ending before the query are skipped.
+    """
+
+    def __init__(self, intervals=()):
+        self._intervals = sorted(intervals, key=lambda item: (item[0], item[1]))
+        self._max_end = [None] * len(self._intervals)
+        self._build(0, len(self._intervals))
+
+    def _build(self, lo, hi):
+        if lo >= hi:
+            return -INFINITY
+        mid = (lo + hi) // 2
+        max_end = max(
+            self._intervals[mid][1], self._build(lo, mid), self._build(mid + 1, hi)
+        )
+        self._max_end[mid] = max_end
+        return max_end
+
+    def __len__(self):
+        return len(self._intervals)
+
+    def __iter__(self):
+        return (value for _, _, value in self._intervals)
+
+    def overlapping(self, start, end=None):
+        """
+        Returns the values of all intervals overlapping ``[start, end]``,
+        ordered by interval start. Without ``end`` a point query is made.
+        """
+        if end is None:
+            end = start
+        result = []
+        self._query(0, len(self._intervals), start, end, result)
+        return result
+
+    def _query(self, lo, hi, start, end, result):
+        if lo >= hi:
+            return
+        mid = (lo + hi) // 2
+        if self._max_end[mid] < start:
+            return
+        self._query(lo, mid, start, end, result)
+        interval_start, interval_end, value = self._intervals[mid]
+        if interval_start > end:
+            return
+        if interval_end >= start:
+            result.append(value)
+        self._query(mid + 1, hi, start, end, result)
+
+
+class AdBreak:
+    """
+    An ad break delimited by EXT-X-CUE-OUT and EXT-X-CUE-IN
+
+    `segments`
+      the segments played during the break
+
+    `start_media_sequence` / `end_media_sequence`
+      media sequence numbers of the first and last segments of the break
+
+    `start_date` / `end_date`
+      wall clock boundaries of the break, only set when the playlist
+      carries EXT-X-PROGRAM-DATE-TIME
+
+    `duration`
+      actual duration of the break, the sum of its segments' EXTINF values
+
+    `planned_duration`
+      duration announced by EXT-X-CUE-OUT (or the first EXT-X-CUE-OUT-CONT
+      in the playlist), as a float
+
+    `scte35` / `oatcls_scte35`
+      SCTE-35 payloads signalling the break
+
+    `asset_metadata`
+      EXT-X-ASSET attributes announced with the break
+
+    `is_started`
+      whether the EXT-X-CUE-OUT tag is present in the playlist; it is False
+      when the playlist window starts in the middle of the break
+
+    `is_ended`
+      whether the EXT-X-CUE-IN tag closing the break was found
+    """
+
+    def __init__(self, segments, is_started=True, is_ended=False):
+        self.segments = segments
+        self.is_started = is_started
+        self.is_ended = is_ended
+
+    @property
+    def start_media_sequence(self):
+        return self.segments[0].media_sequence
+
+    @property
+    def end_media_sequence(self):
+        return self.segments[-1].media_sequence
+
+    @property
+    def start_date(self):
+        return self.segments[0].current_program_date_time
+
+    @property
+    def end_date(self):
+        last_segment = self.segments[-1]
+        if last_segment.current_program_date_time is None:
+            return None
+        return last_segment.current_program_date_time + timedelta(
+            seconds=last_segment.duration or 0
+        )
+
+    @property
+    def duration(self):
+        return sum(segment.duration or 0 for segment in self.segments)
+
+    @property
+    def planned_duration(self):
+        for segment in self.segments:
+            if segment.scte35_duration:
+                try:
+                    return float(segment.scte35_duration)
+                except ValueError:
+                    return None
+        return None
+
+    @property
+    def scte35(self):
+        return self.segments[0].scte35
+
+    @property
+    def oatcls_scte35(self):
+        return self.segments[0].oatcls_scte35
+
+    @property
+    def asset_metadata(self):
+        return self.segments[0].asset_metadata
+
+    def __repr__(self):
+        return "<AdBreak media_sequence={}-{}>".format(
+            self.start_media_sequence, self.end_media_sequence
+        )
+
+
+class AdBreakTracker:
+    """
+    Extracts the ad breaks of a playlist in a single pass over its segments
+    and keeps them up to date across refreshes of a live playlist.
+
+    `update` only looks at the segments whose media sequence number is newer
+    than the last one seen, so a break that was still open in the previous
+    refresh is extended in place and new breaks are appended to `ad_breaks`.
+    The last break has `is_ended` False while its EXT-X-CUE-IN is pending.
+    Breaks that are over and whose segments all left the playlist are
+    dropped from `ad_breaks`, so following a live playlist for a long time
+    doesn't keep every break seen.
+    """
+
+    def __init__(self):
+        self.ad_breaks = []
+        self.last_media_sequence = None
+        self._current = None
+
+    def update(self, playlist):
+        segments = playlist.segments
+        if self.last_media_sequence is not None:
+            first_new = self.last_media_sequence + 1 - (playlist.media_sequence or 0)
+            segments = segments[max(first_new, 0) :]
+        self.feed(segments)
+        self._forget_before(playlist.media_sequence or 0)
+        return self.ad_breaks
+
+    def _forget_before(self, media_sequence):
+        count = 0
+        for ad_break in self.ad_breaks:
+            if ad_break is self._current:
+                break
+            end = ad_break.end_media_sequence
+            if end is None or end >= media_sequence:
+                break
+            count += 1
+        del self.ad_breaks[:count]
+
+    def feed(self, segments):
+        for segment in segments:
+            current = self._current
+            if current is not None and (segment.cue_in or segment.cue_out_start):
+                current.is_ended = segment.cue_in
+                self._current = current = None
+
+            if segment.cue_out_start:
+                self._current = AdBreak([segment])
+                self.ad_breaks.append(self._current)
+            elif current is not None:
+                current.segments.append(segment)
+            elif segment.cue_out:
+                self._current = AdBreak([segment], is_started=False)
+                self.ad_breaks.append(self._current)
+
+            if segment.media_sequence is not None:
+                self.last_media_sequence = segment.media_sequence
+
+
+def find_ad_breaks(segments):
+    """
+    Groups the segments between EXT-X-CUE-OUT and EXT-X-CUE-IN into AdBreak
+    objects, in playlist order.
+    """
+    tracker = AdBreakTracker()
+    tracker.feed(segments)
+    return tracker.ad_breaks
+
+
+class TimelineIndex:
+    """
+    Interval index over the dateranges and ad breaks of a playlist.
+
+    Dateranges found in segments and partial segments are merged by ID and
+    placed on the wall clock using START-DATE and the first of END-DATE,
+    DURATION or PLANNED-DURATION found. A daterange with END-ON-NEXT=YES ends
+    at the START-DATE of the following daterange of the same CLASS, or is left
+    open when there is none.
+
+    Ad breaks are indexed by media sequence number and, when the playlist
+    carries EXT-X-PROGRAM-DATE-TIME, on the wall clock as well.
+
+    Segments are indexed on the wall clock when the playlist carries
+    EXT-X-PROGRAM-DATE-TIME, by their timestamps: no datetime objects are
+    built for them.
+
+    Wall clock arguments may be given as datetime objects or POSIX timestamps.
+    """
+
+    def __init__(self, playlist):
+        self.daterange_tree = IntervalTree(_daterange_intervals(playlist.segments))
+
+        ad_breaks = playlist.ad_breaks()
+        self.ad_break_tree = IntervalTree(
+            (ad_break.start_media_sequence, ad_break.end_media_sequence, ad_break)
+            for ad_break in ad_breaks
+        )
+        dated_ad_breaks = []
+        for ad_break in ad_breaks:
+            start = ad_break.segments[0].timestamp()
+            if start is not None:
+                last_segment = ad_break.segments[-1]
+                end = last_segment.timestamp() + (last_segment.duration or 0)
+                dated_ad_breaks.append((start, end, ad_break))
+        self.dated_ad_break_tree = IntervalTree(dated_ad_breaks)
+
+        dated_segments = []
+        for segment in playlist.segments:
+            start = segment.timestamp()
+            if start is not None:
+                dated_segments.append((start, start + (segment.duration or 0), segment))
+        dated_segments.sort(key=lambda item: item[0])
+        self._segment_starts = [start for start, _, _ in dated_segments]
+        self._dated_segments = dated_segments
+
+    def dateranges(self, start, end=None):
+        """Returns the DateRange objects active within ``[start, end]``."""
+        return self.daterange_tree.overlapping(_to_timestamp(start), _to_timestamp(end))
+
+    def ad_breaks(self, first_media_sequence, last_media_sequence=None):
+        """
+        Returns the ad breaks overlapping the given media sequence numbers.
+        """
+        return self.ad_break_tree.overlapping(first_media_sequence, last_media_sequence)
+
+    def ad_breaks_between(self, start, end=None):
+        """Returns the ad breaks on air within ``[start, end]``."""
+        return self.dated_ad_break_tree.overlapping(
+            _to_timestamp(start), _to_timestamp(end)
+        )
+
+    def segment_at(self, when):
+        """
+        Returns the segment on air at ``when``, or None when no dated
+        segment covers it.
+        """
+        when = _to_timestamp(when)
+        index = bisect_right(self._segment_starts, when) - 1
+        if index < 0:
+            return None
+        _, end, segment = self._dated_segments[index]
+        return segment if when < end else None
+
+
+def _to_timestamp(value):
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return value
+
+
+def _daterange_intervals(segments):
+    merged = {}
+    for segment in segments:
+        for daterange in segment.dateranges:
+            _merge_daterange(merged, daterange)
+        for part in segment.parts:
+            for daterange in part.dateranges:
+                _merge_daterange(merged, daterange)
+
+    # (start, end, end_on_next, daterange) entries, kept mutable so
+    # END-ON-NEXT ends can be filled in once all ranges are known.
+    entries = []
+    for daterange, attributes in merged.values():
+        if not attributes.get("start_date"):
+            continue
+        start = cast_date_time(attributes["start_date"]).timestamp()
+        if attributes.get("end_date"):
+            end = cast_date_time(attributes["end_date"]).timestamp()
+        elif attributes.get("duration") is not None:
+            end = start + attributes["duration"]
+        elif attributes.get("planned_duration") is not None:
+            end = start + attributes["planned_duration"]
+        else:
+            end = start
+        entries.append([start, end, attributes.get("end_on_next") == "YES", daterange])
+
+    by_class = {}
+    for entry in sorted(entries, key=lambda entry: entry[0]):
+        by_class.setdefault(entry[3].class_, []).append(entry)
+    for chain in by_class.values():
+        for entry, following in zip(chain, chain[1:] + [None]):
+            if entry[2]:
+                entry[1] = following[0] if following else INFINITY
+
+    return [(start, end, daterange) for start, end, _, daterange in entries]
+
+
+def _merge_daterange(merged, daterange):
+    """
+    Tags sharing an ID describe the same daterange and may each carry part
+    of its attributes (e.g. SCTE35-OUT first, DURATION and SCTE35-IN later).
+    """
+    if daterange.id not in merged:
+        merged[daterange.id] = (daterange, {})
+    attributes = merged[daterange.id][1]
+    for name, value in (
+        ("start_date", daterange.start_date),
+        ("end_date", daterange.end_date),
+        ("duration", daterange.duration),
+        ("planned_duration", daterange.planned_duration),
+        ("end_on_next", daterange.end_on_next),
+    ):
+        if value is not None and attributes.get(name) is None:
+            attributes[name] = value
@@ -1,5 +1,85 @@
 from m3u8 import protocol
-from m3u8.version_matching_rules import VersionMatchingError, available_rules
+from m3u8.version_matching_rules import (
+    PlaylistRuleBase,
+    VersionMatchingError,
+    VersionMatchRuleBase,
+    available_playlist_rules,
+    line_tag,
+    rules_by_tag,
+)
+
+
+def compile_rules(
+    rules: list[type[VersionMatchRuleBase]],
+) -> dict[str, list[type[VersionMatchRuleBase]]]:
+    """Indexes rules by the tags they apply to."""
+    rules_by_tag = {}
+    for rule in rules:
+        for tag in rule.tags:
+            rules_by_tag.setdefault(tag, []).append(rule)
+    return rules_by_tag
+
+
+class LineValidator:
+    """
+    Checks playlist lines against the validation rules as they are parsed,
+    so strict mode doesn't need a separate pass over the file.
+
+    Lines are dispatched by tag to the rules registered for it. Lines seen
+    before EXT-X-VERSION are kept until the version is known; when the
+    playlist has no EXT-X-VERSION no version matching errors are reported.
+    Playlist rules report their errors once `finish` is called. All errors
+    are collected rather than stopping at the first one.
+    """
+
+    def __init__(self, rules=None, playlist_rules=None):
+        self.rules_by_tag = rules_by_tag if rules is None else compile_rules(rules)
+        if playlist_rules is None:
+            playlist_rules = available_playlist_rules
+        self.playlist_rules: list[PlaylistRuleBase] = []
+        self.playlist_rules_by_tag = {}
+        for rule in playlist_rules:
+            instance = rule()
+            self.playlist_rules.append(instance)
+            for tag in rule.tags:
+                self.playlist_rules_by_tag.setdefault(tag, []).append(instance)
+        self.version = None
+        self.errors: list[VersionMatchingError] = []
+        self._pending = []
+
+    def feed(self, line_number: int, line: str):
+        tag = line_tag(line)
+        if tag == protocol.ext_x_version:
+            if self.version is None:
+                self.version = float(line.split(":")[1])
+                for pending in self._pending:
+                    self._check(*pending)
+                self._pending = []
+            return
+
+        for playlist_rule in self.playlist_rules_by_tag.get(tag, ()):
+            playlist_rule.feed(line_number, line)
+
+        rules = self.rules_by_tag.get(tag)
+        if rules is None:
+            return
+
+        if self.version is None:
+            self._pending.append((line_number, line, rules))
+        else:
+            self._check(line_number, line, rules)
+
+    def _check(self, line_number, line, rules):
+        for rule in rules:
+            if not rule.check(self.version, line):
+                self.errors.append(rule.error(line_number, line))
+
+    def finish(self) -> list[VersionMatchingError]:
+        """Returns all the errors found, ordered by line number."""
+        for playlist_rule in self.playlist_rules:
+            self.errors.extend(playlist_rule.finish(self.version))
+        self.errors.sort(key=lambda error: error.line_number)
+        return self.errors
 
 
 def get_version(file_lines: list[str]):
@@ -15,23 +95,16 @@ def valid_in_all_rules(
     line_number: int, line: str, version: float
 ) -> list[VersionMatchingError]:
     errors = []
-    for rule in available_rules:
-        validator = rule(version, line_number, line)
-
-        if not validator.validate():
-            errors.append(validator.get_error())
+    for rule in rules_by_tag.get(line_tag(line), ()):
+        if not rule.check(version, line):
+            errors.append(rule.error(line_number, line))
 
     return errors
 
 
 def validate(file_lines: list[str]) -> list[VersionMatchingError]:
-    found_version = get_version(file_lines)
-    if found_version is None:
-        return []
-
-    errors = []
+    validator = LineValidator()
     for number, line in enumerate(file_lines):
-        errors_in_line = valid_in_all_rules(number, line, found_version)
-        errors.extend(errors_in_line)
+        validator.feed(number, line)
 
-    return errors
+    return validator.finish()
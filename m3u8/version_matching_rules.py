@@ -1,3 +1,7 @@
+from __future__ import annotations
+
+import math
+import re
 from dataclasses import dataclass
 
 from m3u8 import protocol
@@ -10,6 +14,15 @@ class VersionMatchingError(Exception):
     how_to_fix: str = "Please fix the version matching error."
     description: str = "There is a version matching error in the file."
 
+    def __reduce__(self):
+        # Exceptions are pickled with their args, which dataclasses don't set.
+        return type(self), (
+            self.line_number,
+            self.line,
+            self.how_to_fix,
+            self.description,
+        )
+
     def __str__(self):
         return (
             "Version matching error found in the file when parsing in strict mode.\n"
@@ -20,9 +33,57 @@ class VersionMatchingError(Exception):
         )
 
 
+@dataclass
+class PlaylistValidationError(VersionMatchingError):
+    how_to_fix: str = "Please fix the playlist."
+    description: str = "The playlist is invalid."
+
+    def __str__(self):
+        return (
+            "Validation error found in the file when parsing in strict mode.\n"
+            f"Line {self.line_number}: {self.description}\n"
+            f"Line content: {self.line}\n"
+            f"How to fix: {self.how_to_fix}"
+            "\n"
+        )
+
+
+def line_tag(line: str) -> str:
+    """Returns the tag name of a playlist line, e.g. ``#EXTINF``."""
+    return line.partition(":")[0].rstrip()
+
+
+# Attributes of a tag line, with quoted values taken whole, so that names
+# found in URIs and other strings aren't mistaken for attributes.
+ATTRIBUTE_PATTERN = re.compile(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)')
+
+
+def line_attributes(line: str) -> dict[str, str]:
+    """
+    Returns the attributes of a tag line by name, with their values as
+    written, quotes included.
+    """
+    return dict(ATTRIBUTE_PATTERN.findall(line, line.find(":") + 1))
+
+
 class VersionMatchRuleBase:
+    """
+    A version matching rule.
+
+    Rules declare the `tags` they apply to and implement the `check`
+    classmethod, so the validator can dispatch a line straight to the rules
+    registered for its tag without creating rule objects.
+
+    Most rules only need to declare the `min_version` a feature requires, or
+    the version it was `removed_in`, and narrow down the lines they apply
+    to with `applies`.
+    """
+
     description: str = ""
     how_to_fix: str = ""
+    tags: tuple[str, ...] = ()
+    min_version: float | None = None
+    removed_in: float | None = None
     version: float
     line_number: int
     line: str
@@ -32,77 +93,314 @@ class VersionMatchRuleBase:
         self.line_number = line_number
         self.line = line
 
+    @classmethod
+    def applies(cls, line: str) -> bool:
+        return True
+
+    @classmethod
+    def check(cls, version: float, line: str) -> bool:
+        if not cls.applies(line):
+            return True
+
+        if cls.min_version is not None and version < cls.min_version:
+            return False
+
+        if cls.removed_in is not None and version >= cls.removed_in:
+            return False
+
+        return True
+
+    @classmethod
+    def error(cls, line_number: int, line: str) -> VersionMatchingError:
+        return VersionMatchingError(
+            line_number=line_number,
+            line=line,
+            description=cls.description,
+            how_to_fix=cls.how_to_fix,
+        )
+
     def validate(self):
-        raise NotImplementedError
+        if line_tag(self.line) not in self.tags:
+            return True
+
+        return self.check(self.version, self.line)
 
     def get_error(self):
-        return VersionMatchingError(
-            line_number=self.line_number,
-            line=self.line,
-            description=self.description,
-            how_to_fix=self.how_to_fix,
+        return self.error(self.line_number, self.line)
+
+
+class PlaylistRuleBase:
+    """
+    A rule about the playlist as a whole.
+
+    A new instance is created for each playlist validated. It is fed the
+    lines carrying its `tags` in order and reports its errors from `finish`,
+    once the whole playlist and its version are known.
+    """
+
+    tags: tuple[str, ...] = ()
+    description: str = ""
+    how_to_fix: str = ""
+
+    def feed(self, line_number: int, line: str) -> None:
+        raise NotImplementedError
+
+    def finish(self, version: float | None) -> list[VersionMatchingError]:
+        raise NotImplementedError
+
+    @classmethod
+    def error(cls, line_number: int, line: str) -> VersionMatchingError:
+        return PlaylistValidationError(
+            line_number=line_number,
+            line=line,
+            description=cls.description,
+            how_to_fix=cls.how_to_fix,
         )
 
 
+available_rules: list[type[VersionMatchRuleBase]] = []
+available_playlist_rules: list[type[PlaylistRuleBase]] = []
+rules_by_tag: dict[str, list[type[VersionMatchRuleBase]]] = {}
+
+
+def register_rule(rule):
+    """
+    Registers a rule to be checked when parsing in strict mode. Can be used
+    as a class decorator.
+    """
+    if issubclass(rule, PlaylistRuleBase):
+        available_playlist_rules.append(rule)
+    else:
+        available_rules.append(rule)
+        for tag in rule.tags:
+            rules_by_tag.setdefault(tag, []).append(rule)
+    return rule
+
+
+# Protocol version compatibility, as listed in RFC 8216 section 7.
+
+
+@register_rule
 class ValidIVInEXTXKEY(VersionMatchRuleBase):
     description = (
         "You must use at least protocol version 2 if you have IV in EXT-X-KEY."
     )
     how_to_fix = "Change the protocol version to 2 or higher."
+    tags = (protocol.ext_x_key,)
+    min_version = 2
 
-    def validate(self):
-        if protocol.ext_x_key not in self.line:
-            return True
-
-        if "IV" in self.line:
-            return self.version >= 2
-
-        return True
+    @classmethod
+    def applies(cls, line):
+        return "IV" in line_attributes(line)
 
 
+@register_rule
 class ValidFloatingPointEXTINF(VersionMatchRuleBase):
     description = "You must use at least protocol version 3 if you have floating point EXTINF duration values."
     how_to_fix = "Change the protocol version to 3 or higher."
+    tags = (protocol.extinf,)
+    min_version = 3
 
-    def validate(self):
-        if protocol.extinf not in self.line:
-            return True
-
-        chunks = self.line.replace(protocol.extinf + ":", "").split(",", 1)
-        duration = chunks[0]
-
-        def is_number(value: str):
-            try:
-                float(value)
-                return True
-            except ValueError:
-                return False
+    @classmethod
+    def check(cls, version, line):
+        duration = line.replace(protocol.extinf + ":", "").split(",", 1)[0]
 
-        def is_floating_number(value: str):
-            return is_number(value) and "." in value
+        try:
+            float(duration)
+        except ValueError:
+            return False
 
-        if is_floating_number(duration):
-            return self.version >= 3
+        if "." in duration:
+            return version >= cls.min_version
 
-        return is_number(duration)
+        return True
 
 
+@register_rule
 class ValidEXTXBYTERANGEOrEXTXIFRAMESONLY(VersionMatchRuleBase):
     description = "You must use at least protocol version 4 if you have EXT-X-BYTERANGE or EXT-X-IFRAME-ONLY."
     how_to_fix = "Change the protocol version to 4 or higher."
+    tags = (protocol.ext_x_byterange, protocol.ext_i_frames_only)
+    min_version = 4
 
-    def validate(self):
+
+@register_rule
+class ValidKEYFORMATInEXTXKEY(VersionMatchRuleBase):
+    description = "You must use at least protocol version 5 if you have KEYFORMAT or KEYFORMATVERSIONS in EXT-X-KEY."
+    how_to_fix = "Change the protocol version to 5 or higher."
+    tags = (protocol.ext_x_key,)
+    min_version = 5
+
+    @classmethod
+    def applies(cls, line):
+        attributes = line_attributes(line)
+        return "KEYFORMAT" in attributes or "KEYFORMATVERSIONS" in attributes
+
+
+@register_rule
+class ValidEXTXMAP(VersionMatchRuleBase):
+    description = "You must use at least protocol version 5 if you have EXT-X-MAP."
+    how_to_fix = "Change the protocol version to 5 or higher."
+    tags = (protocol.ext_x_map,)
+    min_version = 5
+
+
+@register_rule
+class RemovedPROGRAMIDInEXTXSTREAMINF(VersionMatchRuleBase):
+    description = "The PROGRAM-ID attribute of EXT-X-STREAM-INF and EXT-X-I-FRAME-STREAM-INF was removed in protocol version 6."
+    how_to_fix = "Remove the PROGRAM-ID attribute."
+    tags = (protocol.ext_x_stream_inf, protocol.ext_x_i_frame_stream_inf)
+    removed_in = 6
+
+    @classmethod
+    def applies(cls, line):
+        return "PROGRAM-ID" in line_attributes(line)
+
+
+@register_rule
+class ValidSERVICEInstreamIdInEXTXMEDIA(VersionMatchRuleBase):
+    description = 'You must use at least protocol version 7 if you have an INSTREAM-ID "SERVICE" value in EXT-X-MEDIA.'
+    how_to_fix = "Change the protocol version to 7 or higher."
+    tags = (protocol.ext_x_media,)
+    min_version = 7
+
+    @classmethod
+    def applies(cls, line):
+        instream_id = line_attributes(line).get("INSTREAM-ID", "")
+        return instream_id.startswith('"SERVICE')
+
+
+@register_rule
+class RemovedEXTXALLOWCACHE(VersionMatchRuleBase):
+    description = "EXT-X-ALLOW-CACHE was removed in protocol version 7."
+    how_to_fix = "Remove the EXT-X-ALLOW-CACHE tag."
+    tags = (protocol.ext_x_allow_cache,)
+    removed_in = 7
+
+
+# Later additions from the second edition of the HLS specification
+# (draft-pantos-hls-rfc8216bis).
+
+
+@register_rule
+class ValidEXTXSKIP(VersionMatchRuleBase):
+    description = "You must use at least protocol version 9 if you have EXT-X-SKIP."
+    how_to_fix = "Change the protocol version to 9 or higher."
+    tags = (protocol.ext_x_skip,)
+    min_version = 9
+
+
+@register_rule
+class ValidRECENTLYREMOVEDDATERANGESInEXTXSKIP(VersionMatchRuleBase):
+    description = "You must use at least protocol version 10 if you have RECENTLY-REMOVED-DATERANGES in EXT-X-SKIP."
+    how_to_fix = "Change the protocol version to 10 or higher."
+    tags = (protocol.ext_x_skip,)
+    min_version = 10
+
+    @classmethod
+    def applies(cls, line):
+        return "RECENTLY-REMOVED-DATERANGES" in line_attributes(line)
+
+
+@register_rule
+class ValidEXTXMAPWithoutEXTXIFRAMESONLY(PlaylistRuleBase):
+    description = "You must use at least protocol version 6 if you have EXT-X-MAP in a Media Playlist without EXT-X-I-FRAMES-ONLY."
+    how_to_fix = "Change the protocol version to 6 or higher."
+    tags = (protocol.ext_x_map, protocol.ext_i_frames_only)
+
+    def __init__(self):
+        self.first_map = None
+        self.is_i_frames_only = False
+
+    def feed(self, line_number, line):
+        if line_tag(line) == protocol.ext_i_frames_only:
+            self.is_i_frames_only = True
+        elif self.first_map is None:
+            self.first_map = (line_number, line)
+
+    def finish(self, version):
         if (
-            protocol.ext_x_byterange not in self.line
-            and protocol.ext_i_frames_only not in self.line
+            version is None
+            or version >= 6
+            or self.first_map is None
+            or self.is_i_frames_only
         ):
-            return True
+            return []
+        return [self.error(*self.first_map)]
+
+
+@register_rule
+class ValidEXTINFWithinTARGETDURATION(PlaylistRuleBase):
+    description = "The EXTINF duration of each segment, rounded to the nearest integer, must not exceed EXT-X-TARGETDURATION."
+    how_to_fix = "Increase EXT-X-TARGETDURATION or split the segment."
+    tags = (protocol.ext_x_targetduration, protocol.extinf, protocol.ext_x_images_only)
+
+    def __init__(self):
+        self.target_duration = None
+        self.is_images_only = False
+        self.pending = []
+        self.errors = []
+
+    def feed(self, line_number, line):
+        if line_tag(line) == protocol.ext_x_images_only:
+            # Image playlist segments span all of their tiles.
+            self.is_images_only = True
+            return
+
+        value = line.partition(":")[2].split(",", 1)[0]
+        try:
+            value = float(value)
+        except ValueError:
+            return
+
+        if line_tag(line) == protocol.ext_x_targetduration:
+            if self.target_duration is None:
+                self.target_duration = value
+                for pending in self.pending:
+                    self._check(*pending)
+                self.pending = []
+        elif self.target_duration is None:
+            self.pending.append((line_number, line, value))
+        else:
+            self._check(line_number, line, value)
+
+    def _check(self, line_number, line, duration):
+        if math.floor(duration + 0.5) > self.target_duration:
+            self.errors.append(self.error(line_number, line))
+
+    def finish(self, version):
+        if self.is_images_only:
+            return []
+        return self.errors
+
+
+@register_rule
+class ValidEXTXMEDIASEQUENCE(PlaylistRuleBase):
+    description = "EXT-X-MEDIA-SEQUENCE must be an integer appearing at most once, before the first segment."
+    how_to_fix = "Keep a single EXT-X-MEDIA-SEQUENCE tag before the first EXTINF."
+    tags = (protocol.ext_x_media_sequence, protocol.extinf)
+
+    def __init__(self):
+        self.seen = False
+        self.has_segments = False
+        self.errors = []
+
+    def feed(self, line_number, line):
+        if line_tag(line) == protocol.extinf:
+            self.has_segments = True
+            return
+
+        if self.seen or self.has_segments or not _is_integer(line.partition(":")[2]):
+            self.errors.append(self.error(line_number, line))
+        self.seen = True
 
-        return self.version >= 4
+    def finish(self, version):
+        return self.errors
 
 
-available_rules: list[type[VersionMatchRuleBase]] = [
-    ValidIVInEXTXKEY,
-    ValidFloatingPointEXTINF,
-    ValidEXTXBYTERANGEOrEXTXIFRAMESONLY,
-]
+def _is_integer(value):
+    try:
+        int(value)
+    except ValueError:
+        return False
+    return True
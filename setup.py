@@ -25,4 +25,5 @@ setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     python_requires=">=3.9",
+    entry_points={"console_scripts": ["m3u8=m3u8.cli:main"]},
 )
@@ -26,3 +26,35 @@ M3U8_RULE_BYTE_RANGE = """
 #EXTINF: 10.0,
 https://example.com/segment1.ts
 """
+
+M3U8_TWO_MEDIA_SEQUENCES = """
+#EXTM3U
+#EXT-X-VERSION:3
+#EXT-X-MEDIA-SEQUENCE:1
+#EXT-X-TARGETDURATION:10
+#EXT-X-MEDIA-SEQUENCE:2
+#EXTINF:10,
+https://example.com/segment1.ts
+"""
+
+M3U8_EXTINF_OVER_TARGET_DURATION = """
+#EXTM3U
+#EXT-X-VERSION:3
+#EXT-X-TARGETDURATION:10
+#EXTINF:10.4,
+https://example.com/segment1.ts
+#EXTINF:10.6,
+https://example.com/segment2.ts
+"""
+
+M3U8_MANY_ERRORS = """
+#EXTM3U
+#EXT-X-VERSION:3
+#EXT-X-ALLOW-CACHE:YES
+#EXT-X-KEY:METHOD=SAMPLE-AES,URI="key.bin",KEYFORMAT="com.apple.streamingkeydelivery"
+#EXT-X-TARGETDURATION:10
+#EXT-X-BYTERANGE:1000@0
+#EXTINF:10.0,
+#EXT-X-MAP:URI="init.mp4"
+https://example.com/segment1.ts
+"""
@@ -1587,4 +1587,62 @@ WINDOWS_PLAYLIST = r"""\
 C:\HLS Video\test1.ts
 """
 
+DATERANGE_END_ON_NEXT_PLAYLIST = """
+#EXTM3U
+#EXT-X-TARGETDURATION:10
+#EXT-X-PROGRAM-DATE-TIME:2020-03-10T07:48:00Z
+#EXT-X-DATERANGE:ID="chapter-1",CLASS="chapter",START-DATE="2020-03-10T07:48:00Z",END-ON-NEXT=YES
+#EXTINF:10,
+segment1.ts
+#EXT-X-DATERANGE:ID="chapter-2",CLASS="chapter",START-DATE="2020-03-10T07:48:10Z",END-ON-NEXT=YES
+#EXT-X-DATERANGE:ID="ad-1",START-DATE="2020-03-10T07:48:12Z",DURATION=5
+#EXTINF:10,
+segment2.ts
+#EXT-X-DATERANGE:ID="chapter-3",CLASS="chapter",START-DATE="2020-03-10T07:48:20Z",END-ON-NEXT=YES
+#EXTINF:10,
+segment3.ts
+"""
+
+CUE_OUT_LIVE_WINDOW_PLAYLIST = """
+#EXTM3U
+#EXT-X-TARGETDURATION:10
+#EXT-X-MEDIA-SEQUENCE:100
+#EXTINF:10,
+segment100.ts
+#EXT-X-CUE-OUT:30
+#EXTINF:10,
+segment101.ts
+#EXT-X-CUE-OUT-CONT:ElapsedTime=10,Duration=30
+#EXTINF:10,
+segment102.ts
+"""
+
+CUE_OUT_LIVE_WINDOW_REFRESHED_PLAYLIST = """
+#EXTM3U
+#EXT-X-TARGETDURATION:10
+#EXT-X-MEDIA-SEQUENCE:102
+#EXT-X-CUE-OUT-CONT:ElapsedTime=10,Duration=30
+#EXTINF:10,
+segment102.ts
+#EXT-X-CUE-OUT-CONT:ElapsedTime=20,Duration=30
+#EXTINF:10,
+segment103.ts
+#EXT-X-CUE-IN
+#EXTINF:10,
+segment104.ts
+"""
+
+PLAYLIST_WITH_UNKNOWN_TAGS = """#EXTM3U
+#EXT-X-TARGETDURATION:10
+#EXT-X-VENDOR-CHANNEL:news
+#EXTINF:10,
+segment1.ts
+#EXT-X-DISCONTINUITY
+#EXT-X-VENDOR-AD:id=42
+#EXTINF:10,
+segment2.ts
+#EXT-X-VENDOR-END
+#EXT-X-ENDLIST
+"""
+
 del abspath, dirname, join
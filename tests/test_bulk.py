@@ -0,0 +1,133 @@
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+import invalid_versioned_playlists
+import playlists
+import pytest
+
+import m3u8
+from m3u8.bulk import PlaylistContent, PlaylistSummary
+
+
+@pytest.fixture
+def sources(tmpdir):
+    path = tmpdir.join("playlist.m3u8")
+    path.write(playlists.SIMPLE_PLAYLIST)
+    return [
+        str(path),
+        playlists.VARIANT_PLAYLIST,
+        str(tmpdir.join("missing.m3u8")),
+        invalid_versioned_playlists.M3U8_RULE_IV,
+        playlists.PLAYLIST_WITH_ENCRYPTED_SEGMENTS,
+    ]
+
+
+def test_parse_many_returns_summaries_in_order(sources):
+    results = list(m3u8.parse_many(sources, workers=0, chunksize=2))
+
+    assert [result.index for result in results] == [0, 1, 2, 3, 4]
+    assert [result.source for result in results] == [sources[0], None, sources[2]] + [
+        None
+    ] * 2
+    assert results[0].playlist == PlaylistSummary(
+        version=None,
+        is_variant=False,
+        is_endlist=True,
+        playlist_type=None,
+        target_duration=5220,
+        media_sequence=0,
+        segments=1,
+        duration=5220,
+        playlists=0,
+    )
+    assert results[1].playlist.is_variant
+    assert results[1].playlist.playlists == 4
+    assert results[0].error is None
+
+
+def test_parse_many_reports_errors_and_goes_on(sources):
+    results = list(m3u8.parse_many(sources, workers=0, strict=True))
+
+    assert results[0].playlist is not None
+    assert isinstance(results[2].error, FileNotFoundError)
+    assert results[2].playlist is None
+    assert results[3].error is not None
+    assert results[3].playlist is None
+    assert results[4].playlist.segments == 3
+
+
+def test_parse_many_returns_full_playlists(sources):
+    results = list(m3u8.parse_many(sources[:2], workers=0, full=True))
+
+    assert results[0].playlist.dumps() == m3u8.load(sources[0]).dumps()
+    assert results[0].playlist.base_uri == m3u8.load(sources[0]).base_uri
+    assert results[1].playlist.dumps() == m3u8.loads(sources[1]).dumps()
+
+
+def test_parse_many_in_worker_processes(sources):
+    expected = list(m3u8.parse_many(sources * 3, workers=0, strict=True))
+
+    ordered = list(m3u8.parse_many(sources * 3, workers=2, chunksize=2, strict=True))
+    unordered = list(
+        m3u8.parse_many(sources * 3, workers=2, chunksize=2, strict=True, ordered=False)
+    )
+
+    def summary(results):
+        return [
+            (result.index, result.playlist, str(result.error)) for result in results
+        ]
+
+    assert summary(ordered) == summary(expected)
+    assert sorted(summary(unordered)) == summary(expected)
+
+
+def test_parse_many_reports_malformed_tags_and_goes_on():
+    sources = [
+        playlists.SIMPLE_PLAYLIST,
+        "#EXTM3U\n#EXT-X-I-FRAME-STREAM-INF:BANDWIDTH=1\n",
+        "#EXTM3U\n#EXT-X-START:PRECISE=YES\n",
+        playlists.SIMPLE_PLAYLIST,
+    ]
+
+    results = list(m3u8.parse_many(sources, workers=0))
+
+    assert [result.playlist.segments for result in results[::3]] == [1, 1]
+    assert isinstance(results[1].error, KeyError)
+    assert isinstance(results[2].error, TypeError)
+    assert results[1].playlist is results[2].playlist is None
+
+
+def test_parse_many_takes_explicit_contents():
+    results = list(
+        m3u8.parse_many(
+            [PlaylistContent(playlists.SIMPLE_PLAYLIST), PlaylistContent("")],
+            workers=0,
+        )
+    )
+
+    assert results[0].source is None
+    assert results[0].playlist.segments == 1
+    assert results[1].source is None
+    assert results[1].playlist.segments == 0
+
+
+def broken_tags_parser(line, lineno, data, state):
+    raise TypeError("bug in the custom tags parser")
+
+
+def test_parse_many_reports_custom_tags_parser_errors(sources):
+    results = list(
+        m3u8.parse_many(sources[1:2], workers=0, custom_tags_parser=broken_tags_parser)
+    )
+
+    assert isinstance(results[0].error, TypeError)
+
+
+def broken_transform(playlist):
+    raise TypeError("bug in the transform")
+
+
+def test_parse_many_raises_transform_errors(sources):
+    with pytest.raises(TypeError):
+        list(m3u8.parse_many(sources, workers=0, transform=broken_transform))
@@ -0,0 +1,97 @@
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+import playlists
+import pytest
+
+import m3u8
+from m3u8.cache import CacheInfo, ParseCache
+
+
+def test_parse_returns_cached_data():
+    cache = ParseCache()
+
+    first = cache.parse(playlists.SIMPLE_PLAYLIST)
+    second = cache.parse(playlists.SIMPLE_PLAYLIST)
+
+    assert first is second
+    assert first == m3u8.parse(playlists.SIMPLE_PLAYLIST)
+    assert cache.cache_info() == CacheInfo(hits=1, misses=1, maxsize=128, currsize=1)
+
+
+def test_parse_keys_on_strict_and_custom_tags_parser():
+    cache = ParseCache()
+
+    cache.parse(playlists.SIMPLE_PLAYLIST)
+    cache.parse(playlists.SIMPLE_PLAYLIST, strict=True)
+    cache.parse(playlists.SIMPLE_PLAYLIST, custom_tags_parser=lambda *args: False)
+
+    assert cache.cache_info().misses == 3
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = ParseCache(maxsize=2)
+
+    cache.parse(playlists.SIMPLE_PLAYLIST)
+    cache.parse(playlists.VARIANT_PLAYLIST)
+    cache.parse(playlists.SIMPLE_PLAYLIST)
+    cache.parse(playlists.PLAYLIST_WITH_ENCRYPTED_SEGMENTS)
+    cache.parse(playlists.SIMPLE_PLAYLIST)
+    cache.parse(playlists.VARIANT_PLAYLIST)
+
+    assert cache.cache_info() == CacheInfo(hits=2, misses=4, maxsize=2, currsize=2)
+
+
+def test_parse_errors_are_not_cached():
+    cache = ParseCache()
+
+    for _ in range(2):
+        with pytest.raises(m3u8.ParseError):
+            cache.parse(playlists.SIMPLE_PLAYLIST_MESSY, strict=True)
+
+    assert cache.cache_info().currsize == 0
+
+
+def test_loads_with_cache_builds_a_new_object_each_time():
+    cache = ParseCache()
+    uri = "http://example.com/path/playlist.m3u8"
+
+    first = m3u8.loads(playlists.PLAYLIST_WITH_ENCRYPTED_SEGMENTS, uri, cache=cache)
+    second = m3u8.loads(playlists.PLAYLIST_WITH_ENCRYPTED_SEGMENTS, uri, cache=cache)
+    first.segments[0].uri = "changed.ts"
+
+    assert first is not second
+    assert second.segments[0].uri != "changed.ts"
+    assert second.base_uri == "http://example.com/path/"
+    assert (
+        second.dumps()
+        == m3u8.loads(playlists.PLAYLIST_WITH_ENCRYPTED_SEGMENTS, uri).dumps()
+    )
+    assert cache.cache_info().hits == 1
+
+
+def test_cached_m3u8_sets_base_path():
+    cache = ParseCache()
+
+    obj = cache.M3U8(playlists.SIMPLE_PLAYLIST, base_path="http://example.com")
+
+    assert obj.segments[0].uri == "http://example.com/entire.ts"
+
+
+def test_changes_to_cached_m3u8_do_not_leak_into_the_cache():
+    cache = ParseCache()
+    first = cache.M3U8(playlists.CUE_OUT_ELEMENTAL_PLAYLIST)
+    expected = first.dumps()
+    segment = next(segment for segment in first.segments if segment.asset_metadata)
+
+    segment.asset_metadata["genre"] = "changed"
+    segment.custom_parser_values["changed"] = True
+    first.custom_parser_values["changed"] = True
+    first.data["segments"].clear()
+
+    second = cache.M3U8(playlists.CUE_OUT_ELEMENTAL_PLAYLIST)
+    assert second.dumps() == expected
+    assert second.data["segments"]
+    assert not second.custom_parser_values
+    assert all("changed" not in s.custom_parser_values for s in second.segments)
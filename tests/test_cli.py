@@ -0,0 +1,147 @@
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+import io
+import json
+import os
+
+import invalid_versioned_playlists
+import playlists
+import pytest
+
+import m3u8
+from m3u8.cli import main
+
+
+@pytest.fixture
+def files(tmpdir):
+    paths = []
+    for name, content in [
+        ("simple.m3u8", playlists.SIMPLE_PLAYLIST),
+        ("variant.m3u8", playlists.VARIANT_PLAYLIST),
+        ("ads.m3u8", playlists.CUE_OUT_ELEMENTAL_PLAYLIST),
+        ("encrypted.m3u8", playlists.PLAYLIST_WITH_ENCRYPTED_SEGMENTS),
+    ]:
+        path = tmpdir.join(name)
+        path.write(content)
+        paths.append(str(path))
+    return paths
+
+
+def test_summary(files, capsys):
+    assert main(["summary"] + files) == 0
+
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [line["source"] for line in lines] == files
+    assert lines[0]["segments"] == 1
+    assert lines[0]["duration"] == 5220
+    assert lines[1]["bandwidths"] == [65000, 1280000, 2560000, 7680000]
+    assert lines[2]["ad_breaks"] == 1
+    assert lines[2]["ad_duration"] == 50
+    assert lines[3]["key_methods"] == ["AES-128"]
+
+
+def test_summary_in_worker_processes(files, tmpdir, capsys):
+    listing = tmpdir.join("files.txt")
+    listing.write("\n".join(files * 3) + "\n")
+    main(["summary"] + files * 3)
+    expected = capsys.readouterr().out
+
+    assert main(["summary", "--files-from", str(listing), "-j", "2"]) == 0
+    assert capsys.readouterr().out == expected
+
+
+def test_validate(files, tmpdir, capsys):
+    invalid = tmpdir.join("invalid.m3u8")
+    invalid.write(invalid_versioned_playlists.M3U8_RULE_IV)
+
+    assert main(["validate", "--quiet", str(invalid)] + files) == 1
+
+    output = capsys.readouterr().out.splitlines()
+    assert output
+    assert all(line.startswith(str(invalid) + ": line ") for line in output)
+
+
+def test_malformed_file_is_reported(files, tmpdir, capsys):
+    malformed = tmpdir.join("malformed.m3u8")
+    malformed.write("#EXTM3U\n#EXT-X-I-FRAME-STREAM-INF:BANDWIDTH=1\n")
+
+    assert main(["summary", files[0], str(malformed), files[1]]) == 1
+
+    output = capsys.readouterr()
+    lines = [json.loads(line) for line in output.out.splitlines()]
+    assert [line["source"] for line in lines] == [files[0], files[1]]
+    assert output.err == f"{malformed}: 'uri'\n"
+
+
+def test_missing_file_is_reported(tmpdir, capsys):
+    missing = str(tmpdir.join("missing.m3u8"))
+
+    assert main(["validate", missing]) == 1
+
+    assert capsys.readouterr().out.startswith(missing + ": ")
+
+
+def test_dump_rewrites_uris(monkeypatch, capsys):
+    monkeypatch.setattr("sys.stdin", io.StringIO(playlists.SIMPLE_PLAYLIST))
+
+    assert main(["dump", "-", "--host", "media.example.com", "cdn.example.com"]) == 0
+
+    output = capsys.readouterr().out
+    assert "http://cdn.example.com/entire.ts" in output
+    assert "media.example.com" not in output
+
+
+def test_dump_from_stdin_without_extm3u(monkeypatch, capsys):
+    content = playlists.SIMPLE_PLAYLIST.replace("#EXTM3U\n", "")
+    monkeypatch.setattr("sys.stdin", io.StringIO(content))
+
+    assert main(["dump", "-"]) == 0
+
+    assert capsys.readouterr().out == m3u8.loads(content).dumps()
+
+
+def test_dump_to_output_dir(files, tmpdir, monkeypatch):
+    monkeypatch.chdir(tmpdir)
+    output_dir = tmpdir.mkdir("output")
+    names = [os.path.relpath(path) for path in files]
+
+    assert main(["dump", "--query", "token=abc", "-o", "output"] + names) == 0
+
+    dumped = m3u8.load(str(output_dir.join("encrypted.m3u8")))
+    assert dumped.segments[0].uri.endswith(".ts?token=abc")
+    assert dumped.keys[0].uri.endswith("&token=abc")
+
+
+def test_dump_to_output_dir_keeps_paths(tmpdir, monkeypatch, capsys):
+    monkeypatch.chdir(tmpdir)
+    for directory in ("a", "b"):
+        tmpdir.mkdir(directory).join("index.m3u8").write(
+            playlists.SIMPLE_PLAYLIST.replace("entire", directory)
+        )
+    absolute = str(tmpdir.join("b", "index.m3u8"))
+
+    assert main(["dump", "-o", "out", "a/index.m3u8", "b/index.m3u8"]) == 0
+    assert main(["dump", "-o", "out", "a/index.m3u8", "b/../a/index.m3u8"]) == 1
+    assert main(["dump", "-o", "out", absolute]) == 0
+
+    assert "/a.ts" in tmpdir.join("out", "a", "index.m3u8").read()
+    assert "/b.ts" in tmpdir.join("out", "b", "index.m3u8").read()
+    assert tmpdir.join("out", *absolute.lstrip(os.sep).split(os.sep)).check()
+    assert capsys.readouterr().err == (
+        f"b/../a/index.m3u8: {os.path.join('out', 'a', 'index.m3u8')} was already "
+        "written\n"
+    )
+
+
+def test_json(files, capsys):
+    assert main(["json", files[0]]) == 0
+
+    output = capsys.readouterr().out
+    assert json.loads(output) == m3u8.load(files[0]).to_dict()
+
+
+def test_no_playlist_given(capsys):
+    with pytest.raises(SystemExit):
+        main(["summary"])
@@ -0,0 +1,78 @@
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+from types import MappingProxyType
+
+import playlists
+import pytest
+
+import m3u8
+from m3u8 import FrozenPlaylistError
+
+
+def test_freeze_returns_the_same_playlist():
+    obj = m3u8.M3U8(playlists.SIMPLE_PLAYLIST)
+
+    assert obj.freeze() is obj
+    assert obj.is_frozen
+    assert isinstance(obj, m3u8.M3U8)
+    assert isinstance(obj.segments[0], m3u8.Segment)
+
+
+def test_frozen_playlist_dumps_the_same():
+    obj = m3u8.M3U8(playlists.CUE_OUT_ELEMENTAL_PLAYLIST)
+    expected = obj.dumps()
+
+    assert obj.freeze().dumps() == expected
+
+
+def test_frozen_playlist_refuses_modifications():
+    obj = m3u8.M3U8(playlists.VARIANT_PLAYLIST_WITH_ALT_IFRAME_PLAYLISTS_LAYOUT)
+    obj.freeze()
+
+    with pytest.raises(FrozenPlaylistError):
+        obj.version = 6
+    with pytest.raises(FrozenPlaylistError):
+        obj.base_uri = "http://example.com/"
+    with pytest.raises(FrozenPlaylistError):
+        obj.playlists[0].uri = "other.m3u8"
+    with pytest.raises(FrozenPlaylistError):
+        obj.playlists[0].stream_info.bandwidth = 1
+    with pytest.raises(FrozenPlaylistError):
+        obj.playlists.append(obj.playlists[0])
+    with pytest.raises(FrozenPlaylistError):
+        del obj.media[0]
+    with pytest.raises(FrozenPlaylistError):
+        obj.add_playlist(obj.playlists[0])
+
+
+def test_frozen_playlist_converts_plain_containers():
+    obj = m3u8.M3U8(playlists.CUE_OUT_ELEMENTAL_PLAYLIST).freeze()
+
+    assert isinstance(obj.files, tuple)
+    assert isinstance(obj.segments[4].asset_metadata, MappingProxyType)
+    with pytest.raises(TypeError):
+        obj.segments[4].asset_metadata["caid"] = "1"
+
+
+def test_frozen_playlist_caches_derived_values():
+    obj = m3u8.M3U8(
+        playlists.SIMPLE_PLAYLIST, base_uri="http://example.com/path/"
+    ).freeze()
+
+    segment = obj.segments[0]
+    assert segment.absolute_uri is segment.absolute_uri
+    assert obj.timeline_index() is obj.timeline_index()
+    assert obj.ad_breaks() == ()
+
+
+def test_freezing_does_not_affect_other_playlists_built_from_the_same_data():
+    cache = m3u8.ParseCache()
+    frozen = cache.M3U8(playlists.CUE_OUT_ELEMENTAL_PLAYLIST).freeze()
+    other = cache.M3U8(playlists.CUE_OUT_ELEMENTAL_PLAYLIST)
+
+    other.segments[4].asset_metadata["caid"] = "1"
+
+    assert not other.is_frozen
+    assert frozen.segments[4].asset_metadata["caid"] == "12345678"
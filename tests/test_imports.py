@@ -0,0 +1,52 @@
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+import os
+import subprocess
+import sys
+
+import m3u8
+from m3u8.bulk import parse_many
+from m3u8.httpclient import DefaultHTTPClient
+from m3u8.snapshot import SnapshotError
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(m3u8.__file__)))
+
+
+def imported_modules(statement):
+    code = f"{statement}\nimport sys\nprint(' '.join(sys.modules))"
+    output = subprocess.check_output(
+        [sys.executable, "-c", code], cwd=PACKAGE_DIR, text=True
+    )
+    return set(output.split())
+
+
+def test_parsing_does_not_import_optional_modules():
+    modules = imported_modules(
+        "import m3u8\nm3u8.loads('#EXTM3U\\n#EXTINF:10,\\na.ts\\n').dumps()"
+    )
+
+    assert "m3u8.model" in modules
+    for module in [
+        "urllib.request",
+        "ssl",
+        "gzip",
+        "http.client",
+        "concurrent.futures",
+        "multiprocessing",
+        "json",
+        "m3u8.httpclient",
+        "m3u8.bulk",
+        "m3u8.snapshot",
+        "m3u8.scte35",
+        "m3u8.version_matching",
+    ]:
+        assert module not in modules
+
+
+def test_lazy_attributes():
+    assert m3u8.DefaultHTTPClient is DefaultHTTPClient
+    assert m3u8.parse_many is parse_many
+    assert m3u8.SnapshotError is SnapshotError
+    assert not hasattr(m3u8, "missing")
@@ -0,0 +1,133 @@
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+import gzip
+from http.client import HTTPResponse
+from unittest.mock import Mock, patch
+
+import playlists
+import pytest
+
+import m3u8
+from m3u8 import metrics
+from m3u8.httpclient import DefaultHTTPClient
+
+
+@pytest.fixture
+def recorder():
+    recorder = metrics.InMemoryMetrics()
+    previous = metrics.set_recorder(recorder)
+    yield recorder
+    metrics.set_recorder(previous)
+
+
+def counts(recorder):
+    return {name: h.count for name, h in recorder.histograms.items()}
+
+
+def test_nothing_is_recorded_without_recorder():
+    assert metrics.get_recorder() is None
+
+    m3u8.loads(playlists.SIMPLE_PLAYLIST).dumps()
+
+
+def test_loads_and_dumps_report_metrics(recorder):
+    playlist = m3u8.loads(playlists.PLAYLIST_WITH_ENCRYPTED_SEGMENTS)
+    playlist.dumps()
+
+    assert counts(recorder) == {
+        metrics.PARSE_SECONDS: 1,
+        metrics.BUILD_SECONDS: 1,
+        metrics.SEGMENTS: 1,
+        metrics.DUMP_SECONDS: 1,
+    }
+    assert recorder.histograms[metrics.SEGMENTS].sum == 3
+
+
+def test_empty_playlists_are_not_reported(recorder):
+    m3u8.M3U8()
+
+    assert counts(recorder) == {}
+
+
+def test_cached_playlists_report_build_only(recorder):
+    cache = m3u8.ParseCache()
+    cache.parse(playlists.SIMPLE_PLAYLIST)
+
+    cache.M3U8(playlists.SIMPLE_PLAYLIST)
+
+    assert counts(recorder) == {metrics.BUILD_SECONDS: 1, metrics.SEGMENTS: 1}
+
+
+def test_failures_are_not_timed(recorder):
+    with pytest.raises(m3u8.ParseError):
+        m3u8.M3U8("#EXTM3U\n#EXT-X-UNKNOWN\n", strict=True)
+
+    assert counts(recorder) == {}
+
+
+def test_load_from_file_reports_metrics(recorder, tmpdir):
+    path = tmpdir.join("playlist.m3u8")
+    path.write(playlists.SIMPLE_PLAYLIST)
+
+    m3u8.load(str(path))
+
+    assert counts(recorder)[metrics.LOAD_SECONDS] == 1
+    assert counts(recorder)[metrics.PARSE_SECONDS] == 1
+
+
+@patch("urllib.request.OpenerDirector.open")
+def test_download_reports_metrics(mock_open, recorder):
+    body = gzip.compress(playlists.SIMPLE_PLAYLIST.encode())
+    response = Mock(spec=HTTPResponse)
+    response.read.return_value = body
+    response.info.return_value = {"Content-Encoding": "gzip"}
+    response.geturl.return_value = "http://example.com/index.m3u8"
+    response.headers = Mock()
+    response.headers.get_content_charset.return_value = "utf-8"
+    mock_open.return_value = response
+
+    m3u8.load("http://example.com/index.m3u8", http_client=DefaultHTTPClient())
+
+    assert counts(recorder) == {
+        metrics.HTTP_FETCH_SECONDS: 1,
+        metrics.HTTP_RESPONSE_BYTES: 1,
+        metrics.DECOMPRESS_SECONDS: 1,
+        metrics.PARSE_SECONDS: 1,
+        metrics.BUILD_SECONDS: 1,
+        metrics.SEGMENTS: 1,
+        metrics.LOAD_SECONDS: 1,
+    }
+    assert recorder.histograms[metrics.HTTP_RESPONSE_BYTES].sum == len(body)
+
+
+def test_prometheus_rendering():
+    recorder = metrics.InMemoryMetrics()
+    recorder.observe(metrics.SEGMENTS, 3)
+    recorder.observe(metrics.SEGMENTS, 20000)
+    recorder.observe("custom", 0.002)
+
+    assert recorder.to_prometheus() == (
+        "# HELP m3u8_custom custom\n"
+        "# TYPE m3u8_custom histogram\n"
+        + "".join(
+            f'm3u8_custom_bucket{{le="{bound}"}} {int(bound >= 0.0025)}\n'
+            for bound in metrics.SECONDS_BUCKETS
+        )
+        + 'm3u8_custom_bucket{le="+Inf"} 1\n'
+        "m3u8_custom_sum 0.002\n"
+        "m3u8_custom_count 1\n"
+        "# HELP m3u8_segments Number of segments of the M3U8 objects built.\n"
+        "# TYPE m3u8_segments histogram\n"
+        + "".join(
+            f'm3u8_segments_bucket{{le="{bound}"}} {(bound >= 3) + (bound >= 20000)}\n'
+            for bound in metrics.COUNT_BUCKETS
+        )
+        + 'm3u8_segments_bucket{le="+Inf"} 2\n'
+        "m3u8_segments_sum 20003\n"
+        "m3u8_segments_count 2\n"
+    )
+
+    recorder.reset()
+    assert recorder.to_prometheus() == ""
@@ -6,6 +6,7 @@
 # data returned from parser.parse()
 
 import datetime
+import json
 import os
 import textwrap
 
@@ -26,6 +27,7 @@ from m3u8.model import (
     denormalize_attribute,
     find_key,
 )
+from m3u8.parser import save_playlist_custom_value, save_segment_custom_value
 from m3u8.protocol import ext_x_part, ext_x_preload_hint, ext_x_start
 
 utc = datetime.timezone.utc
@@ -130,6 +132,46 @@ def test_program_date_time_attribute_without_discontinuity():
         assert segment.current_program_date_time == program_date_time
 
 
+def test_program_date_times_are_computed_on_access():
+    obj = m3u8.M3U8(playlists.SIMPLE_PLAYLIST_WITH_PROGRAM_DATE_TIME, lazy=True)
+    first_program_date_time = datetime.datetime(2014, 8, 13, 13, 36, 33, tzinfo=utc)
+    segment = obj.segments[2]
+
+    assert "current_program_date_time" not in vars(segment)
+    assert segment.timestamp() == first_program_date_time.timestamp() + 6
+    assert "current_program_date_time" not in vars(segment)
+    assert segment.current_program_date_time == first_program_date_time + (
+        datetime.timedelta(seconds=6)
+    )
+
+    segment.current_program_date_time = first_program_date_time
+    assert segment.current_program_date_time == first_program_date_time
+    assert segment.timestamp() == first_program_date_time.timestamp()
+
+
+def test_program_date_times_of_partial_segments():
+    obj = m3u8.M3U8(playlists.LOW_LATENCY_PART_PLAYLIST, lazy=True)
+    segment = obj.segments[-1]
+    part = segment.parts[1]
+
+    assert part.program_date_time == segment.parts[0].program_date_time + (
+        datetime.timedelta(seconds=0.33334)
+    )
+    assert part.current_program_date_time is None
+    assert part.timestamp() == pytest.approx(part.program_date_time.timestamp())
+
+
+def test_program_date_times_of_frozen_playlist():
+    obj = m3u8.M3U8(
+        playlists.DISCONTINUITY_PLAYLIST_WITH_PROGRAM_DATE_TIME, lazy=True
+    ).freeze()
+
+    assert obj.segments[6].program_date_time is None
+    assert obj.segments[6].current_program_date_time == datetime.datetime(
+        2014, 8, 13, 13, 36, 58, tzinfo=utc
+    )
+
+
 def test_segment_discontinuity_attribute():
     obj = m3u8.M3U8(playlists.DISCONTINUITY_PLAYLIST_WITH_PROGRAM_DATE_TIME)
     segments = obj.segments
@@ -843,6 +885,146 @@ def test_dump_should_not_ignore_zero_duration():
     assert "EXTINF:5220.000000" in obj.dumps(infspec="microseconds").strip()
 
 
+def test_lazy_durations_are_converted_on_access():
+    obj = m3u8.M3U8(playlists.PLAYLIST_WITH_SLASH_IN_QUERY_STRING, lazy=True)
+    segment = obj.segments[0]
+
+    assert "duration" not in vars(segment)
+    assert segment.duration == 5.0
+    assert obj.segments[1].current_program_date_time == datetime.datetime(
+        2020, 8, 5, 13, 51, 54, tzinfo=utc
+    )
+
+
+def test_dump_lazy_durations_keeps_their_text_unless_modified():
+    obj = m3u8.M3U8(playlists.PLAYLIST_WITH_SLASH_IN_QUERY_STRING, lazy=True)
+    assert obj.segments[0].duration == 5.0
+    obj.segments[1].duration = 4.5
+
+    lines = obj.dumps().splitlines()
+    extinf = [line for line in lines if line.startswith("#EXTINF")]
+    assert extinf == ["#EXTINF:5.0000,", "#EXTINF:4.5,", "#EXTINF:5.0000,"]
+    assert "#EXTINF:5.000," in obj.dumps(infspec="milliseconds")
+    assert (
+        "#EXTINF:5," in m3u8.M3U8(playlists.PLAYLIST_WITH_SLASH_IN_QUERY_STRING).dumps()
+    )
+
+
+def test_dump_lazy_part_durations_keeps_their_text():
+    obj = m3u8.M3U8(playlists.LOW_LATENCY_PART_PLAYLIST, lazy=True)
+
+    assert obj.dumps() == m3u8.M3U8(playlists.LOW_LATENCY_PART_PLAYLIST).dumps()
+    assert obj.segments[-1].parts[0].duration == 0.33334
+
+
+def test_dump_lossless_playlist_keeps_its_text():
+    content = playlists.LOW_LATENCY_PART_PLAYLIST
+    obj = m3u8.M3U8(content, lossless=True)
+
+    assert obj.dumps() == content.strip() + "\n"
+    assert obj.dumps() != m3u8.M3U8(content).dumps()
+    assert m3u8.M3U8(content, lossless=True).freeze().dumps() == obj.dumps()
+
+
+def test_dump_lossless_playlist_rewrites_changed_segments_only():
+    obj = m3u8.M3U8(playlists.PLAYLIST_WITH_SLASH_IN_QUERY_STRING, lossless=True)
+    obj.segments[1].uri = "changed.ts"
+
+    assert obj.dumps().splitlines()[5:10] == [
+        "#EXTINF:5.0000,",
+        "testvideo-1596635509-4769390994-a0e3087c.ts?hdntl=exp=1596678764~acl=/*~data=hdntl~hmac=12345&",
+        "#EXTINF:5,",
+        "changed.ts",
+        "#EXTINF:5.0000,",
+    ]
+
+    obj.target_duration = 6
+    assert "#EXT-X-TARGETDURATION:6" in obj.dumps()
+    assert "#EXTINF:5,\nchanged.ts\n#EXTINF:5.0000," in obj.dumps()
+
+
+def test_dump_lossless_playlist_rewrites_segments_using_changed_keys():
+    content = playlists.PLAYLIST_WITH_ENCRYPTED_SEGMENTS_AND_IV_WITH_MULTIPLE_KEYS
+    obj = m3u8.M3U8(content, lossless=True)
+    expected = m3u8.M3U8(content)
+    for playlist in (obj, expected):
+        playlist.keys[1].uri = "/hls-key/key3.bin"
+        del playlist.segments[0]
+
+    assert obj.dumps() == expected.dumps()
+
+
+def _tag_registry():
+    def parse_movie(line, lineno, data, state):
+        save_playlist_custom_value(data, "movie", line.split(":", 1)[1].strip())
+
+    def parse_ad_id(line, lineno, data, state):
+        save_segment_custom_value(state, "ad_id", line.split(":", 1)[1])
+
+    def dump_ad_id(segment):
+        ad_id = segment.custom_parser_values.get("ad_id")
+        return ad_id and f"#EXT-X-AD-ID:{ad_id}"
+
+    registry = m3u8.TagRegistry()
+    registry.register(
+        "#EXT-X-MOVIE",
+        parse_movie,
+        lambda playlist: "#EXT-X-MOVIE:" + playlist.custom_parser_values["movie"],
+    )
+    registry.register("#EXT-X-AD-ID", parse_ad_id, dump_ad_id, segment=True)
+    return registry
+
+
+def test_dump_tags_of_tag_registry():
+    content = textwrap.dedent(
+        """\
+        #EXTM3U
+        #EXT-X-TARGETDURATION:10
+        #EXT-X-MOVIE:million dollar baby
+        #EXT-X-AD-ID:42
+        #EXTINF:10,
+        1.ts
+        #EXTINF:10,
+        2.ts
+        #EXT-X-ENDLIST
+        """
+    )
+    registry = _tag_registry()
+    obj = m3u8.M3U8(content, custom_tags_parser=registry)
+
+    assert obj.tag_registry is registry
+    assert obj.dumps() == content
+    assert m3u8.ParseCache().M3U8(content, custom_tags_parser=registry).dumps() == (
+        content
+    )
+    assert "#EXT-X-AD-ID" not in m3u8.M3U8(content).dumps()
+
+    obj.segments[1].custom_parser_values["ad_id"] = "43"
+    obj.custom_parser_values["movie"] = "the movie"
+    expected = content.replace("1.ts\n", "1.ts\n#EXT-X-AD-ID:43\n")
+    expected = expected.replace("million dollar baby", "the movie")
+    assert obj.dumps() == expected
+
+    obj = m3u8.M3U8(content, custom_tags_parser=registry, lossless=True)
+    obj.custom_parser_values["movie"] = "the movie"
+    assert obj.dumps() == content.replace("million dollar baby", "the movie")
+
+
+def test_dump_unknown_tags():
+    content = playlists.PLAYLIST_WITH_UNKNOWN_TAGS
+    obj = m3u8.M3U8(content, keep_unknown_tags=True)
+
+    assert obj.unknown_tags == ("#EXT-X-VENDOR-CHANNEL:news",)
+    assert obj.segments[1].unknown_tags == ("#EXT-X-VENDOR-AD:id=42",)
+    assert obj.trailing_unknown_tags == ("#EXT-X-VENDOR-END",)
+    assert obj.dumps() == content
+    assert m3u8.M3U8.from_dict(obj.to_dict()).dumps() == content
+    assert "VENDOR" not in m3u8.M3U8(content).dumps()
+
+    obj.segments[1].unknown_tags = ()
+    assert "#EXT-X-VENDOR-AD" not in obj.dumps()
+
+
 def test_dump_should_use_decimal_floating_point_for_very_short_durations():
     obj = m3u8.M3U8(playlists.SIMPLE_PLAYLIST_WITH_VERY_SHORT_DURATION)
 
@@ -1252,6 +1434,17 @@ def test_segment_map_uri_attribute_with_byterange():
     assert obj.segment_map[1].byterange == "912@0"
 
 
+def test_segments_share_their_initialization_section():
+    obj = m3u8.M3U8(playlists.MULTIPLE_MAP_URI_PLAYLIST)
+    first, second, third = obj.segments
+    assert first.init_section is second.init_section is obj.segment_map[0]
+    assert third.init_section is obj.segment_map[1]
+
+    obj = m3u8.M3U8.from_dict(obj.to_dict())
+    assert obj.segments[0].init_section is obj.segments[1].init_section
+    assert obj.dumps() == m3u8.M3U8(playlists.MULTIPLE_MAP_URI_PLAYLIST).dumps()
+
+
 def test_start_with_negative_offset():
     obj = m3u8.M3U8(playlists.SIMPLE_PLAYLIST_WITH_START_NEGATIVE_OFFSET)
     assert obj.start.time_offset == -2.0
@@ -1719,6 +1912,216 @@ def test_bitrate_settable_as_int():
     assert "#EXT-X-BITRATE:9876" in obj.dumps().strip()
 
 
+def test_copy_shares_tags_until_modified():
+    obj = m3u8.loads(playlists.PLAYLIST_WITH_ENCRYPTED_SEGMENTS)
+    expected = obj.dumps()
+    copy = obj.copy()
+
+    assert copy.segments is not obj.segments
+    assert copy.segments[0] is obj.segments[0]
+
+    segment = copy.segments.mutable(0)
+    segment.uri = "changed.ts"
+    copy.segments.append(m3u8.Segment(uri="extra.ts", duration=1))
+
+    assert copy.segments.mutable(0) is segment
+    assert copy.segments[1] is obj.segments[1]
+    assert "changed.ts" in copy.dumps()
+    assert "extra.ts" in copy.dumps()
+    assert obj.dumps() == expected
+
+
+def test_copy_mutable_key_updates_segments_using_it():
+    obj = m3u8.loads(playlists.PLAYLIST_WITH_ENCRYPTED_SEGMENTS)
+    expected = obj.dumps()
+    copy = obj.copy()
+
+    copy.mutable_key(0).uri = "https://example.com/user.bin"
+
+    assert copy.segments[0].key is copy.keys[0]
+    assert 'URI="https://example.com/user.bin"' in copy.dumps()
+    assert obj.dumps() == expected
+
+
+def test_copy_base_uri_does_not_change_original():
+    obj = m3u8.loads(playlists.LOW_LATENCY_PART_PLAYLIST, "http://a.com/live/")
+    copy = obj.copy()
+
+    copy.base_uri = "http://b.com/live/"
+
+    assert copy.segments[-1].parts[0].absolute_uri.startswith("http://b.com/")
+    assert obj.segments[-1].parts[0].absolute_uri.startswith("http://a.com/")
+    assert copy.segments[0].init_section.absolute_uri.startswith("http://b.com/")
+    assert obj.segments[0].init_section.absolute_uri.startswith("http://a.com/")
+    assert obj.segments[0].base_uri == "http://a.com/live/"
+
+
+def test_copy_mutable_key_does_not_copy_partial_segments():
+    obj = m3u8.loads(playlists.LOW_LATENCY_PART_PLAYLIST)
+    obj.keys = [m3u8.Key("AES-128", None, "key.bin")]
+    for segment in obj.segments:
+        segment.key = obj.keys[0]
+    copy = obj.copy()
+
+    copy.mutable_key(0).uri = "user.bin"
+
+    assert all(segment.key is copy.keys[0] for segment in copy.segments)
+    assert all(segment.key is obj.keys[0] for segment in obj.segments)
+    assert copy.segments[-1].parts is obj.segments[-1].parts
+
+    copy.segments.mutable(-1).parts.mutable(0).uri = "changed.mp4"
+
+    assert copy.segments[-1].key is copy.keys[0]
+    assert obj.segments[-1].parts[0].uri != "changed.mp4"
+
+
+def test_copy_shares_init_sections_between_segments():
+    obj = m3u8.loads(playlists.LOW_LATENCY_PART_PLAYLIST, "http://a.com/live/")
+    copy = obj.copy()
+
+    segment = copy.segments.mutable(0)
+
+    assert segment.init_section is obj.segments[0].init_section
+
+    copy.base_uri = "http://b.com/live/"
+
+    init_section = copy.segments[0].init_section
+    assert init_section is not obj.segments[0].init_section
+    assert copy.segments[1].init_section is init_section
+    assert copy.segment_map[0] is init_section
+    assert init_section.absolute_uri == "http://b.com/live/init.mp4"
+    assert obj.segment_map[0] is obj.segments[1].init_section
+    assert obj.segment_map[0].absolute_uri == "http://a.com/live/init.mp4"
+
+
+def test_copy_of_frozen_playlist_is_mutable():
+    obj = m3u8.loads(playlists.PLAYLIST_WITH_ENCRYPTED_SEGMENTS).freeze()
+    copy = obj.copy()
+
+    copy.base_path = "http://example.com/media"
+    copy.media_sequence = 10
+
+    assert not copy.is_frozen
+    assert copy.segments[0].uri.startswith("http://example.com/media/")
+    assert not obj.segments[0].uri.startswith("http://example.com/media/")
+    assert obj.media_sequence != 10
+
+
+@pytest.mark.parametrize("freeze", [False, True])
+def test_copy_does_not_share_lists_and_dictionaries(freeze):
+    obj = m3u8.loads(playlists.CUE_OUT_ELEMENTAL_PLAYLIST)
+    obj.custom_parser_values["nested"] = {"count": 1}
+    if freeze:
+        obj.freeze()
+    expected = obj.dumps()
+    index = next(i for i, s in enumerate(obj.segments) if s.asset_metadata)
+
+    copy = obj.copy()
+    copy.custom_parser_values["nested"]["count"] = 2
+    segment = copy.segments.mutable(index)
+    segment.asset_metadata["genre"] = "changed"
+    segment.custom_parser_values["changed"] = True
+
+    assert obj.custom_parser_values["nested"]["count"] == 1
+    assert obj.segments[index].asset_metadata["genre"] == "CV"
+    assert "changed" not in obj.segments[index].custom_parser_values
+    assert "GENRE=changed" in copy.dumps()
+    assert obj.dumps() == expected
+
+
+def test_absolute_uri_is_recomputed_when_uri_or_base_uri_change():
+    obj = m3u8.M3U8(playlists.SIMPLE_PLAYLIST, base_uri="http://example.com/a/")
+    segment = obj.segments[0]
+
+    assert segment.absolute_uri == "http://media.example.com/entire.ts"
+    segment.uri = "relative.ts"
+    assert segment.absolute_uri == "http://example.com/a/relative.ts"
+    obj.base_uri = "http://example.com/b/"
+    assert segment.absolute_uri == "http://example.com/b/relative.ts"
+    segment.uri = "../up.ts"
+    assert segment.absolute_uri == "http://example.com/up.ts"
+
+
+def test_absolute_uris():
+    obj = m3u8.M3U8(
+        playlists.SIMPLE_PLAYLIST,
+        base_uri="http://example.com/a/",
+    )
+    obj.segments[0].uri = "x//y.ts?q=1"
+    obj.add_segment(Segment(uri="seg.ts", base_uri="https://other.com:8080/b/c"))
+
+    assert obj.segments.absolute_uris() == [
+        "http://example.com/a/x/y.ts?q=1",
+        "https://other.com:8080/b/seg.ts",
+    ]
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        playlists.SIMPLE_PLAYLIST_WITH_PROGRAM_DATE_TIME,
+        playlists.PLAYLIST_WITH_SESSION_ENCRYPTED_SEGMENTS_AND_IV,
+        playlists.VARIANT_PLAYLIST_WITH_IFRAME_PLAYLISTS,
+        playlists.VARIANT_PLAYLIST_WITH_IMAGE_PLAYLISTS,
+        playlists.LOW_LATENCY_DELTA_UPDATE_PLAYLIST,
+        playlists.LOW_LATENCY_WITH_PRELOAD_AND_BYTERANGES_PLAYLIST,
+        playlists.SESSION_DATA_PLAYLIST,
+        playlists.CONTENT_STEERING_PLAYLIST,
+        playlists.CUE_OUT_ELEMENTAL_PLAYLIST,
+        playlists.DATERANGE_IN_PART_PLAYLIST,
+    ],
+)
+def test_to_dict_and_to_json_round_trip(content):
+    obj = m3u8.M3U8(content)
+    data = obj.to_dict()
+
+    from_dict = m3u8.M3U8.from_dict(data)
+    from_json = m3u8.M3U8.from_json(obj.to_json())
+
+    assert from_dict.dumps() == obj.dumps()
+    assert from_dict.to_dict() == data
+    assert from_json.dumps() == obj.dumps()
+    assert from_json.to_dict() == data
+
+
+def test_to_dict_reflects_changes_to_the_playlist():
+    obj = m3u8.M3U8(playlists.PLAYLIST_WITH_ENCRYPTED_SEGMENTS)
+    obj.segments[0].uri = "changed.ts"
+    obj.segments[1].key = Key(method="AES-128", base_uri=None, uri="other.key")
+
+    data = obj.to_dict()
+
+    assert obj.data["segments"][0]["uri"] != "changed.ts"
+    assert data["segments"][0]["uri"] == "changed.ts"
+    assert data["keys"][-1]["uri"] == "other.key"
+    assert m3u8.M3U8.from_dict(data).dumps() == obj.dumps()
+
+
+def test_iter_json_writes_segments_in_chunks():
+    obj = m3u8.M3U8(playlists.SIMPLE_PLAYLIST_WITH_PROGRAM_DATE_TIME)
+
+    chunks = list(obj.iter_json(chunk_size=2))
+
+    assert len(chunks) == 2 + (len(obj.segments) + 1) // 2
+    assert "".join(chunks) == obj.to_json()
+    data = json.loads(obj.to_json())
+    assert data["segments"][0]["program_date_time"] == "2014-08-13T13:36:33+00:00"
+    assert data["targetduration"] == obj.target_duration
+
+
+def test_dump_json(tmpdir):
+    obj = m3u8.M3U8(playlists.SIMPLE_PLAYLIST, base_uri="http://example.com/path/")
+    filename = str(tmpdir.join("playlist.json"))
+
+    with open(filename, "w") as fileobj:
+        obj.dump_json(fileobj)
+    with open(filename) as fileobj:
+        loaded = m3u8.M3U8.from_json(fileobj.read(), base_uri=obj.base_uri)
+
+    assert loaded.segments[0].absolute_uri == obj.segments[0].absolute_uri
+    assert loaded.dumps() == obj.dumps()
+
+
 # custom asserts
 
 
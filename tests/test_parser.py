@@ -1,6 +1,7 @@
 # Copyright 2014 Globo.com Player authors. All rights reserved.
 # Use of this source code is governed by a MIT License
 # license that can be found in the LICENSE file.
+import datetime
 import re
 
 import playlists
@@ -32,6 +33,34 @@ def test_should_parse_non_integer_duration_from_playlist_string():
     assert [5220.5] == [c["duration"] for c in data["segments"]]
 
 
+def test_should_keep_duration_text_in_lazy_mode():
+    data = m3u8.parse(playlists.PLAYLIST_WITH_NON_INTEGER_DURATION, lazy=True)
+    assert ["5220.5"] == [c["duration_text"] for c in data["segments"]]
+    assert "duration" not in data["segments"][0]
+
+    data = m3u8.parse(playlists.LOW_LATENCY_PART_PLAYLIST, lazy=True)
+    assert data["segments"][-1]["parts"][0]["duration_text"] == "0.33334"
+
+
+def test_should_keep_source_spans_in_lossless_mode():
+    data = m3u8.parse(playlists.LOW_LATENCY_PART_PLAYLIST, lossless=True)
+    lines = data["source"]["lines"]
+    assert data["source"]["header_end"] == 6
+    assert data["source"]["trailer_start"] == 54
+    assert lines[data["source"]["trailer_start"]].startswith("#EXT-X-PRELOAD-HINT")
+
+    start, end = data["segments"][0]["source_span"]
+    assert lines[start:end] == [
+        "#EXT-X-PROGRAM-DATE-TIME:2019-02-14T02:13:28.106Z",
+        '#EXT-X-MAP:URI="init.mp4"',
+        "#EXTINF:4.00008,",
+        "fileSequence264.mp4",
+    ]
+    assert data["segments"][-1]["source_span"] == (51, 54)
+
+    assert "source" not in m3u8.parse(playlists.LOW_LATENCY_PART_PLAYLIST)
+
+
 def test_should_parse_comma_in_title():
     data = m3u8.parse(playlists.SIMPLE_PLAYLIST_TITLE_COMMA)
     assert ["Title with a comma, end"] == [c["title"] for c in data["segments"]]
@@ -381,6 +410,44 @@ def test_should_parse_program_date_time_from_playlist():
     assert cast_date_time("2014-08-13T13:36:33+00:00") == data["program_date_time"]
 
 
+def test_should_parse_program_date_time_of_segments_and_parts():
+    first = cast_date_time("2014-08-13T13:36:33+00:00")
+    seen = []
+
+    def custom_tags_parser(line, lineno, data, state):
+        seen.append(state.get("current_program_date_time"))
+
+    data = m3u8.parse(
+        playlists.SIMPLE_PLAYLIST_WITH_PROGRAM_DATE_TIME,
+        custom_tags_parser=custom_tags_parser,
+    )
+    segments = data["segments"]
+    assert segments[0]["program_date_time"] == first
+    assert "program_date_time" not in segments[1]
+    assert [s["current_program_date_time"] for s in segments] == [
+        first + datetime.timedelta(seconds=3 * i) for i in range(len(segments))
+    ]
+    assert "program_date_time_anchors" not in data
+    assert seen[-1] == first + datetime.timedelta(seconds=3 * (len(segments) - 1))
+
+    data = m3u8.parse(playlists.LOW_LATENCY_PART_PLAYLIST)
+    parts = data["segments"][-1]["parts"]
+    assert parts[1]["program_date_time"] == parts[0]["program_date_time"] + (
+        datetime.timedelta(seconds=0.33334)
+    )
+
+
+def test_should_keep_program_date_time_anchors_in_lazy_mode():
+    data = m3u8.parse(playlists.SIMPLE_PLAYLIST_WITH_PROGRAM_DATE_TIME, lazy=True)
+    segment = data["segments"][2]
+    assert data["program_date_time_anchors"] == [
+        cast_date_time("2014-08-13T13:36:33+00:00")
+    ]
+    assert segment["program_date_time_anchor"] == 0
+    assert segment["program_date_time_offset"] == 6.0
+    assert "current_program_date_time" not in segment
+
+
 def test_should_parse_scte35_from_playlist():
     data = m3u8.parse(playlists.CUE_OUT_ELEMENTAL_PLAYLIST)
 
@@ -674,6 +741,68 @@ def test_iptv_playlist_with_custom_tags():
     ]
 
 
+def test_tag_registry_parses_registered_tags_only():
+    lines = []
+
+    def parse_movie(line, lineno, data, state):
+        lines.append(lineno)
+        data["movie"] = line.split(":", 1)[1].strip()
+
+    registry = m3u8.TagRegistry()
+    registry.register("#EXT-X-MOVIE", parse_movie)
+    data = m3u8.parse(
+        playlists.SIMPLE_PLAYLIST_WITH_CUSTOM_TAGS,
+        strict=True,
+        custom_tags_parser=registry,
+    )
+
+    assert data["movie"] == "million dollar baby"
+    assert lines == [2]
+    assert [5220] == [c["duration"] for c in data["segments"]]
+
+
+def test_tag_registry_stores_segment_values():
+    def parse_group(line, lineno, data, state):
+        save_segment_custom_value(state, "extgrp", line.split(":", 1)[1])
+
+    registry = m3u8.TagRegistry()
+    registry.register("#EXTGRP", parse_group)
+    content = "#EXTM3U\n#EXTGRP:ExtGroup1\n#EXTINF:10,\n1.ts\n#EXTINF:10,\n2.ts\n"
+    data = m3u8.parse(content, custom_tags_parser=registry)
+
+    assert data["segments"][0]["custom_parser_values"] == {"extgrp": "ExtGroup1"}
+    assert "custom_parser_values" not in data["segments"][1]
+
+
+def test_tag_registry_rejects_tags_of_the_parser():
+    registry = m3u8.TagRegistry()
+
+    with pytest.raises(ValueError):
+        registry.register("#EXTINF", lambda *args: None)
+    with pytest.raises(ValueError):
+        registry.register("#EXT-X-CUE-OUT-VENDOR", lambda *args: None)
+    with pytest.raises(ValueError):
+        registry.register("EXT-X-MOVIE", lambda *args: None)
+
+
+def test_should_keep_unknown_tags():
+    data = m3u8.parse(playlists.PLAYLIST_WITH_UNKNOWN_TAGS, keep_unknown_tags=True)
+
+    assert data["unknown_tags"] == ["#EXT-X-VENDOR-CHANNEL:news"]
+    assert "unknown_tags" not in data["segments"][0]
+    assert data["segments"][1]["unknown_tags"] == ["#EXT-X-VENDOR-AD:id=42"]
+    assert data["trailing_unknown_tags"] == ["#EXT-X-VENDOR-END"]
+
+    data = m3u8.parse(playlists.PLAYLIST_WITH_UNKNOWN_TAGS)
+    assert "unknown_tags" not in data
+    assert "unknown_tags" not in data["segments"][1]
+
+    with pytest.raises(ParseError):
+        m3u8.parse(
+            playlists.PLAYLIST_WITH_UNKNOWN_TAGS, strict=True, keep_unknown_tags=True
+        )
+
+
 def test_tag_after_extinf():
     parsed_playlist = m3u8.loads(playlists.IPTV_PLAYLIST_WITH_EARLY_EXTINF)
     actual = parsed_playlist.segments[0].uri
@@ -0,0 +1,138 @@
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+import pickle
+
+import playlists
+import pytest
+
+import m3u8
+from m3u8.frozen import is_frozen
+from m3u8.model import Segment, SegmentList
+from m3u8.parser import save_playlist_custom_value
+
+
+def round_trip(obj):
+    return pickle.loads(pickle.dumps(obj, pickle.HIGHEST_PROTOCOL))
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        playlists.SIMPLE_PLAYLIST_WITH_PROGRAM_DATE_TIME,
+        playlists.PLAYLIST_WITH_SESSION_ENCRYPTED_SEGMENTS_AND_IV,
+        playlists.VARIANT_PLAYLIST_WITH_IFRAME_PLAYLISTS,
+        playlists.LOW_LATENCY_DELTA_UPDATE_PLAYLIST,
+        playlists.CUE_OUT_ELEMENTAL_PLAYLIST,
+        playlists.DATERANGE_IN_PART_PLAYLIST,
+        playlists.MULTIPLE_MAP_URI_PLAYLIST,
+    ],
+)
+def test_pickle_round_trip(content):
+    playlist = m3u8.M3U8(content, base_uri="http://example.com/path/")
+
+    loaded = round_trip(playlist)
+
+    assert loaded.dumps() == playlist.dumps()
+    assert loaded.to_dict() == playlist.to_dict()
+    assert loaded.segments.absolute_uris() == playlist.segments.absolute_uris()
+
+
+def test_data_is_not_pickled_and_rebuilt_when_needed():
+    playlist = m3u8.M3U8(playlists.PLAYLIST_WITH_ENCRYPTED_SEGMENTS)
+
+    loaded = round_trip(playlist)
+
+    assert "data" not in loaded.__dict__
+    assert loaded.data == playlist.to_dict()
+    assert loaded.data is loaded.data
+
+
+def test_shared_keys_stay_shared():
+    playlist = m3u8.M3U8(playlists.PLAYLIST_WITH_ENCRYPTED_SEGMENTS)
+
+    loaded = round_trip(playlist)
+
+    assert loaded.segments[0].key is loaded.segments[1].key
+    assert loaded.segments[0].key is loaded.keys[0]
+
+
+def test_pickle_leaves_out_cached_values():
+    playlist = m3u8.M3U8(playlists.SIMPLE_PLAYLIST, base_uri="http://example.com/")
+    assert playlist.segments[0].absolute_uri == "http://media.example.com/entire.ts"
+    assert "_absolute_uri" in playlist.segments[0].__dict__
+
+    loaded = round_trip(playlist)
+
+    assert "_absolute_uri" not in loaded.segments[0].__dict__
+    assert loaded.segments[0].absolute_uri == "http://media.example.com/entire.ts"
+
+
+def test_segments_with_different_attributes():
+    segments = SegmentList([Segment(uri="a.ts", duration=1), Segment(uri="b.ts")])
+    segments[1].custom = "value"
+    del segments[0].title
+
+    loaded = round_trip(segments)
+
+    assert type(loaded) is SegmentList
+    assert [segment.uri for segment in loaded] == ["a.ts", "b.ts"]
+    assert not hasattr(loaded[0], "title")
+    assert loaded[1].custom == "value"
+    assert not hasattr(loaded[0], "custom")
+
+
+def test_pickle_leaves_out_lossless_source():
+    content = playlists.LOW_LATENCY_PART_PLAYLIST
+    obj = round_trip(m3u8.M3U8(content, lossless=True))
+
+    assert "_source" not in obj.__dict__
+    assert "_source" not in obj.segments[0].__dict__
+    assert obj.dumps() == m3u8.M3U8(content).dumps()
+
+
+def parse_movie(line, lineno, data, state):
+    save_playlist_custom_value(data, "movie", line.split(":", 1)[1].strip())
+
+
+def dump_movie(playlist):
+    return "#EXT-X-MOVIE:" + playlist.custom_parser_values["movie"]
+
+
+def test_pickle_keeps_tag_registry():
+    registry = m3u8.TagRegistry()
+    registry.register("#EXT-X-MOVIE", parse_movie, dump_movie)
+    content = playlists.SIMPLE_PLAYLIST_WITH_CUSTOM_TAGS
+    obj = m3u8.M3U8(content, custom_tags_parser=registry)
+
+    copy = round_trip(obj)
+    assert copy.tag_registry.parsers == registry.parsers
+    assert "#EXT-X-MOVIE:million dollar baby" in copy.dumps()
+    assert copy.dumps() == obj.dumps()
+
+
+def test_pickle_frozen_playlist():
+    playlist = m3u8.M3U8(playlists.CUE_OUT_ELEMENTAL_PLAYLIST).freeze()
+    playlist.ad_breaks()
+
+    loaded = round_trip(playlist)
+
+    assert loaded.is_frozen
+    assert is_frozen(loaded.segments[0])
+    assert loaded.dumps() == playlist.dumps()
+    with pytest.raises(m3u8.FrozenPlaylistError):
+        loaded.segments[0].uri = "other.ts"
+
+
+def test_pickle_copy():
+    playlist = m3u8.M3U8(playlists.SIMPLE_PLAYLIST)
+    copy = playlist.copy()
+    copy.segments.mutable(0).uri = "changed.ts"
+
+    loaded = round_trip(copy)
+
+    assert loaded.segments[0].uri == "changed.ts"
+    assert "_owned" not in loaded.segments.__dict__
+    loaded.segments.mutable(0).uri = "again.ts"
+    assert loaded.segments[0].uri == "again.ts"
@@ -0,0 +1,97 @@
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+import playlists
+
+import m3u8
+from m3u8.profiling import ParseReport, TagStats, tag_name
+
+
+def test_tag_name():
+    assert tag_name("#EXTINF:10,title") == "#EXTINF"
+    assert tag_name("#EXT-X-ENDLIST") == "#EXT-X-ENDLIST"
+    assert tag_name("  segment.ts  ") == "URI"
+    assert tag_name("   ") == ""
+
+
+def test_profiler_counts_lines_per_tag():
+    profiler = m3u8.ParseProfiler()
+
+    data = m3u8.parse(playlists.PLAYLIST_WITH_ENCRYPTED_SEGMENTS, profiler=profiler)
+
+    assert data == m3u8.parse(playlists.PLAYLIST_WITH_ENCRYPTED_SEGMENTS)
+    tags = profiler.total.tags
+    assert tags["#EXTINF"].count == 3
+    assert tags["URI"].count == 3
+    assert tags["#EXT-X-KEY"].count == 1
+    assert tags["#EXTM3U"].count == 1
+    assert all(stats.seconds > 0 for stats in tags.values())
+    assert tags["URI"].allocated_blocks > 0
+    assert profiler.total.parses == 1
+    assert profiler.total.lines == len(
+        playlists.PLAYLIST_WITH_ENCRYPTED_SEGMENTS.strip().splitlines()
+    )
+
+
+def test_profiler_callback_gets_each_parse():
+    reports = []
+    profiler = m3u8.ParseProfiler(callback=reports.append)
+
+    m3u8.parse(playlists.SIMPLE_PLAYLIST, profiler=profiler)
+    m3u8.parse(playlists.SIMPLE_PLAYLIST, profiler=profiler)
+
+    assert len(reports) == 2
+    assert [report.tags["#EXTINF"].count for report in reports] == [1, 1]
+    assert profiler.total.parses == 2
+    assert profiler.total.tags["#EXTINF"].count == 2
+
+    profiler.reset()
+    assert profiler.total.tags == {}
+
+
+def test_profiler_times_custom_tags_parser():
+    def parse_custom(line, lineno, data, state):
+        if line.startswith("#EXT-X-CUSTOM"):
+            data.setdefault("custom", []).append(line)
+            return True
+
+    content = playlists.SIMPLE_PLAYLIST.replace(
+        "#EXTM3U", "#EXTM3U\n#EXT-X-CUSTOM:1\n#EXT-X-CUSTOM:2"
+    )
+    profiler = m3u8.ParseProfiler()
+
+    data = m3u8.parse(content, custom_tags_parser=parse_custom, profiler=profiler)
+
+    assert data["custom"] == ["#EXT-X-CUSTOM:1", "#EXT-X-CUSTOM:2"]
+    custom = profiler.total.tags["#EXT-X-CUSTOM"]
+    assert custom.count == 2
+    assert 0 < custom.custom_seconds <= custom.seconds
+    assert profiler.total.tags["#EXTINF"].custom_seconds > 0
+
+
+def test_profiler_reports_strict_parse_failures():
+    profiler = m3u8.ParseProfiler()
+
+    try:
+        m3u8.parse("#EXTM3U\n#EXT-X-UNKNOWN\n", strict=True, profiler=profiler)
+    except m3u8.ParseError:
+        pass
+
+    assert profiler.total.parses == 0
+
+
+def test_report_merge_and_formatting():
+    report = ParseReport()
+    report.tags["#EXTINF"] = TagStats(2, 0.002, 0.0, 10)
+    report.tags["URI"] = TagStats(2, 0.004, 0.0, 20)
+    other = ParseReport()
+    other.tags["URI"] = TagStats(1, 0.001, 0.0, 5)
+
+    report.merge(other)
+
+    assert report.tags["URI"] == TagStats(3, 0.005, 0.0, 25)
+    assert [tag for tag, _ in report.slowest()] == ["URI", "#EXTINF"]
+    assert report.slowest(1)[0][0] == "URI"
+    assert list(report.to_dict()["tags"]) == ["URI", "#EXTINF"]
+    assert str(report).splitlines()[1].startswith("URI")
@@ -0,0 +1,152 @@
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+import playlists
+import pytest
+
+import m3u8
+from m3u8 import FrozenPlaylistError, URIRewriter
+
+
+def test_rules_are_applied_in_order():
+    rewriter = (
+        URIRewriter()
+        .host("origin.example.com", "cdn.example.com:8080")
+        .prefix("http://cdn.example.com:8080/live/", "http://cdn.example.com:8080/v2/")
+        .regex(r"segment(\d+)", r"chunk-\1")
+        .query({"token": "a b"}, user=1)
+        .sign(lambda uri: uri.count("/"), name="sig")
+    )
+
+    assert rewriter.rewrite("http://origin.example.com/live/segment1.ts#t=1") == (
+        "http://cdn.example.com:8080/v2/chunk-1.ts?token=a+b&user=1&sig=4#t=1"
+    )
+    assert rewriter.rewrite("other.ts?x=1") == "other.ts?x=1&token=a+b&user=1&sig=0"
+    assert rewriter.rewrite(None) is None
+
+
+def test_rewrite_is_memoized():
+    calls = []
+    rewriter = URIRewriter(maxsize=2).add_rule(lambda uri: calls.append(uri) or uri)
+
+    for uri in ("a.ts", "a.ts", "b.ts", "a.ts", "c.ts", "a.ts"):
+        rewriter.rewrite(uri)
+
+    assert calls == ["a.ts", "b.ts", "c.ts", "a.ts"]
+
+
+def test_apply_rewrites_every_uri_in_place():
+    obj = m3u8.loads(playlists.LOW_LATENCY_PART_PLAYLIST)
+    rewriter = URIRewriter().prefix("", "https://cdn.example.com/")
+
+    assert rewriter.apply(obj) is obj
+
+    output = obj.dumps()
+    assert 'URI="https://cdn.example.com/init.mp4"' in output
+    assert "\nhttps://cdn.example.com/fileSequence264.mp4\n" in output
+    assert 'URI="https://cdn.example.com/filePart271.0.mp4"' in output
+    assert 'URI="https://cdn.example.com/../1M/waitForMSN.php"' in output
+    assert 'URI="https://cdn.example.com/filePart273.3.mp4"' in output
+    assert all(uri.startswith("https://cdn.example.com/") for uri in obj.files if uri)
+
+
+def test_apply_rewrites_variant_playlists_and_keys():
+    variant = m3u8.loads(playlists.CONTENT_STEERING_PLAYLIST)
+    encrypted = m3u8.loads(playlists.PLAYLIST_WITH_ENCRYPTED_SEGMENTS)
+    rewriter = URIRewriter().query(token="abc")
+
+    rewriter.apply(variant)
+    rewriter.apply(encrypted)
+
+    assert variant.playlists[0].uri.endswith("?token=abc")
+    assert variant.iframe_playlists[0].uri.endswith("?token=abc")
+    assert variant.media[0].uri.endswith("?token=abc")
+    assert encrypted.keys[0].uri.endswith("&token=abc")
+    assert encrypted.segments[0].key is encrypted.keys[0]
+
+
+def test_dumps_matches_apply_without_changing_the_playlist():
+    for content in (
+        playlists.LOW_LATENCY_PART_PLAYLIST,
+        playlists.CONTENT_STEERING_PLAYLIST,
+        playlists.PLAYLIST_WITH_ENCRYPTED_SEGMENTS,
+    ):
+        obj = m3u8.loads(content).freeze()
+        expected = obj.dumps()
+        rewriter = URIRewriter().host(None, "cdn.example.com").query(token="abc")
+
+        rewritten = rewriter.dumps(obj)
+
+        assert obj.dumps() == expected
+        assert rewritten == rewriter.apply(m3u8.loads(content)).dumps()
+
+
+def test_apply_to_frozen_playlist_raises():
+    obj = m3u8.loads(playlists.SIMPLE_PLAYLIST).freeze()
+
+    with pytest.raises(FrozenPlaylistError):
+        URIRewriter().query(token="abc").apply(obj)
+
+
+def test_apply_to_copy_leaves_the_original_unchanged():
+    for content in (
+        playlists.LOW_LATENCY_PART_PLAYLIST,
+        playlists.CONTENT_STEERING_PLAYLIST,
+        playlists.PLAYLIST_WITH_ENCRYPTED_SEGMENTS,
+        playlists.MULTIPLE_MAP_URI_PLAYLIST,
+    ):
+        for obj in (m3u8.loads(content), m3u8.loads(content).freeze()):
+            expected = obj.dumps()
+            rewriter = URIRewriter().prefix("", "https://cdn.example.com/")
+
+            copy = rewriter.apply(obj.copy())
+
+            assert obj.dumps() == expected
+            assert copy.dumps() == rewriter.rewrite_text(expected)
+
+
+def test_apply_to_copy_keeps_keys_and_initialization_sections_shared():
+    obj = m3u8.loads(playlists.MULTIPLE_MAP_URI_PLAYLIST)
+
+    copy = URIRewriter().query(token="abc").apply(obj.copy())
+
+    first, second, third = copy.segments
+    assert first.key is second.key is third.key is copy.keys[0]
+    assert first.init_section is second.init_section is copy.segment_map[0]
+    assert third.init_section is copy.segment_map[1]
+    assert copy.segment_map[0].uri == "init1.mp4?token=abc"
+    assert obj.segment_map[0].uri == "init1.mp4"
+
+
+def test_apply_to_copy_only_copies_tags_whose_uris_change():
+    obj = m3u8.loads(playlists.LOW_LATENCY_PART_PLAYLIST)
+    obj.keys = [m3u8.Key("AES-128", None, "https://keys.example.com/key.bin")]
+    obj.segments[0].key = obj.segments[-1].key = obj.keys[0]
+
+    copy = URIRewriter().prefix("fileSequence266", "moved").apply(obj.copy())
+
+    assert copy.segments[0] is obj.segments[0]
+    assert copy.segments[2] is not obj.segments[2]
+    assert copy.segments[2].uri == "moved.mp4"
+    assert copy.segments[-1] is obj.segments[-1]
+    assert copy.keys[0] is obj.keys[0]
+
+    copy = URIRewriter().host("keys.example.com", "cdn.example.com").apply(obj.copy())
+
+    assert copy.segments[0].key is copy.segments[-1].key is copy.keys[0]
+    assert copy.keys[0].uri == "https://cdn.example.com/key.bin"
+    assert copy.segments[-1].parts is obj.segments[-1].parts
+    assert copy.segments[1] is obj.segments[1]
+    assert obj.keys[0].uri == "https://keys.example.com/key.bin"
+
+
+def test_sign_is_not_memoized():
+    signatures = iter(range(10))
+    rewriter = URIRewriter().query(a=1).sign(lambda uri: next(signatures))
+
+    assert rewriter.rewrite("a.ts") == "a.ts?a=1&signature=0"
+    assert rewriter.rewrite("a.ts") == "a.ts?a=1&signature=1"
+
+    rewriter = URIRewriter().sign(lambda uri: next(signatures), cache=True)
+    assert rewriter.rewrite("a.ts") == rewriter.rewrite("a.ts")
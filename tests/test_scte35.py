@@ -0,0 +1,107 @@
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+import playlists
+import pytest
+
+import m3u8
+from m3u8 import scte35
+
+SPLICE_INSERT_PAYLOAD = "/DAlAAAAAAAAAP/wFAUAAAABf+//wpiQkv4ARKogAAEBAQAAQ6sodg=="
+TIME_SIGNAL_PAYLOAD = (
+    "/DA0AAAAAAAA///wBQb+cr0AUAAeAhxDVUVJSAAAjn/PAAGlmbAICAAAAAAsoKGKNAIAmsnRfg=="
+)
+
+
+def test_decode_splice_insert():
+    section = scte35.decode(SPLICE_INSERT_PAYLOAD)
+
+    assert section.table_id == 0xFC
+    assert section.splice_command_type == scte35.SPLICE_INSERT
+    assert section.crc_valid
+    command = section.splice_command
+    assert command.splice_event_id == 1
+    assert command.out_of_network_indicator is True
+    assert command.pts_time == 7559745682
+    assert command.break_duration.auto_return is True
+    assert command.break_duration.seconds == 50.0
+
+
+def test_decode_time_signal_with_segmentation_descriptor():
+    section = scte35.decode(TIME_SIGNAL_PAYLOAD)
+
+    assert section.splice_command == scte35.TimeSignal(pts_time=1924989008)
+    (descriptor,) = section.descriptors
+    assert isinstance(descriptor, scte35.SegmentationDescriptor)
+    assert descriptor.segmentation_event_id == 0x4800008E
+    assert descriptor.segmentation_duration == 27630000
+    assert descriptor.segmentation_type_id == 0x34
+    assert descriptor.segmentation_upid_type == 8
+    assert descriptor.segmentation_upid == bytes.fromhex("000000002ca0a18a")
+
+
+def test_decode_hex_payload():
+    payload = "0x" + scte35.payload_to_bytes(SPLICE_INSERT_PAYLOAD).hex().upper()
+
+    assert scte35.decode(payload) == scte35.decode(SPLICE_INSERT_PAYLOAD)
+
+
+def test_decode_is_cached_by_payload():
+    scte35.decode.cache_clear()
+
+    first = scte35.decode(SPLICE_INSERT_PAYLOAD)
+    second = scte35.decode(SPLICE_INSERT_PAYLOAD)
+
+    assert first is second
+    assert scte35.decode.cache_info().hits == 1
+
+
+def test_decode_many_keeps_order():
+    sections = scte35.decode_many(
+        [SPLICE_INSERT_PAYLOAD, TIME_SIGNAL_PAYLOAD, SPLICE_INSERT_PAYLOAD]
+    )
+
+    assert sections[0] is sections[2]
+    assert sections[1].splice_command_type == scte35.TIME_SIGNAL
+
+
+def test_decode_many_skips_missing_payloads():
+    sections = scte35.decode_many([None, SPLICE_INSERT_PAYLOAD, "", None])
+
+    assert sections == [None, scte35.decode(SPLICE_INSERT_PAYLOAD), None, None]
+
+
+def test_decode_caches_invalid_payloads():
+    scte35.decode.cache_clear()
+
+    for _ in range(3):
+        with pytest.raises(scte35.SCTE35DecodeError, match="truncated"):
+            scte35.decode("/DAlAAAAAAAAAP/wFAUAAAAB")
+
+    assert scte35.decode.cache_info().misses == 1
+    assert scte35.decode.cache_info().hits == 2
+
+
+def test_decode_invalid_payload_raises():
+    with pytest.raises(scte35.SCTE35DecodeError):
+        scte35.decode("0xFCINVALIDSECTION")
+    with pytest.raises(scte35.SCTE35DecodeError):
+        scte35.decode("/DAlAAAAAAAAAP/wFAUAAAAB")
+
+
+def test_segment_scte35_info():
+    obj = m3u8.M3U8(playlists.CUE_OUT_ELEMENTAL_PLAYLIST)
+
+    segment = obj.segments[4]
+    assert segment.scte35_info is scte35.decode(SPLICE_INSERT_PAYLOAD)
+    assert segment.scte35_info is obj.segments[5].scte35_info
+    assert obj.segments[0].scte35_info is None
+
+
+def test_daterange_scte35_info():
+    obj = m3u8.M3U8(playlists.DATERANGE_ENDDATE_SCTECMD_PLAYLIST)
+
+    daterange = obj.segments[0].dateranges[0]
+    assert daterange.scte35_out_info is None
+    pytest.raises(scte35.SCTE35DecodeError, getattr, daterange, "scte35_cmd_info")
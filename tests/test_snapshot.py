@@ -0,0 +1,90 @@
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+import playlists
+import pytest
+
+import m3u8
+from m3u8 import snapshot
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        playlists.SIMPLE_PLAYLIST,
+        playlists.VARIANT_PLAYLIST,
+        playlists.PLAYLIST_WITH_ENCRYPTED_SEGMENTS_AND_IV,
+        playlists.SIMPLE_PLAYLIST_WITH_PROGRAM_DATE_TIME,
+        playlists.CUE_OUT_ELEMENTAL_PLAYLIST,
+        playlists.LOW_LATENCY_PART_PLAYLIST,
+        playlists.DATERANGE_IN_PART_PLAYLIST,
+        playlists.MULTIPLE_MAP_URI_PLAYLIST,
+    ],
+)
+def test_snapshot_round_trip(content):
+    playlist = m3u8.loads(content)
+
+    loaded = m3u8.M3U8.from_snapshot(playlist.to_snapshot())
+
+    assert loaded.data == playlist.data
+    assert loaded.dumps() == playlist.dumps()
+
+
+def test_snapshot_keeps_base_uri_and_sets_base_path():
+    playlist = m3u8.loads(
+        playlists.SIMPLE_PLAYLIST, uri="http://example.com/path/playlist.m3u8"
+    )
+
+    loaded = m3u8.M3U8.from_snapshot(
+        playlist.to_snapshot(), base_path="http://cdn.example.com/videos"
+    )
+
+    assert loaded.base_uri == "http://example.com/path/"
+    assert loaded.segments[0].uri == "http://cdn.example.com/videos/entire.ts"
+
+
+def test_segments_sharing_a_key_share_it_after_loading():
+    playlist = m3u8.loads(playlists.PLAYLIST_WITH_ENCRYPTED_SEGMENTS)
+
+    loaded = m3u8.M3U8.from_snapshot(playlist.to_snapshot())
+
+    assert loaded.segments[0].key is loaded.segments[1].key
+
+
+def test_segments_keep_the_keys_they_have():
+    data = {
+        "segments": [
+            {"duration": 1.0, "uri": "a.ts", "title": None},
+            {"duration": 2.5, "uri": "b.ts", "cue_in": True},
+            {"duration": 3, "uri": "", "title": "multi\nline"},
+        ],
+        "version": 3,
+    }
+
+    assert snapshot.decode(snapshot.encode(data)) == (data, None)
+
+
+def test_decode_file_memory_maps_the_snapshot(tmpdir):
+    playlist = m3u8.loads(playlists.SIMPLE_PLAYLIST_WITH_PROGRAM_DATE_TIME)
+    path = str(tmpdir.join("playlist.snapshot"))
+    with open(path, "wb") as fileobj:
+        fileobj.write(playlist.to_snapshot())
+
+    data, base_uri = snapshot.decode_file(path)
+
+    assert data == playlist.data
+    assert base_uri is None
+
+
+def test_from_snapshot_refuses_other_content():
+    with pytest.raises(m3u8.SnapshotError):
+        m3u8.M3U8.from_snapshot(playlists.SIMPLE_PLAYLIST.encode())
+
+
+def test_from_snapshot_refuses_other_versions():
+    content = bytearray(m3u8.loads(playlists.SIMPLE_PLAYLIST).to_snapshot())
+    content[len(snapshot.MAGIC)] = snapshot.VERSION + 1
+
+    with pytest.raises(m3u8.SnapshotError, match="version"):
+        m3u8.M3U8.from_snapshot(content)
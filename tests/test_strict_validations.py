@@ -7,6 +7,7 @@ import pytest
 
 import m3u8
 import m3u8.version_matching_rules
+from m3u8 import version_matching
 
 
 @pytest.mark.xfail
@@ -24,9 +25,12 @@ def test_should_fail_if_EXT_X_MEDIA_SEQUENCE_is_diffent_from_sequence_number_of_
     assert 0
 
 
-@pytest.mark.xfail
 def test_should_fail_if_more_than_one_EXT_X_MEDIA_SEQUENCE():
-    assert 0
+    with pytest.raises(Exception) as exc_info:
+        m3u8.parse(invalid_versioned_playlists.M3U8_TWO_MEDIA_SEQUENCES, strict=True)
+
+    (error,) = exc_info.value.args[0]
+    assert error.line_number == 4
 
 
 @pytest.mark.xfail
@@ -41,9 +45,20 @@ def test_should_validate_supported_EXT_X_VERSION():
         m3u8.parse(invalid_versioned_playlists.M3U8_RULE_IV, strict=True)
 
 
-@pytest.mark.xfail
 def test_should_fail_if_any_EXTINF_duration_is_greater_than_TARGET_DURATION():
-    assert 0
+    with pytest.raises(Exception) as exc_info:
+        m3u8.parse(
+            invalid_versioned_playlists.M3U8_EXTINF_OVER_TARGET_DURATION, strict=True
+        )
+
+    assert [error.line for error in exc_info.value.args[0]] == ["#EXTINF:10.6,"]
+
+
+def test_should_report_all_errors_at_once():
+    with pytest.raises(Exception) as exc_info:
+        m3u8.parse(invalid_versioned_playlists.M3U8_MANY_ERRORS, strict=True)
+
+    assert [error.line_number for error in exc_info.value.args[0]] == [3, 5, 7, 7]
 
 
 @pytest.mark.xfail
@@ -54,3 +69,14 @@ def test_should_fail_if_TARGET_DURATION_not_found():
 @pytest.mark.xfail
 def test_should_fail_if_invalid_m3u8_url_after_EXT_X_STREAM_INF():
     assert 0
+
+
+def test_strict_parse_numbers_lines_like_validate():
+    content = invalid_versioned_playlists.M3U8_MANY_ERRORS
+    with pytest.raises(Exception) as exc_info:
+        m3u8.parse(content, strict=True)
+
+    errors = version_matching.validate(content.strip().splitlines())
+    assert [error.line_number for error in exc_info.value.args[0]] == [
+        error.line_number for error in errors
+    ]
@@ -0,0 +1,196 @@
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+import datetime
+
+import playlists
+import pytest
+
+import m3u8
+from m3u8.timeline import IntervalTree, find_ad_breaks
+
+utc = datetime.timezone.utc
+
+
+def test_interval_tree_overlapping_returns_values_sorted_by_start():
+    tree = IntervalTree([(5, 10, "b"), (0, 3, "a"), (8, 20, "c"), (30, 40, "d")])
+
+    assert tree.overlapping(9, 9) == ["b", "c"]
+    assert tree.overlapping(2, 8) == ["a", "b", "c"]
+    assert tree.overlapping(21, 29) == []
+    assert tree.overlapping(40) == ["d"]
+    assert len(tree) == 4
+
+
+def test_interval_tree_matches_linear_scan():
+    intervals = [(i % 17, i % 17 + i % 5, i) for i in range(200)]
+    tree = IntervalTree(intervals)
+
+    for start in range(-2, 25):
+        for end in range(start, 25, 3):
+            expected = sorted(
+                value for s, e, value in intervals if s <= end and e >= start
+            )
+            assert sorted(tree.overlapping(start, end)) == expected
+
+
+def test_find_ad_breaks_from_cue_out_to_cue_in():
+    obj = m3u8.M3U8(playlists.CUE_OUT_ELEMENTAL_PLAYLIST)
+
+    ad_breaks = find_ad_breaks(obj.segments)
+
+    assert len(ad_breaks) == 1
+    assert ad_breaks[0].start_media_sequence == 47227
+    assert ad_breaks[0].end_media_sequence == 47232
+    assert ad_breaks[0].is_started
+    assert ad_breaks[0].is_ended
+
+
+def test_find_ad_breaks_started_before_playlist_window():
+    obj = m3u8.M3U8(playlists.CUE_OUT_PLAYLIST)
+
+    (ad_break,) = find_ad_breaks(obj.segments)
+
+    assert not ad_break.is_started
+    assert ad_break.is_ended
+    assert ad_break.start_media_sequence == 143474332
+    assert ad_break.end_media_sequence == 143474333
+    assert ad_break.start_date == datetime.datetime(2015, 6, 18, 23, 22, 20, tzinfo=utc)
+    assert ad_break.end_date == datetime.datetime(2015, 6, 18, 23, 22, 40, tzinfo=utc)
+
+
+def test_find_ad_breaks_without_cue_out_cont():
+    obj = m3u8.M3U8(playlists.CUE_OUT_NO_DURATION_PLAYLIST)
+
+    (ad_break,) = find_ad_breaks(obj.segments)
+
+    assert [s.uri for s in ad_break.segments] == ["0.aac", "1.aac"]
+
+
+def test_timeline_index_ad_breaks_by_media_sequence_and_date():
+    index = m3u8.M3U8(playlists.CUE_OUT_PLAYLIST).timeline_index()
+
+    assert index.ad_breaks(143474331) == []
+    assert len(index.ad_breaks(143474330, 143474332)) == 1
+    assert (
+        index.ad_breaks_between(datetime.datetime(2015, 6, 18, 23, 22, 25, tzinfo=utc))
+        != []
+    )
+    assert (
+        index.ad_breaks_between(datetime.datetime(2015, 6, 18, 23, 22, 45, tzinfo=utc))
+        == []
+    )
+
+
+def test_timeline_index_segment_at():
+    obj = m3u8.M3U8(playlists.DISCONTINUITY_PLAYLIST_WITH_PROGRAM_DATE_TIME)
+    index = obj.timeline_index()
+    start = datetime.datetime(2014, 8, 13, 13, 36, 33, tzinfo=utc)
+
+    assert index.segment_at(start) is obj.segments[0]
+    assert index.segment_at(start + datetime.timedelta(seconds=4)) is obj.segments[1]
+    assert index.segment_at(start.timestamp() + 25) is obj.segments[6]
+    assert index.segment_at(start - datetime.timedelta(seconds=1)) is None
+    assert index.segment_at(start + datetime.timedelta(hours=1)) is None
+    assert m3u8.M3U8(playlists.SIMPLE_PLAYLIST).timeline_index().segment_at(0) is None
+
+
+def test_timeline_index_dateranges_with_duration():
+    index = m3u8.M3U8(playlists.DATERANGE_SIMPLE_PLAYLIST).timeline_index()
+
+    start = datetime.datetime(2016, 6, 13, 11, 15, 10, tzinfo=utc)
+    assert [d.id for d in index.dateranges(start)] == ["ad3"]
+    assert index.dateranges(start + datetime.timedelta(seconds=30)) == []
+
+
+def test_timeline_index_merges_dateranges_sharing_an_id():
+    index = m3u8.M3U8(playlists.DATERANGE_SCTE35_OUT_AND_IN_PLAYLIST).timeline_index()
+
+    start = datetime.datetime(2014, 3, 5, 11, 15, 0, tzinfo=utc)
+    ranges = index.dateranges(start, start + datetime.timedelta(seconds=50))
+    assert [d.id for d in ranges] == ["splice-6FFFFFF0"]
+    assert index.dateranges(start + datetime.timedelta(seconds=61)) == []
+
+
+def test_timeline_index_resolves_end_on_next_chains():
+    index = m3u8.M3U8(playlists.DATERANGE_END_ON_NEXT_PLAYLIST).timeline_index()
+
+    start = datetime.datetime(2020, 3, 10, 7, 48, tzinfo=utc).timestamp()
+    assert [d.id for d in index.dateranges(start + 5)] == ["chapter-1"]
+    assert [d.id for d in index.dateranges(start + 13)] == ["chapter-2", "ad-1"]
+    assert [d.id for d in index.dateranges(start + 3600)] == ["chapter-3"]
+
+
+def test_timeline_index_dateranges_in_parts():
+    index = m3u8.M3U8(playlists.DATERANGE_IN_PART_PLAYLIST).timeline_index()
+
+    start = datetime.datetime(2020, 3, 10, 7, 48, 2, tzinfo=utc)
+    assert [d.id for d in index.dateranges(start)] == ["test_id"]
+
+
+def test_ad_breaks_durations_and_payloads():
+    obj = m3u8.M3U8(playlists.CUE_OUT_ELEMENTAL_PLAYLIST)
+
+    (ad_break,) = obj.ad_breaks()
+
+    assert ad_break.planned_duration == 50.0
+    assert ad_break.duration == pytest.approx(50.0)
+    assert ad_break.scte35 == "/DAlAAAAAAAAAP/wFAUAAAABf+//wpiQkv4ARKogAAEBAQAAQ6sodg=="
+    assert ad_break.oatcls_scte35 == ad_break.scte35
+    assert ad_break.asset_metadata["caid"] == "12345678"
+
+
+def test_ad_breaks_with_invalid_planned_duration():
+    obj = m3u8.M3U8(playlists.CUE_OUT_INVALID_PLAYLIST)
+
+    (ad_break,) = obj.ad_breaks()
+
+    assert ad_break.planned_duration is None
+    assert not ad_break.is_ended
+
+
+def test_ad_break_tracker_extends_open_break_across_refreshes():
+    tracker = m3u8.AdBreakTracker()
+
+    (ad_break,) = tracker.update(m3u8.M3U8(playlists.CUE_OUT_LIVE_WINDOW_PLAYLIST))
+    assert not ad_break.is_ended
+    assert ad_break.end_media_sequence == 102
+
+    ad_breaks = tracker.update(
+        m3u8.M3U8(playlists.CUE_OUT_LIVE_WINDOW_REFRESHED_PLAYLIST)
+    )
+    assert ad_breaks == [ad_break]
+    assert ad_break.is_ended
+    assert [s.uri for s in ad_break.segments] == [
+        "segment101.ts",
+        "segment102.ts",
+        "segment103.ts",
+    ]
+    assert ad_break.planned_duration == 30.0
+    assert tracker.last_media_sequence == 104
+
+
+def test_ad_break_tracker_forgets_breaks_that_left_the_playlist():
+    tracker = m3u8.AdBreakTracker()
+    window = 6
+
+    def live_playlist(first):
+        lines = ["#EXTM3U", "#EXT-X-TARGETDURATION:10"]
+        lines.append(f"#EXT-X-MEDIA-SEQUENCE:{first}")
+        for sequence in range(first, first + window):
+            if sequence % 4 == 0:
+                lines.append("#EXT-X-CUE-OUT:20")
+            elif sequence % 4 == 2:
+                lines.append("#EXT-X-CUE-IN")
+            lines.append("#EXTINF:10,")
+            lines.append(f"segment{sequence}.ts")
+        return m3u8.M3U8("\n".join(lines) + "\n")
+
+    for first in range(1000):
+        ad_breaks = tracker.update(live_playlist(first))
+        assert len(ad_breaks) <= window // 4 + 1
+
+    last = first + window - 1
+    assert ad_breaks[-1].start_media_sequence == last - last % 4
+    assert all(ad_break.end_media_sequence >= first for ad_break in ad_breaks)
@@ -1,7 +1,14 @@
+from m3u8.version_matching import LineValidator, validate
 from m3u8.version_matching_rules import (
+    RemovedEXTXALLOWCACHE,
     ValidEXTXBYTERANGEOrEXTXIFRAMESONLY,
     ValidFloatingPointEXTINF,
     ValidIVInEXTXKEY,
+    ValidKEYFORMATInEXTXKEY,
+    VersionMatchRuleBase,
+    available_rules,
+    register_rule,
+    rules_by_tag,
 )
 
 
@@ -143,3 +150,77 @@ def test_valid_EXT_X_BYTERANGE_or_EXT_X_I_FRAMES_ONLY():
             line=example["line"],
         )
         assert validator.validate()
+
+
+def test_line_validator_checks_lines_seen_before_version():
+    validator = LineValidator()
+    validator.feed(1, "#EXTM3U")
+    validator.feed(2, "#EXT-X-BYTERANGE:200000@1000")
+    validator.feed(3, "#EXTINF:10.5,")
+    validator.feed(4, "#EXT-X-VERSION:3")
+    validator.feed(5, "#EXT-X-KEY:METHOD=AES-128,URI=key.bin,IV=0x1234")
+
+    assert [(e.line_number, e.how_to_fix) for e in validator.errors] == [
+        (2, "Change the protocol version to 4 or higher."),
+    ]
+
+
+def test_line_validator_only_runs_rules_registered_for_the_tag():
+    validator = LineValidator()
+    validator.feed(1, "#EXT-X-VERSION:1")
+    validator.feed(2, "#EXT-X-SESSION-KEY:METHOD=AES-128,URI=key.bin,IV=0x1234")
+    validator.feed(3, "#EXT-X-DATERANGE:ID=IV,START-DATE=2020-01-01T00:00:00Z")
+
+    assert validator.errors == []
+
+
+def test_line_validator_without_version_reports_nothing():
+    validator = LineValidator()
+    validator.feed(1, "#EXT-X-I-FRAMES-ONLY")
+
+    assert validator.errors == []
+
+
+def test_rules_declare_minimum_and_removed_versions():
+    key = '#EXT-X-KEY:METHOD=SAMPLE-AES,URI="key.bin",KEYFORMAT="identity"'
+    assert not ValidKEYFORMATInEXTXKEY.check(4, key)
+    assert ValidKEYFORMATInEXTXKEY.check(5, key)
+
+    assert RemovedEXTXALLOWCACHE.check(6, "#EXT-X-ALLOW-CACHE:YES")
+    assert not RemovedEXTXALLOWCACHE.check(7, "#EXT-X-ALLOW-CACHE:YES")
+
+
+def test_rules_match_attribute_names_not_values():
+    key = '#EXT-X-KEY:METHOD=AES-128,URI="https://IVS.example/KEYFORMAT/key"'
+    assert validate(["#EXT-X-VERSION:1", key]) == []
+    assert validate(["#EXT-X-VERSION:1", key + ",IV=0x1"]) != []
+
+    lines = [
+        "#EXT-X-VERSION:9",
+        '#EXT-X-STREAM-INF:BANDWIDTH=1280000,CODECS="PROGRAM-ID=1"',
+        '#EXT-X-SKIP:SKIPPED-SEGMENTS=3,X-NOTE="RECENTLY-REMOVED-DATERANGES="',
+    ]
+    assert validate(lines) == []
+
+
+def test_register_rule_adds_rule_to_tag_dispatch():
+    class ValidTILES(VersionMatchRuleBase):
+        tags = ("#EXT-X-TILES",)
+        min_version = 99
+
+    register_rule(ValidTILES)
+    try:
+        validator = LineValidator()
+        validator.feed(1, "#EXT-X-VERSION:7")
+        validator.feed(2, "#EXT-X-TILES:RESOLUTION=640x360,LAYOUT=5x2")
+        assert validator.errors == [ValidTILES.error(2, validator.errors[0].line)]
+    finally:
+        available_rules.remove(ValidTILES)
+        rules_by_tag["#EXT-X-TILES"].remove(ValidTILES)
+
+
+def test_ext_x_map_requires_version_6_without_i_frames_only():
+    lines = ["#EXT-X-VERSION:5", '#EXT-X-MAP:URI="init.mp4"']
+
+    assert [e.line_number for e in validate(lines)] == [1]
+    assert validate(lines + ["#EXT-X-I-FRAMES-ONLY"]) == []